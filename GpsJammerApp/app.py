@@ -1,9 +1,70 @@
 import sys
 import os
+import time
+import subprocess
+
+STARTUP_T0 = time.perf_counter()
+# --profile-startup: czasy etapów startu + najwolniejsze importy (jak python -X importtime)
+PROFILE_STARTUP_FLAG = '--profile-startup'
+PROFILE_IMPORT_TOP = 25
+# Bez sieci mapa może się nie doczekać loadFinished - profil i tak się kończy
+PROFILE_STARTUP_TIMEOUT_MS = 30000
+
+
+def print_import_breakdown(importtime_log):
+  ##Importy z logu -X importtime posortowane po czasie łącznym (tylko dwa pierwsze poziomy zagnieżdżenia)
+    entries = []
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, self_us, cumulative_us, name = (part for part in line.replace('import time:', '|', 1).split('|'))
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        if depth <= 1:
+            entries.append((int(cumulative_us), int(self_us), depth, name.strip()))
+    entries.sort(reverse=True)
+    print(f"\n--- Najwolniejsze importy (łącznie / własne, ms) ---")
+    for cumulative_us, self_us, depth, name in entries[:PROFILE_IMPORT_TOP]:
+        print(f"  {cumulative_us / 1000:8.1f} {self_us / 1000:8.1f}  {'  ' * depth}{name}")
+
+
+def run_profiled_startup():
+  ##Uruchamia aplikację ponownie z -X importtime; dziecko mierzy etapy startu i kończy się po załadowaniu mapy
+    child = subprocess.run([sys.executable, '-X', 'importtime', os.path.abspath(__file__), PROFILE_STARTUP_FLAG]
+                           + sys.argv[1:],
+                           stderr=subprocess.PIPE, text=True)
+    other_lines = [line for line in child.stderr.splitlines() if not line.startswith('import time:')]
+    if other_lines:
+        print('\n'.join(other_lines), file=sys.stderr)
+    print_import_breakdown(child.stderr)
+    return child.returncode
+
+
+PROFILE_STARTUP = PROFILE_STARTUP_FLAG in sys.argv
+if PROFILE_STARTUP:
+    sys.argv.remove(PROFILE_STARTUP_FLAG)
+    if not sys._xoptions.get('importtime'):
+        sys.exit(run_profiled_startup())
+    # Tu jesteśmy już w dziecku z -X importtime - mierzymy etapy do załadowania mapy
+    startup_marks = [('start interpretera', STARTUP_T0)]
+
+def mark_startup(label):
+    if PROFILE_STARTUP:
+        startup_marks.append((label, time.perf_counter()))
+
+def finish_startup_profile(app, label):
+    mark_startup(label)
+    print(f"\n--- Start aplikacji (ms od uruchomienia skryptu) ---")
+    previous = STARTUP_T0
+    for label, t in startup_marks[1:]:
+        print(f"  {(t - STARTUP_T0) * 1000:8.1f}  (+{(t - previous) * 1000:7.1f})  {label}")
+        previous = t
+    app.quit()
+
 from PySide6.QtWidgets import QApplication
 from PySide6.QtGui import QIcon
-from PySide6.QtCore import qInstallMessageHandler, QtMsgType
+from PySide6.QtCore import qInstallMessageHandler, QtMsgType, QCoreApplication, Qt, QTimer
 from app.ui_mainwindow import MainWindow
+mark_startup("importy PySide6 + okno główne")
 
 def qt_message_handler(mode, context, message):
     if "Unknown property" in message and ("box-shadow" in message or "transform" in message):
@@ -19,7 +80,11 @@ def qt_message_handler(mode, context, message):
 
 if __name__ == "__main__":
     qInstallMessageHandler(qt_message_handler)
+    # QtWebEngine jest importowany dopiero po pokazaniu okna - współdzielone konteksty OpenGL
+    # muszą być włączone przed utworzeniem QApplication
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
+    mark_startup("QApplication")
     app.setApplicationName("GPS Jammer Detection")
     app.setApplicationDisplayName("GPS Jammer Detection")
     app.setApplicationVersion("1.0")
@@ -44,9 +109,15 @@ if __name__ == "__main__":
     if hasattr(app, "setDesktopFileName"):
         app.setDesktopFileName("gps-jammer-detection")
     w = MainWindow()
+    mark_startup("MainWindow()")
     w.setWindowIcon(icon)
     w.setWindowTitle("GPS Jammer Detection - Analiza Sygnałów GNSS")
     w.show()
     w.raise_()
     w.activateWindow()
+    mark_startup("show()")
+    if PROFILE_STARTUP:
+        QTimer.singleShot(0, lambda: mark_startup("pierwsza iteracja pętli zdarzeń"))
+        w.map_loaded.connect(lambda ok: finish_startup_profile(app, f"mapa załadowana (ok={ok})"))
+        QTimer.singleShot(PROFILE_STARTUP_TIMEOUT_MS, lambda: finish_startup_profile(app, "limit czasu"))
     sys.exit(app.exec())
@@ -0,0 +1,980 @@
+import os
+import sys
+import json
+import threading
+import time
+import numpy as np
+from collections import deque
+import datetime
+from .checkIfJamming import (CHUNK_SIZE_BYTES, follow_file_for_jamming, get_power_profile,
+                             segment_jamming_events, ms_to_samples, SAMPLE_RATE_HZ)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'skrypty'))
+from .epoch_ingest import (EpochIngestServer, LegacyHttpEpochReceiver, INGEST_DEFAULT_PORT, LEGACY_HTTP_PORT,
+                           INGEST_COALESCED_KEY)
+from .decoder_process import DecoderProcess, StdoutEpochParser, decoder_supports_ingest_port
+
+# Aktualizacje GUI wysyłane klatkami zamiast co epokę (szybkie odtwarzanie plików)
+GUI_FRAME_RATE_HZ = 20.0
+# Więcej linii na klatkę i tak nie zmieści się w panelu tekstowym
+GUI_FRAME_MAX_TEXT_LINES = 50
+# Triangulacja równoległa: maks. czas czekania na próbkę jammingu i co ile logować status
+TRIANGULATION_MAX_WAIT_S = 120.0
+TRIANGULATION_STATUS_LOG_S = 10.0
+# Stary gnssdec (bez -p) wysyła epoki na stały port - w procesie tylko jedna taka analiza naraz
+_LEGACY_HTTP_LOCK = threading.Lock()
+
+class _GuiFrameBatcher:
+    ## Zbiera linie tekstu, pozycje i ostatni postęp z epok; co 1/rate_hz s oddaje je
+    ## jednym wywołaniem emit_frame(linie, pozycje, postęp). stop() robi ostatnią klatkę.
+
+    def __init__(self, emit_frame, rate_hz=GUI_FRAME_RATE_HZ):
+        self.emit_frame = emit_frame
+        self.interval = 1.0 / rate_hz
+        self.lock = threading.Lock()
+        self.text_lines = deque(maxlen=GUI_FRAME_MAX_TEXT_LINES)
+        self.positions = []
+        self.progress = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def add_text(self, line):
+        with self.lock:
+            self.text_lines.append(line)
+
+    def add_position(self, lat, lon, hgt):
+        with self.lock:
+            self.positions.append((lat, lon, hgt))
+
+    def set_progress(self, value, state):
+        with self.lock:
+            self.progress = (value, state)
+
+    def flush(self):
+        with self.lock:
+            text_lines = list(self.text_lines)
+            self.text_lines.clear()
+            positions, self.positions = self.positions, []
+            progress, self.progress = self.progress, None
+        if text_lines or positions or progress is not None:
+            self.emit_frame(text_lines, positions, progress)
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.flush()
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+        self.flush()
+
+class _BoundCallbacks:
+    def __init__(self):
+        self.callbacks = []
+
+    def connect(self, callback):
+        self.callbacks.append(callback)
+
+    def emit(self, *args):
+        for callback in self.callbacks:
+            callback(*args)
+
+class CallbackSignal:
+    ## Sygnał bez Qt o tym samym API (connect/emit): podłączone funkcje są wołane od razu,
+    ## w wątku emitującym. GPSAnalysisThread (worker.py) podmienia je na Signal z PySide6.
+
+    def __set_name__(self, owner, name):
+        self.attr_name = '_callbacks_' + name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return obj.__dict__.setdefault(self.attr_name, _BoundCallbacks())
+
+class GPSAnalysis:
+    ## Cała analiza (jamming, gnssdec, triangulacja) bez Qt - run() w wątku wywołującym.
+    ## Używana bezpośrednio przez app.cli/app.batch, a w GUI przez GPSAnalysisThread.
+
+    analysis_complete = CallbackSignal()
+    progress_update = CallbackSignal()
+    new_analysis_text = CallbackSignal()
+    new_position_data = CallbackSignal()
+    # Wszystkie pozycje z jednej klatki GUI: [(lat, lon, hgt), ...]
+    new_position_batch = CallbackSignal()
+    jamming_analysis_complete = CallbackSignal()
+    jamming_started = CallbackSignal()
+    jamming_stopped = CallbackSignal()
+    triangulation_complete = CallbackSignal()
+
+    def __init__(self, file_paths, power_threshold=120.0, antenna_positions=None, satellite_system='GPS', hold_position=False, follow_file=False, detection_params=None, binary_epochs=False, ingest_port=INGEST_DEFAULT_PORT, gui_rate_hz=GUI_FRAME_RATE_HZ, stdout_epochs=False, triangulation_window_s=None):
+        self.file_paths = file_paths
+        self.power_threshold = power_threshold
+        self.antenna_positions = antenna_positions if antenna_positions else {
+            'antenna1': [0.0, 0.0],
+            'antenna2': [0.5, 0.0],
+            'antenna3': [0.0, 0.5]
+        }
+        
+        # Mapowanie flagi systemu !
+        self.satellite_system = satellite_system
+        if satellite_system == 'GPS':
+            self.gnss_system_flag = '-g'
+        elif satellite_system == 'GLONASS':
+            self.gnss_system_flag = '-n'
+        elif satellite_system == 'Galileo':
+            self.gnss_system_flag = '-l'
+        else:
+            self.gnss_system_flag = '-g'  # domyślnie GPS
+        
+        self.hold_position = hold_position
+        # gnssdec -b: zwarte rekordy binarne zamiast JSON (szybsze odtwarzanie plików)
+        self.binary_epochs = binary_epochs
+        # Port odbiornika epok przekazywany gnssdec -p (0 = efemeryczny, kilka analiz naraz)
+        self.ingest_port = ingest_port
+        # Epoki z linii LLA|/OBS| na stdout gnssdec zamiast z gniazda (gnssdec -p 0)
+        self.stdout_epochs = stdout_epochs
+        # Okno [s] trasy jammera (lokalizacja co okno zamiast jednego punktu); None/0 = jeden punkt na zdarzenie
+        self.triangulation_window_s = triangulation_window_s
+        self.decoder = None
+        # Tekst, pozycja i postęp z epok trafiają do GUI klatkami (gui_rate_hz), nie co epokę
+        self.gui_frames = _GuiFrameBatcher(self.emit_gui_frame, gui_rate_hz)
+        # Plik jeszcze nagrywany (rtl_sdr) - detektor śledzi jego przyrost zamiast jednego przebiegu
+        self.follow_file = follow_file
+        self.jamming_follow_stop = threading.Event()
+        # Tylko zatrzymanie przez użytkownika (koniec gnssdec nie przerywa skanu profilu mocy)
+        self.analysis_cancel = threading.Event()
+        # Histereza i debouncing detekcji (segmentacja profilu mocy, bez ponownego czytania pliku)
+        detection_params = detection_params if detection_params else {}
+        self.power_threshold_off = detection_params.get('threshold_off')
+        # Częstotliwość próbkowania z ustawień (czasy w ms -> próbki, okna trasy jammera)
+        self.sample_rate_hz = detection_params.get('sample_rate_hz') or SAMPLE_RATE_HZ
+        self.min_event_samples = ms_to_samples(detection_params.get('min_event_ms', 0.0), self.sample_rate_hz)
+        self.merge_gap_samples = ms_to_samples(detection_params.get('merge_gap_ms', 0.0), self.sample_rate_hz)
+        
+        print(f"[WORKER INIT] Utworzono GPSAnalysisThread z pozycjami anten:")
+        print(f"[WORKER INIT]   Antena 1: {self.antenna_positions['antenna1']}")
+        print(f"[WORKER INIT]   Antena 2: {self.antenna_positions['antenna2']}")
+        print(f"[WORKER INIT]   Antena 3: {self.antenna_positions['antenna3']}")
+        print(f"[WORKER INIT]   System satelitarny: {self.satellite_system} (flaga: {self.gnss_system_flag})")
+        self.current_buffcnt = 0
+        self.current_lat = 0.0
+        self.current_lon = 0.0
+        self.current_hgt = 0.0
+        self.current_nsat = 0
+        self.current_gdop = 0.0
+        self.current_clk_bias = 0.0
+        # Epoki pominięte przez gnssdec (pełny pierścień wysyłki / brak odbiorcy)
+        self.decoder_dropped_epochs = 0
+        self.jamming_detected = False
+        self.jamming_events = []
+        self.jamming_start_sample = None  
+        self.jamming_end_sample = None 
+        self.ingest_server = None
+        # Odbiór POST /data dla starego gnssdec (bez -p) - zasila tę samą kolejkę co ingest_server
+        self.legacy_receiver = None
+        self.jamming_thread = None
+        self.triangulation_thread = None
+        self.total_samples = 0
+        self.estimated_total_samples = 0
+        self.triangulation_result = None
+        # Wątek triangulacji skończył (z wynikiem albo bez) - run() czeka na to przez pipeline_state
+        self.triangulation_finished = False
+        self.jamming_analysis_finished = False 
+        self.triangulation_started = False
+        self.stop_requested = False 
+        self.decoder_finished = False
+        # Budzi wątek triangulacji przy każdej zmianie: epoka, wynik jammingu, koniec gnssdec, stop
+        self.pipeline_state = threading.Condition()
+        self.last_position_before_jamming = {
+            'lat': 0.0,
+            'lon': 0.0,
+            'hgt': 0.0,
+            'buffcnt': 0,
+            'valid': False
+        } 
+        self.jamming_analysis_complete.connect(self.on_jamming_detected)
+        self.triangulation_complete.connect(self.on_triangulation_complete)
+        
+        try:
+            app_dir = os.path.dirname(os.path.abspath(__file__)) 
+        except NameError:
+            app_dir = os.getcwd() 
+        self.project_root_dir = os.path.dirname(app_dir)
+        
+        self.gnssdec_path = os.path.join(
+            self.project_root_dir, "backend", "bin", "gnssdec"
+        )
+        if self.file_paths:
+            self.calculate_file_samples()
+        
+    def calculate_file_samples(self):
+        try:
+            if not self.file_paths or not os.path.exists(self.file_paths[0]):
+                return
+            
+            file_path = self.file_paths[0]
+            file_size = os.path.getsize(file_path)
+            bytes_per_sample = 2 
+            self.total_samples = file_size // bytes_per_sample
+
+            if file_size % 4 == 0: 
+                samples_int16 = file_size // 4
+                if samples_int16 > 100000:
+                    self.total_samples = samples_int16
+                    bytes_per_sample = 4
+                    
+            self.estimated_total_samples = self.total_samples
+            
+            print(f"[PROGRESS] Plik: {os.path.basename(file_path)}")
+            print(f"[PROGRESS] Rozmiar: {file_size} bajtów")
+            print(f"[PROGRESS] Bajty na próbkę: {bytes_per_sample}")
+            print(f"[PROGRESS] Całkowita liczba próbek: {self.total_samples}")
+            print(f"[PROGRESS] Szacowany czas analizy: {self.total_samples / self.sample_rate_hz:.1f}s przy {self.sample_rate_hz / 1e6:.3f} MHz")
+            
+        except Exception as e:
+            print(f"[PROGRESS] Błąd przy obliczaniu próbek: {e}")
+            self.total_samples = 0
+
+    def process_incoming_data(self, data):
+        # Epoki scalone przez EpochIngestServer (same fiksy) - najpierw, w kolejności gnssdec
+        for coalesced in data.pop(INGEST_COALESCED_KEY, ()):
+            self.process_incoming_data(coalesced)
+        try:
+            dropped_epochs = int(data.get('dropped_epochs', 0))
+            if dropped_epochs > self.decoder_dropped_epochs:
+                print(f"[WORKER] gnssdec pominął {dropped_epochs - self.decoder_dropped_epochs} epok(i) (łącznie {dropped_epochs})")
+                self.decoder_dropped_epochs = dropped_epochs
+
+            position = data.get('position', {})
+            if position:
+                self.current_buffcnt = position.get('buffcnt', 0)
+                self.current_lat = float(position.get('lat', 0.0))
+                self.current_lon = float(position.get('lon', 0.0))
+                self.current_hgt = float(position.get('hgt', 0.0))
+                self.current_nsat = position.get('nsat', 0)
+                self.current_gdop = float(position.get('gdop', 0.0))
+                self.current_clk_bias = float(position.get('clk_bias', 0.0))
+                self.update_progress_bar()
+                
+                if self.current_lat != 0.0 and self.current_lon != 0.0:
+                    if self.jamming_analysis_finished and self.jamming_events and not self.triangulation_started:
+                        first_jamming_start = self.jamming_events[0][0]
+                        if self.current_buffcnt < first_jamming_start:
+                            if (not self.last_position_before_jamming['valid'] or 
+                                self.current_buffcnt > self.last_position_before_jamming['buffcnt']):
+                                self.last_position_before_jamming = {
+                                    'lat': self.current_lat,
+                                    'lon': self.current_lon,
+                                    'hgt': self.current_hgt,
+                                    'buffcnt': self.current_buffcnt,
+                                    'valid': True
+                                }
+                    elif not self.triangulation_started:
+                        candidate_position = {
+                            'lat': self.current_lat,
+                            'lon': self.current_lon,
+                            'hgt': self.current_hgt,
+                            'buffcnt': self.current_buffcnt,
+                            'valid': True
+                        }
+                        if self.jamming_events:
+                            first_jamming_start = self.jamming_events[0][0]
+                            if self.current_buffcnt < first_jamming_start:
+                                if (not self.last_position_before_jamming['valid'] or 
+                                    self.current_buffcnt > self.last_position_before_jamming['buffcnt']):
+                                    self.last_position_before_jamming = candidate_position
+                        else:
+                            self.last_position_before_jamming = candidate_position
+                self.notify_pipeline()
+            
+            elapsed = data.get('elapsed_time', 'N/A')
+
+            text_output = f"[{elapsed}, {self.current_lat:.6f}, {self.current_lon:.6f}, {self.current_buffcnt}]"
+            self.gui_frames.add_text(text_output)
+            
+            should_update_gui = self.should_update_gui_position()
+            if self.current_lat != 0.0 or self.current_lon != 0.0:
+                if should_update_gui:
+                    self.gui_frames.add_position(self.current_lat, self.current_lon, self.current_hgt)
+        except Exception as e:
+            print(f"[WORKER] Błąd podczas przetwarzania danych JSON: {e}")
+            
+    def emit_gui_frame(self, text_lines, positions, progress):
+        if progress is not None:
+            self.progress_update.emit(*progress)
+        if text_lines:
+            self.new_analysis_text.emit('\n'.join(text_lines))
+        if positions:
+            self.new_position_batch.emit(positions)
+            self.new_position_data.emit(*positions[-1])
+
+    def update_progress_bar(self):
+        if self.total_samples > 0 and self.current_buffcnt > 0:
+            current_total = max(self.total_samples, self.estimated_total_samples)
+            progress_percent = min(100, int((self.current_buffcnt / current_total) * 100))
+
+            if progress_percent % 10 == 0 and progress_percent != getattr(self, '_last_logged_percent', -1):
+                print(f"[PROGRESS] Postęp: {progress_percent}% ({self.current_buffcnt}/{int(current_total)} próbek)")
+                self._last_logged_percent = progress_percent
+
+            in_jamming_range = self.is_in_jamming_range()
+            
+            if in_jamming_range:
+                if self.triangulation_thread and self.triangulation_thread.is_alive():
+                    self.gui_frames.set_progress(progress_percent, "triangulating")
+                else:
+                    self.gui_frames.set_progress(progress_percent, "jamming")
+            else:
+                self.gui_frames.set_progress(progress_percent, "normal")
+            
+            if self.current_buffcnt > self.estimated_total_samples:
+                old_estimate = self.estimated_total_samples
+                self.estimated_total_samples = self.current_buffcnt * 1.2 
+                #print(f"[PROGRESS] Aktualizacja szacowanej liczby próbek: {int(old_estimate)} → {int(self.estimated_total_samples)}")
+                
+        elif self.current_buffcnt > 0:
+            print(f"[PROGRESS] Fallback mode: próbka {self.current_buffcnt} (brak informacji o całkowitej liczbie)")
+            
+            estimated_file_samples = max(1000000, self.current_buffcnt * 2) # strzelamy
+            progress_percent = min(95, int((self.current_buffcnt / estimated_file_samples) * 100))
+            self.gui_frames.set_progress(progress_percent, "normal")
+        else:
+            self.gui_frames.set_progress(0, "normal")
+            
+    def get_current_position_data(self):
+        return {
+            'buffcnt': self.current_buffcnt,
+            'lat': self.current_lat,
+            'lon': self.current_lon,
+            'hgt': self.current_hgt,
+            'nsat': self.current_nsat,
+            'gdop': self.current_gdop,
+            'clk_bias': self.current_clk_bias
+        }
+    
+    def get_current_sample_number(self):
+        return self.current_buffcnt
+
+    def get_triangulation_result(self):
+        return self.triangulation_result
+    
+    def is_in_jamming_range(self):
+        if not self.jamming_analysis_finished or not self.jamming_events:
+            return False
+        for start, end in self.jamming_events:
+            if start <= self.current_buffcnt < end:
+                return True
+        
+        return False
+    
+    def should_update_gui_position(self):
+        if not self.jamming_analysis_finished:
+            return True
+        if not self.jamming_events:
+            return True
+        if self.is_in_jamming_range():
+            return False
+        return True
+
+    def on_jamming_detected(self, jamming_events_list):
+        self.jamming_events = jamming_events_list if jamming_events_list else []
+        
+        if self.jamming_events:
+            self.jamming_start_sample = self.jamming_events[0][0]
+            self.jamming_end_sample = self.jamming_events[0][1]
+            self.jamming_detected = True
+            
+            print(f"\n[JAMMING THREAD] Wykryto {len(self.jamming_events)} okres(ów) jammingu:")
+            for i, (start, end) in enumerate(self.jamming_events, 1):
+                duration = end - start
+                print(f"[JAMMING THREAD]   Zdarzenie {i}: próbki {start} - {end} (długość: {duration} próbek)")
+            
+            self.jamming_analysis_finished = True
+            
+            # Sprawdź pozycję referencyjną dla pierwszego zdarzenia
+            first_start = self.jamming_events[0][0]
+            if self.last_position_before_jamming['valid']:
+                if self.last_position_before_jamming['buffcnt'] < first_start:
+                    print(f"[JAMMING THREAD] ✅ ZATWIERDZONA pozycja przed jammingiem: "
+                          f"{self.last_position_before_jamming['lat']:.6f}, "
+                          f"{self.last_position_before_jamming['lon']:.6f} "
+                          f"(próbka {self.last_position_before_jamming['buffcnt']} < jamming {first_start})")
+                else:
+                    print(f"[JAMMING THREAD] ❌ ODRZUCONA pozycja - nie jest przed jammingiem!")
+                    print(f"[JAMMING THREAD]    Pozycja: próbka {self.last_position_before_jamming['buffcnt']} >= jamming {first_start}")
+                    # Wyczyść pozycję - nie jest przed jammingiem
+                    self.last_position_before_jamming = {
+                        'lat': 0.0, 'lon': 0.0, 'hgt': 0.0, 'buffcnt': 0, 'valid': False
+                    }
+                    print(f"[JAMMING THREAD]    Pozycja wyczyszczona - będzie aktualizowana przez nadchodzące dane gnssdec")
+            else:
+                print(f"[JAMMING THREAD] Brak zapisanej pozycji - będzie aktualizowana przez gnssdec")
+            if len(self.file_paths) >= 2:
+                print(f"[JAMMING THREAD] Triangulacja będzie uruchomiona PO zakończeniu gnssdec z ostatnią pozycją")
+            else:
+                print(f"[JAMMING THREAD] Pominięto triangulację - za mało plików ({len(self.file_paths)})")
+                
+        else:
+            self.jamming_detected = False
+            self.jamming_start_sample = None
+            self.jamming_end_sample = None
+            print(f"\n[JAMMING THREAD] Nie wykryto żadnego jammingu")
+            self.jamming_analysis_finished = True
+        self.notify_pipeline()
+
+    def notify_pipeline(self):
+        with self.pipeline_state:
+            self.pipeline_state.notify_all()
+
+    def wait_for_pipeline(self, predicate, timeout):
+        ## Czeka na zmianę stanu zamiast odpytywania; True, gdy predicate spełniony przed timeoutem
+        with self.pipeline_state:
+            return self.pipeline_state.wait_for(predicate, timeout)
+
+    def request_stop(self):
+        ## Zatrzymanie przez użytkownika - czekające wątki budzą się od razu
+        self.stop_requested = True
+        self.analysis_cancel.set()
+        self.jamming_follow_stop.set()
+        self.notify_pipeline()
+        if self.decoder:
+            self.decoder.terminate()
+
+    def get_test_files_for_triangulation(self):
+        test_files = []
+        base_dir = os.path.dirname(self.file_paths[0]) if self.file_paths else "../data"
+        num_files = len(self.file_paths)
+        
+        for i in range(min(num_files, 3)): 
+            test_filename = f"test{i+1}.bin"
+            test_path = os.path.join(base_dir, test_filename)
+            
+            if os.path.exists(test_path):
+                test_files.append(test_path)
+                #print(f"[TEST FILES] Znaleziono plik triangulacji: {test_filename}")
+            else:
+                #print(f"[TEST FILES] OSTRZEŻENIE: Nie znaleziono {test_filename} w {base_dir}")
+                if i < len(self.file_paths):
+                    test_files.append(self.file_paths[i])
+                    #print(f"[TEST FILES] Używam oryginalnego pliku: {os.path.basename(self.file_paths[i])}")
+        
+        if not test_files:
+            #print("[TEST FILES] Brak plików testowych - używam oryginalnych plików")
+            return self.file_paths
+        
+        return test_files
+
+    def run_triangulation(self, test_files, antenna_positions_meters, ref_lat, ref_lon):
+        ## Jeden punkt na zdarzenie albo trasa jammera (triangulation_window_s) - oba wyniki idą przez triangulation_complete
+        # Import dopiero przy triangulacji - analiza jednego pliku go nie potrzebuje
+        from triangulateRSSI import triangulate_jammer_location, triangulate_jammer_track
+        params = {
+            'file_paths': test_files,
+            'antenna_positions_meters': antenna_positions_meters,
+            'reference_lat': ref_lat,
+            'reference_lon': ref_lon,
+            'tx_power': 40.0,
+            'path_loss_exp': 3.0,
+            'frequency_mhz': 1575.42,
+            'threshold': self.power_threshold / 1000.0,
+            'verbose': False
+        }
+        if self.triangulation_window_s:
+            print(f"[TRIANGULATION THREAD] Trasa jammera w oknach po {self.triangulation_window_s} s")
+            return triangulate_jammer_track(window_s=self.triangulation_window_s, sample_rate_hz=self.sample_rate_hz, **params)
+        return triangulate_jammer_location(**params)
+
+    def on_triangulation_complete(self, result):
+        self.triangulation_result = result
+        if result['success']:
+            geo = result['location_geographic']
+            ref_pos = result.get('reference_position')
+            
+            print(f"\n[TRIANGULATION] ✅ TRIANGULACJA ZAKOŃCZONA SUKCESEM:")
+            print(f"[TRIANGULATION]    🎯 Jammer: {geo['lat']:.8f}°N, {geo['lon']:.8f}°E")
+            print(f"[TRIANGULATION]    📏 Odległości: {result['distances']}")
+            print(f"[TRIANGULATION]    📐 Metoda: {result['num_antennas']}-antenna triangulation")
+            if result.get('track'):
+                print(f"[TRIANGULATION]    🧭 Trasa jammera: {len(result['track'])} punktów co {result['track_window_s']} s")
+            
+            if ref_pos:
+                print(f"[TRIANGULATION]    📍 Pozycja referencyjna: {ref_pos['lat']:.8f}, {ref_pos['lon']:.8f}")
+                print(f"[TRIANGULATION]    🔢 Próbka referencyjna: {ref_pos['buffcnt']}")
+        else:
+            print(f"\n[TRIANGULATION] ❌ BŁĄD TRIANGULACJI: {result['message']}")
+
+    def analyze_jamming_in_background(self, file_path):
+        def on_jamming_start(start):
+            print(f"[JAMMING THREAD] 🚨 Początek jammingu: próbka {start}")
+            self.jamming_started.emit(start)
+
+        def on_jamming_stop(start, end):
+            print(f"[JAMMING THREAD] Koniec jammingu: próbki {start} - {end}")
+            self.jamming_stopped.emit(start, end)
+
+        def jamming_worker():
+            try:
+                print(f"[JAMMING THREAD] Rozpoczynanie analizy jammingu w pliku: {file_path}")
+                if self.follow_file:
+                    jamming_events = follow_file_for_jamming(
+                        file_path,
+                        self.power_threshold,
+                        stop_event=self.jamming_follow_stop,
+                        on_jamming_start=on_jamming_start,
+                        on_jamming_stop=on_jamming_stop
+                    )
+                else:
+                    profile = get_power_profile(file_path, CHUNK_SIZE_BYTES, cancel_event=self.analysis_cancel)
+                    if profile is None:
+                        print(f"[JAMMING THREAD] Analiza jammingu przerwana")
+                        return
+                    jamming_events = segment_jamming_events(
+                        profile['mean_power'],
+                        profile['sample_counts'],
+                        self.power_threshold,
+                        power_threshold_off=self.power_threshold_off,
+                        min_event_samples=self.min_event_samples,
+                        merge_gap_samples=self.merge_gap_samples
+                    )
+                
+                if jamming_events:
+                    print(f"[JAMMING THREAD] Analiza zakończona: wykryto {len(jamming_events)} okres(ów)")
+                    for i, (start, end) in enumerate(jamming_events, 1):
+                        print(f"[JAMMING THREAD]   Okres {i}: {start} - {end}")
+                else:
+                    print(f"[JAMMING THREAD] Analiza zakończona: brak jammingu")
+                
+                self.jamming_analysis_complete.emit(jamming_events)
+            except Exception as e:
+                print(f"[JAMMING THREAD] Błąd podczas analizy jammingu: {e}")
+                self.jamming_analysis_complete.emit([])
+        
+        self.jamming_thread = threading.Thread(target=jamming_worker)
+        self.jamming_thread.daemon = True
+        self.jamming_thread.start()
+
+    def analyze_triangulation_when_ready(self):
+        def triangulation_worker():
+            try:
+                if len(self.file_paths) < 2:
+                    self.triangulation_complete.emit({
+                        'success': False,
+                        'message': f'Triangulacja wymaga minimum 2 plików, masz {len(self.file_paths)}',
+                        'distances': None,
+                        'location_geographic': None,
+                        'num_antennas': len(self.file_paths)
+                    })
+                    return
+
+                print(f"[TRIANGULATION THREAD] Czekam na wykrycie jammingu i na to, by gnssdec przetworzył próbki do miejsca jammingu...")
+                wait_started = time.monotonic()
+
+                def jamming_known():
+                    return (self.stop_requested or (self.jamming_detected and self.jamming_events)
+                            or self.jamming_analysis_finished)
+
+                while not self.wait_for_pipeline(jamming_known, TRIANGULATION_STATUS_LOG_S):
+                    print(f"[TRIANGULATION THREAD] Czekam na wykrycie jammingu... ({time.monotonic() - wait_started:.0f}s)")
+                if self.stop_requested:
+                    print("[TRIANGULATION THREAD] Zatrzymano przez użytkownika")
+                    return
+                if not (self.jamming_detected and self.jamming_events):
+                    print("[TRIANGULATION THREAD] Brak jammingu - pomijam triangulację")
+                    return
+
+                start_sample = self.jamming_events[0][0]
+                num_events = len(self.jamming_events)
+                print(f"[TRIANGULATION THREAD] Wykryto {num_events} okres(ów) jammingu")
+                print(f"[TRIANGULATION THREAD] Triangulacja dla pierwszego okresu: start_sample={start_sample}")
+                print(f"[TRIANGULATION THREAD] Czekam na aktualizacje pozycji z gnssdec...")
+
+                # Budzi nas dokładnie ta epoka, która dochodzi do próbki jammingu (albo koniec gnssdec)
+                def jamming_sample_reached():
+                    return self.stop_requested or self.decoder_finished or self.current_buffcnt >= start_sample
+
+                deadline = wait_started + TRIANGULATION_MAX_WAIT_S
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if self.wait_for_pipeline(jamming_sample_reached, max(0.0, min(TRIANGULATION_STATUS_LOG_S, remaining))):
+                        break
+                    if remaining <= TRIANGULATION_STATUS_LOG_S:
+                        print(f"[TRIANGULATION THREAD] Oczekiwanie przekroczyło {TRIANGULATION_MAX_WAIT_S:.0f}s — używam najlepszej dostępnej pozycji przed jammigem.")
+                        break
+                    print(f"[TRIANGULATION THREAD] Czekam aż gnssdec osiągnie próbkę {start_sample}... (current_buffcnt={self.current_buffcnt}, waited={time.monotonic() - wait_started:.0f}s)")
+                if self.stop_requested:
+                    print("[TRIANGULATION THREAD] Zatrzymano przez użytkownika")
+                    return
+                if self.current_buffcnt < start_sample and self.decoder_finished:
+                    print(f"[TRIANGULATION THREAD] gnssdec zakończył przed próbką {start_sample} — używam najlepszej dostępnej pozycji przed jammingiem.")
+                wait_time = time.monotonic() - wait_started
+
+                if self.last_position_before_jamming['valid']:
+                    print(f"[TRIANGULATION THREAD] Jamming wykryty i posiadam pozycję przed jammingiem: próbka {self.last_position_before_jamming['buffcnt']} < jamming start: {start_sample}")
+                else:
+                    print(f"[TRIANGULATION THREAD] Brak zapisanej pozycji przed jammingiem — użyję fallbacku po current_lat/current_lon lub pozycji domyślnej")
+                
+                print(f"[TRIANGULATION THREAD] Gotowe do triangulacji po {wait_time:.3f}s oczekiwania")
+
+                self.triangulation_started = True
+                final_position = self.last_position_before_jamming.copy()
+                print(f"[TRIANGULATION THREAD] ZABLOKOWANIE pozycji referencyjnej: {final_position['lat']:.8f}, {final_position['lon']:.8f} (próbka {final_position['buffcnt']})")
+
+                print(f"[TRIANGULATION THREAD] Rozpoczynanie triangulacji z {len(self.file_paths)} plikami...")
+                
+                test_files = self.get_test_files_for_triangulation()
+                print(f"[TRIANGULATION THREAD] Używam plików triangulacji: {[os.path.basename(f) for f in test_files]}")
+                
+                if final_position['valid']:
+                    ref_lat = final_position['lat']
+                    ref_lon = final_position['lon']
+                    # do debugowania
+                    #print(f"[TRIANGULATION THREAD] FINALNA POZYCJA REFERENCYJNA:")
+                    #print(f"[TRIANGULATION THREAD] Współrzędne: {ref_lat:.8f}, {ref_lon:.8f}")
+                    #print(f"[TRIANGULATION THREAD] Próbka: {final_position['buffcnt']} (ostatnia przed jamming {self.jamming_start_sample})")
+                    #print(f"[TRIANGULATION THREAD] Różnica: {self.jamming_start_sample - final_position['buffcnt']} próbek przed jammingiem")
+                else:
+                    ref_lat = self.current_lat if self.current_lat != 0.0 else 50.00898
+                    ref_lon = self.current_lon if self.current_lon != 0.0 else 19.98287
+                    print(f"[TRIANGULATION THREAD] Punkt referencyjny (fallback): {ref_lat:.6f}, {ref_lon:.6f}")
+                    print(f"[TRIANGULATION THREAD] UWAGA: Brak zapisanej pozycji przed jammingiem!")
+                
+                # Przygotuj pozycje anten w formacie dla triangulate_jammer_location
+                # WAŻNE: Konwertuj listy na numpy arrays - algorytm wymaga arrays!
+                antenna_positions_meters = [
+                    np.array(self.antenna_positions['antenna1']),  # [0.0, 0.0] - zawsze punkt odniesienia
+                    np.array(self.antenna_positions['antenna2']),  # np. [0.5, 0.0]
+                    np.array(self.antenna_positions['antenna3'])   # np. [0.0, 0.5]
+                ]
+                
+                print(f"[TRIANGULATION THREAD] Pozycje anten przekazane do algorytmu:")
+                print(f"[TRIANGULATION THREAD]   Antena 1: x={antenna_positions_meters[0][0]:.3f}m, y={antenna_positions_meters[0][1]:.3f}m")
+                print(f"[TRIANGULATION THREAD]   Antena 2: x={antenna_positions_meters[1][0]:.3f}m, y={antenna_positions_meters[1][1]:.3f}m")
+                if len(test_files) >= 3:
+                    print(f"[TRIANGULATION THREAD]   Antena 3: x={antenna_positions_meters[2][0]:.3f}m, y={antenna_positions_meters[2][1]:.3f}m")
+                
+                result = self.run_triangulation(test_files, antenna_positions_meters, ref_lat, ref_lon)
+                
+                print(f"[TRIANGULATION THREAD] Triangulacja zakończona: sukces={result['success']}")
+                
+                if result['success'] and final_position['valid']:
+                    result['reference_position'] = {
+                        'lat': final_position['lat'],
+                        'lon': final_position['lon'],
+                        'buffcnt': final_position['buffcnt']
+                    }
+                
+                self.triangulation_complete.emit(result)
+                
+            except Exception as e:
+                print(f"[TRIANGULATION THREAD] Błąd podczas triangulacji: {e}")
+                self.triangulation_complete.emit({
+                    'success': False,
+                    'message': f'Błąd triangulacji: {str(e)}',
+                    'distances': None,
+                    'location_geographic': None,
+                    'num_antennas': len(self.file_paths) if hasattr(self, 'file_paths') else 0
+                })
+        
+        self.start_triangulation_thread(triangulation_worker)
+
+    def analyze_triangulation_after_gnssdec(self):
+        def triangulation_worker():
+            try:
+                if self.stop_requested:
+                    print("[TRIANGULATION THREAD] Zatrzymano przed rozpoczęciem")
+                    return
+                
+                if len(self.file_paths) < 2:
+                    self.triangulation_complete.emit({
+                        'success': False,
+                        'message': f'Triangulacja wymaga minimum 2 plików, masz {len(self.file_paths)}',
+                        'distances': None,
+                        'location_geographic': None,
+                        'num_antennas': len(self.file_paths)
+                    })
+                    return
+
+                print(f"[TRIANGULATION THREAD] Rozpoczynanie triangulacji po zakończeniu gnssdec z {len(self.file_paths)} plikami...")
+                
+                test_files = self.get_test_files_for_triangulation()
+                print(f"[TRIANGULATION THREAD] Używam plików triangulacji: {[os.path.basename(f) for f in test_files]}")
+                final_position = None
+                
+                if self.jamming_detected and self.last_position_before_jamming['valid']:
+                    final_position = self.last_position_before_jamming.copy()
+                    ref_lat = final_position['lat']
+                    ref_lon = final_position['lon']
+                    #print(f"[TRIANGULATION THREAD]   FINALNA POZYCJA REFERENCYJNA (przed jammingiem):")
+                    #print(f"[TRIANGULATION THREAD]    Współrzędne: {ref_lat:.8f}, {ref_lon:.8f}")
+                    #print(f"[TRIANGULATION THREAD]    Próbka: {final_position['buffcnt']} (ostatnia przed jamming {self.jamming_start_sample})")
+                    #print(f"[TRIANGULATION THREAD]    Różnica: {self.jamming_start_sample - final_position['buffcnt']} próbek przed jammingiem")
+                elif self.current_lat != 0.0 and self.current_lon != 0.0:
+                    final_position = {
+                        'lat': self.current_lat,
+                        'lon': self.current_lon,
+                        'hgt': self.current_hgt,
+                        'buffcnt': self.current_buffcnt,
+                        'valid': True
+                    }
+                    ref_lat = final_position['lat']
+                    ref_lon = final_position['lon']
+                    #print(f"[TRIANGULATION THREAD] FINALNA POZYCJA REFERENCYJNA:")
+                    print(f"[TRIANGULATION THREAD] Współrzędne: {ref_lat:.8f}, {ref_lon:.8f}")
+                    #print(f"[TRIANGULATION THREAD] Próbka: {final_position['buffcnt']}")
+                else:
+                    ref_lat = 50.00898
+                    ref_lon = 19.98287
+                    print(f"[TRIANGULATION THREAD] Punkt referencyjny (fallback): {ref_lat:.6f}, {ref_lon:.6f}")
+                    print(f"[TRIANGULATION THREAD] UWAGA: Brak zapisanej pozycji!")
+                antenna_positions_meters = [
+                    np.array(self.antenna_positions['antenna1']),  # [0.0, 0.0] - zawsze punkt odniesienia
+                    np.array(self.antenna_positions['antenna2']),  # np. [0.5, 0.0]
+                    np.array(self.antenna_positions['antenna3'])   # np. [0.0, 0.5]
+                ]
+                
+                print(f"[TRIANGULATION THREAD] Pozycje anten przekazane do algorytmu:")
+                print(f"[TRIANGULATION THREAD]   Antena 1: x={antenna_positions_meters[0][0]:.3f}m, y={antenna_positions_meters[0][1]:.3f}m")
+                print(f"[TRIANGULATION THREAD]   Antena 2: x={antenna_positions_meters[1][0]:.3f}m, y={antenna_positions_meters[1][1]:.3f}m")
+                if len(test_files) >= 3:
+                    print(f"[TRIANGULATION THREAD]   Antena 3: x={antenna_positions_meters[2][0]:.3f}m, y={antenna_positions_meters[2][1]:.3f}m")
+                
+                result = self.run_triangulation(test_files, antenna_positions_meters, ref_lat, ref_lon)
+                
+                print(f"[TRIANGULATION THREAD] Triangulacja zakończona: sukces={result['success']}")
+
+                if result['success'] and final_position and final_position['valid']:
+                    result['reference_position'] = {
+                        'lat': final_position['lat'],
+                        'lon': final_position['lon'],
+                        'buffcnt': final_position['buffcnt']
+                    }
+                
+                self.triangulation_complete.emit(result)
+                
+            except Exception as e:
+                print(f"[TRIANGULATION THREAD] Błąd podczas triangulacji: {e}")
+                self.triangulation_complete.emit({
+                    'success': False,
+                    'message': f'Błąd triangulacji: {str(e)}',
+                    'distances': None,
+                    'location_geographic': None,
+                    'num_antennas': len(self.file_paths) if hasattr(self, 'file_paths') else 0
+                })
+        
+        self.start_triangulation_thread(triangulation_worker)
+
+    def start_triangulation_thread(self, triangulation_worker):
+        ## Wątek triangulacji, który na koniec (także po błędzie/zatrzymaniu) budzi czekające run()
+        def run_worker():
+            try:
+                triangulation_worker()
+            finally:
+                self.triangulation_finished = True
+                self.notify_pipeline()
+
+        self.triangulation_finished = False
+        self.triangulation_thread = threading.Thread(target=run_worker)
+        self.triangulation_thread.daemon = True
+        self.triangulation_thread.start()
+
+    def wait_for_triangulation(self):
+        ## Czeka na koniec triangulacji bez limitu czasu; zatrzymanie przez użytkownika przerywa od razu
+        wait_started = time.monotonic()
+
+        def triangulation_done():
+            return self.triangulation_finished or self.stop_requested
+
+        while not self.wait_for_pipeline(triangulation_done, TRIANGULATION_STATUS_LOG_S):
+            print(f"[WORKER] Triangulacja trwa... ({time.monotonic() - wait_started:.0f}s)")
+        if not self.triangulation_finished:
+            print("[WORKER] Analiza zatrzymana w trakcie triangulacji.")
+            return False
+        return True
+
+    def run(self):
+        self.stop_requested = False
+        self.decoder_finished = False
+        
+        try:
+            self.ingest_server = EpochIngestServer(self.process_incoming_data, port=self.ingest_port)
+            ingest_port = self.ingest_server.start()
+            self.gui_frames.start()
+            print(f"[WORKER] Odbiornik danych (NDJSON/TCP) uruchomiony na porcie {ingest_port}.") 
+            
+        except Exception as e:
+            print(f"[WORKER] BŁĄD: Nie można uruchomić odbiornika danych na porcie {self.ingest_port}: {e}")
+            self.ingest_server = None
+            self.analysis_complete.emit([])
+            return
+        
+        file1 = self.file_paths[0] if self.file_paths else None
+        
+        if not file1 or not os.path.exists(file1):
+            print(f"BŁĄD: Plik {file1} nie istnieje. Przerwanie.")
+            self.shutdown_server()
+            self.analysis_complete.emit([])
+            return
+            
+        if not os.path.exists(self.gnssdec_path):
+            print(f"BŁĄD: Nie znaleziono programu {self.gnssdec_path}. Przerwanie.")
+            self.shutdown_server()
+            self.analysis_complete.emit([])
+            return
+        self.analyze_jamming_in_background(file1)
+        if len(self.file_paths) >= 2:
+            self.analyze_triangulation_when_ready()
+        
+        legacy_locked = False
+        try:
+            print(f"[WORKER] Uruchamianie analizy {self.gnssdec_path}...")
+            print(f"[WORKER] System satelitarny: {self.satellite_system} (flaga: {self.gnss_system_flag})")
+            print(f"[WORKER] Utrzymuj pozycję: {self.hold_position}")
+            
+            stdout_parser = None
+            if not decoder_supports_ingest_port(self.gnssdec_path):
+                print(f"[WORKER] gnssdec nie obsługuje -p (stara binarka) - odbiór epok przez POST /data na porcie {LEGACY_HTTP_PORT}")
+                if self.binary_epochs or self.stdout_epochs:
+                    print("[WORKER] Epoki binarne (-b) i ze stdout wymagają przebudowanego gnssdec - pomijam")
+                # Stały port - analizy ze starym gnssdec (np. app.batch -j N) czekają na swoją kolejkę
+                _LEGACY_HTTP_LOCK.acquire()
+                legacy_locked = True
+                self.legacy_receiver = LegacyHttpEpochReceiver(self.ingest_server)
+                self.legacy_receiver.start()
+                gnssdec_command = [self.gnssdec_path, self.gnss_system_flag]
+            elif self.stdout_epochs:
+                stdout_parser = StdoutEpochParser(self.ingest_server.submit)
+                gnssdec_command = [self.gnssdec_path, self.gnss_system_flag, '-p', '0']
+            else:
+                gnssdec_command = [self.gnssdec_path, self.gnss_system_flag, '-p', str(ingest_port)]
+            if self.hold_position:
+                gnssdec_command.append('-h')
+            if self.binary_epochs and not self.stdout_epochs and not self.legacy_receiver:
+                gnssdec_command.append('-b')
+            gnssdec_command.append(file1)
+            
+            self.decoder = DecoderProcess(gnssdec_command, on_line=stdout_parser.feed if stdout_parser else None)
+            self.decoder.start()
+            if self.stop_requested:
+                self.decoder.terminate()
+            returncode = self.decoder.wait()
+            if stdout_parser:
+                stdout_parser.finish()
+            usage = self.decoder.usage
+            print(f"[WORKER] gnssdec (PID {self.decoder.pid}): szczyt RSS {usage['peak_rss_kb'] / 1024:.1f} MiB, "
+                  f"CPU {usage['user_cpu_s']:.2f} s user + {usage['system_cpu_s']:.2f} s sys, "
+                  f"linii wyjścia {self.decoder.output_lines}")
+            if self.stop_requested:
+                print(f"[WORKER] Analiza {self.gnssdec_path} przerwana przez użytkownika.")
+            elif returncode != 0:
+                print(f"BŁĄD: Proces {self.gnssdec_path} zakończył się błędem (kod {returncode})!")
+                print(self.decoder.output_summary())
+            else:
+                print(f"[WORKER] Analiza {self.gnssdec_path} zakończona.")
+            
+        except Exception as e:
+            print(f"Nieoczekiwany błąd podczas uruchamiania gnssdec: {e}")
+            
+        finally:
+            # Najpierw ostatnia klatka z epok, potem stan końcowy paska postępu
+            self.stop_ingest()
+            if legacy_locked:
+                _LEGACY_HTTP_LOCK.release()
+            self.progress_update.emit(100, "completed")
+            # Więcej epok nie będzie - triangulacja czekająca na próbkę jammingu rusza od razu
+            self.decoder_finished = True
+            self.notify_pipeline()
+            
+            # Na triangulację czeka wait_for_triangulation niżej, nie join z limitem w shutdown_server
+            self.shutdown_server(wait_triangulation=False)
+            print("[WORKER] Analiza gnssdec zakończona.")
+            
+            if self.stop_requested:
+                print("[WORKER] Analiza zatrzymana - pomijam triangulację.")
+            elif self.triangulation_thread and not self.triangulation_finished:
+                print("[WORKER] Czekanie na zakończenie triangulacji (uruchomionej równolegle)...")
+                if self.wait_for_triangulation():
+                    print("[WORKER] Triangulacja równoległa zakończona.")
+            elif (len(self.file_paths) >= 2 and not self.triangulation_started
+                  and not (self.jamming_analysis_finished and not self.jamming_events)):
+                print("[WORKER] Uruchamiam triangulację")
+                self.analyze_triangulation_after_gnssdec()
+                if self.triangulation_thread:
+                    print("[WORKER] Czekam na zakończenie triangulacji...")
+                    if self.wait_for_triangulation():
+                        print("[WORKER] Triangulacja zakończona.")
+
+            print("[WORKER] Wątek zakończył pracę. Odblokowanie UI.")
+
+            if self.stop_requested:
+                # Przerwane z GUI - stop_analysis już odblokowało UI, częściowych wyników nie wysyłamy
+                print("[WORKER] Analiza zatrzymana - pomijam wyniki.")
+            elif self.jamming_detected and self.jamming_events:
+                result_info = []
+                for i, (start, end) in enumerate(self.jamming_events):
+                    result_info.append({
+                        'type': 'jamming',
+                        'event_number': i + 1,
+                        'start_sample': start,
+                        'end_sample': end,
+                        'duration': end - start,
+                        'triangulation': self.triangulation_result if i == 0 else None  # Tylko pierwszy ma triangulację
+                    })
+                self.analysis_complete.emit(result_info)
+            else:
+                result_info = [{
+                    'type': 'no_jamming',
+                    'triangulation': self.triangulation_result
+                }]
+                self.analysis_complete.emit(result_info)
+
+    def stop_ingest(self):
+        if self.legacy_receiver:
+            self.legacy_receiver.stop()
+            self.legacy_receiver = None
+        if self.ingest_server:
+            print("[WORKER] Zamykanie odbiornika danych...")
+            self.ingest_server.stop()
+            stats = self.ingest_server.stats()
+            self.ingest_server = None
+            print(f"[WORKER] Odbiornik danych zamknięty. Epoki: przetworzone {stats['processed']}, "
+                  f"scalone z następnymi {stats['coalesced']}, odrzucone {stats['dropped']}, "
+                  f"pominięte przez gnssdec {self.decoder_dropped_epochs}.")
+        self.gui_frames.stop()
+
+    def shutdown_server(self, wait_triangulation=True):
+        self.stop_ingest()
+        
+        if self.jamming_thread and self.jamming_thread.is_alive():
+            self.jamming_follow_stop.set()
+            print("[WORKER] Czekam na zakończenie analizy jammingu...")
+            self.jamming_thread.join(timeout=5)
+            if self.jamming_thread.is_alive():
+                print("[WORKER] ⚠️ OSTRZEŻENIE: Analiza jammingu nadal trwa w tle...")
+            else:
+                print("[WORKER] Analiza jammingu zakończona.")
+        
+        if wait_triangulation and self.triangulation_thread and self.triangulation_thread.is_alive():
+            print("[WORKER] Czekam na zakończenie triangulacji...")
+            self.notify_pipeline()
+            self.triangulation_thread.join(timeout=3)
+            if self.triangulation_thread.is_alive():
+                print("[WORKER] ⚠️ OSTRZEŻENIE: Triangulacja nadal trwa (zostanie zatrzymana automatycznie)...")
+            else:
+                print("[WORKER] Triangulacja zakończona.")
+
+    def use_get_data(self):
+        if self.current_buffcnt > 0:
+            print(f"Aktualny buffcnt: {self.current_buffcnt}")
+            print(f"Pozycja: {self.current_lat}, {self.current_lon}")
+        
+        data = self.get_current_position_data()
+        if data['buffcnt'] > 0:
+            print(f"Kompletne dane: {data}")
+
@@ -0,0 +1,335 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import queue
+import sys
+import threading
+from collections import deque
+import numpy as np
+from .analysis import GPSAnalysis
+
+# ==============================================================================
+#   ANALIZA WSADOWA: KOLEJKA NAGRAŃ, N RÓWNOLEGŁYCH GNSSDEC, WZNAWIANIE
+# ==============================================================================
+#
+# Uruchamianie (z katalogu GpsJammerApp, bez PySide6):
+#   python -m app.batch -o wyniki nagranie1.bin nagranie2.bin ant1.bin,ant2.bin,ant3.bin
+#
+# Każdy argument to jedno zadanie; pliki po przecinku to anteny jednego zadania (triangulacja).
+# Dla zadania powstają <nazwa>.track.csv (fiksy) i <nazwa>.result.json (jamming, triangulacja,
+# zużycie zasobów gnssdec). result.json jest zapisywany na końcu, atomowo - jest znacznikiem
+# ukończenia: po awarii ponowne uruchomienie pomija zadania z aktualnym wynikiem.
+
+RESULT_SUFFIX = '.result.json'
+TRACK_SUFFIX = '.track.csv'
+RESULT_VERSION = 1
+TRACK_COLUMNS = ['elapsed_time', 'buffcnt', 'lat', 'lon', 'hgt', 'nsat', 'gdop', 'clk_bias']
+# Pasek postępu i tekst w trybie wsadowym nikogo nie interesują - rzadkie klatki
+BATCH_GUI_RATE_HZ = 1.0
+DEFAULT_ANTENNA_POSITIONS = [[0.0, 0.0], [0.5, 0.0], [0.0, 0.5]]
+
+
+def default_worker_count():
+    # gnssdec przypina się do wszystkich rdzeni poza dwoma ostatnimi
+    return max(1, (os.cpu_count() or 1) - 2)
+
+
+def _json_default(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Nie można zapisać {type(value).__name__} do JSON")
+
+
+def _input_key(path):
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def analysis_kwargs(settings, gui_rate_hz=BATCH_GUI_RATE_HZ):
+    ## Ustawienia zadania -> argumenty GPSAnalysis (jak w ui_mainwindow.start_analysis)
+    threshold = settings['threshold']
+    return {
+        'power_threshold': threshold,
+        'antenna_positions': settings['antenna_positions'],
+        'satellite_system': settings['satellite_system'],
+        'hold_position': settings['hold_position'],
+        'binary_epochs': settings['binary_epochs'],
+        'detection_params': {
+            'threshold_off': threshold * (1.0 - settings['hysteresis_percent'] / 100.0),
+            'min_event_ms': settings['min_event_ms'],
+            'merge_gap_ms': settings['merge_gap_ms'],
+            'sample_rate_hz': settings['sample_rate_hz']
+        },
+        'gui_rate_hz': gui_rate_hz,
+        'triangulation_window_s': settings['track_window_s'] or None
+    }
+
+
+class _TrackRecordingAnalysis(GPSAnalysis):
+    ## GPSAnalysis, która dodatkowo zapisuje każdą epokę z pozycją do CSV zadania
+
+    def __init__(self, file_paths, track_writer, **kwargs):
+        super().__init__(file_paths, **kwargs)
+        self.track_writer = track_writer
+        self.track_points = 0
+
+    def process_incoming_data(self, data):
+        result = super().process_incoming_data(data)
+        position = data.get('position') or {}
+        if position.get('lat') and position.get('lon'):
+            self.track_writer.writerow([
+                data.get('elapsed_time'), position.get('buffcnt'), position['lat'], position['lon'],
+                position.get('hgt'), position.get('nsat'), position.get('gdop'), position.get('clk_bias')
+            ])
+            self.track_points += 1
+        return result
+
+
+class BatchJob:
+    ## Jedno zadanie: pliki anten, stabilna nazwa wyników (nazwa pierwszego pliku + skrót ścieżek)
+
+    def __init__(self, file_paths, output_dir):
+        self.file_paths = file_paths
+        digest = hashlib.sha1('\n'.join(os.path.abspath(p) for p in file_paths).encode()).hexdigest()[:8]
+        stem = os.path.splitext(os.path.basename(file_paths[0]))[0]
+        self.name = f"{stem}_{digest}"
+        self.result_path = os.path.join(output_dir, self.name + RESULT_SUFFIX)
+        self.track_path = os.path.join(output_dir, self.name + TRACK_SUFFIX)
+        self.analysis = None
+        self.status = None
+
+    def inputs(self):
+        return [_input_key(p) for p in self.file_paths]
+
+    def is_done(self, settings):
+        ## Wynik istnieje i dotyczy tych samych plików (rozmiar, mtime) oraz tych samych ustawień
+        try:
+            with open(self.result_path, encoding='utf-8') as f:
+                result = json.load(f)
+            return (result.get('version') == RESULT_VERSION and result.get('status') == 'ok'
+                    and result.get('inputs') == self.inputs() and result.get('settings') == settings)
+        except (OSError, ValueError):
+            return False
+
+    def prepare(self, settings, gui_rate_hz=BATCH_GUI_RATE_HZ):
+        ## Tworzy analizę (można podłączyć jej sygnały przed run) z CSV trasy w pliku tymczasowym
+        self.track_file = open(self.track_path + '.tmp', 'w', newline='', encoding='utf-8')
+        writer = csv.writer(self.track_file)
+        writer.writerow(TRACK_COLUMNS)
+        self.settings = settings
+        self.analysis = _TrackRecordingAnalysis(self.file_paths, writer, **analysis_kwargs(settings, gui_rate_hz))
+        return self.analysis
+
+    def run(self):
+        ## Analiza w bieżącym wątku, potem CSV i result.json (przerwane zadanie nie zostawia wyniku)
+        try:
+            self.analysis.run()
+        finally:
+            self.track_file.close()
+        analysis = self.analysis
+        decoder = analysis.decoder
+        if analysis.stop_requested:
+            self.status = 'stopped'
+        elif decoder is None or decoder.returncode != 0:
+            self.status = 'failed'
+        else:
+            self.status = 'ok'
+
+        if self.status == 'stopped':
+            os.remove(self.track_path + '.tmp')
+        else:
+            os.replace(self.track_path + '.tmp', self.track_path)
+            self.write_result()
+        return self.status
+
+    def write_result(self):
+        analysis = self.analysis
+        decoder = analysis.decoder
+        result = {
+            'version': RESULT_VERSION,
+            'status': self.status,
+            'inputs': self.inputs(),
+            'settings': self.settings,
+            'track_file': os.path.basename(self.track_path),
+            'track_points': analysis.track_points,
+            'jamming_events': [
+                {'start_sample': start, 'end_sample': end, 'duration': end - start}
+                for start, end in analysis.jamming_events
+            ],
+            'triangulation': analysis.triangulation_result,
+            'decoder': {
+                'returncode': decoder.returncode if decoder else None,
+                'usage': decoder.usage if decoder else None,
+                'dropped_epochs': analysis.decoder_dropped_epochs,
+                'output_tail': decoder.output_summary() if decoder and decoder.returncode != 0 else None
+            }
+        }
+        tmp_path = self.result_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False, default=_json_default)
+        os.replace(tmp_path, self.result_path)
+
+    def request_stop(self):
+        if self.analysis:
+            self.analysis.request_stop()
+
+
+class BatchRunner:
+    ## Kolejka zadań i pula do `workers` wątków analizy naraz. Każde zadanie ma własny odbiornik
+    ## epok na porcie efemerycznym i własny proces gnssdec, więc nie dzielą niczego poza CPU.
+
+    def __init__(self, jobs, output_dir, settings, workers=None, force=False):
+        self.output_dir = output_dir
+        self.settings = settings
+        self.workers = workers or default_worker_count()
+        self.pending = deque()
+        self.running = []
+        self.finished = queue.Queue()
+        self.summary = {'ok': 0, 'failed': 0, 'skipped': 0, 'stopped': 0}
+        self.stopping = False
+        for job in jobs:
+            if not force and job.is_done(settings):
+                print(f"[BATCH] Pomijam {job.name} - wynik aktualny")
+                self.summary['skipped'] += 1
+            else:
+                self.pending.append(job)
+
+    def run(self):
+        if not self.pending:
+            return self.summary
+        os.makedirs(self.output_dir, exist_ok=True)
+        print(f"[BATCH] Zadań do wykonania: {len(self.pending)}, równolegle: {self.workers}")
+        self.start_next_jobs()
+        while self.running:
+            try:
+                job = self.finished.get()
+            except KeyboardInterrupt:
+                self.request_stop()
+                continue
+            self.running.remove(job)
+            self.summary[job.status or 'failed'] += 1
+            print(f"[BATCH] {job.name}: {job.status} ({job.analysis.track_points} fiksów, "
+                  f"{len(job.analysis.jamming_events)} okres(ów) jammingu)")
+            self.start_next_jobs()
+        print(f"[BATCH] Koniec: ok {self.summary['ok']}, błędy {self.summary['failed']}, "
+              f"pominięte {self.summary['skipped']}, przerwane {self.summary['stopped']}")
+        return self.summary
+
+    def start_next_jobs(self):
+        while not self.stopping and self.pending and len(self.running) < self.workers:
+            self.start_job(self.pending.popleft())
+
+    def start_job(self, job):
+        job.prepare(self.settings)
+        self.running.append(job)
+        print(f"[BATCH] Start {job.name}: {', '.join(job.file_paths)}")
+        threading.Thread(target=self._run_job, args=(job,), daemon=True).start()
+
+    def _run_job(self, job):
+        try:
+            job.run()
+        except Exception as e:
+            print(f"[BATCH] {job.name}: błąd {e}")
+        finally:
+            self.finished.put(job)
+
+    def request_stop(self):
+        ## Ctrl+C: nowe zadania nie startują, bieżące gnssdec dostają SIGTERM
+        if self.stopping:
+            return
+        print("\n[BATCH] Zatrzymywanie - przerwane zadania zostaną wykonane przy wznowieniu")
+        self.stopping = True
+        self.pending.clear()
+        for job in self.running:
+            job.request_stop()
+
+
+def parse_antenna(value):
+    try:
+        x, y = (float(v) for v in value.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"oczekiwano x,y w metrach, jest '{value}'")
+    return [x, y]
+
+
+def add_analysis_arguments(parser):
+    ## Opcje analizy wspólne dla app.batch i app.cli
+    parser.add_argument('--system', choices=['GPS', 'GLONASS', 'Galileo'], default='GPS')
+    parser.add_argument('--threshold', type=float, default=120.0, help="próg mocy detekcji jammingu")
+    parser.add_argument('--hysteresis-percent', type=float, default=0.0)
+    parser.add_argument('--min-event-ms', type=float, default=0.0)
+    parser.add_argument('--merge-gap-ms', type=float, default=0.0)
+    parser.add_argument('--sample-rate', type=float, default=2.048, metavar='MHZ',
+                        help="częstotliwość próbkowania nagrań w MHz")
+    parser.add_argument('--antenna', type=parse_antenna, action='append', metavar='X,Y',
+                        help="pozycja anteny w metrach (powtórz dla anten 1-3)")
+    parser.add_argument('--hold', action='store_true', help="gnssdec -h (utrzymanie pozycji)")
+    parser.add_argument('--binary', action='store_true', help="gnssdec -b (binarne epoki)")
+    parser.add_argument('--track-window', type=float, default=0.0, metavar='S',
+                        help="trasa jammera: lokalizacja co S sekund zamiast jednego punktu (0 = wyłączone)")
+
+
+def settings_from_args(parser, args):
+    antennas = args.antenna or []
+    if len(antennas) > 3:
+        parser.error("najwyżej 3 anteny")
+    antennas = antennas + DEFAULT_ANTENNA_POSITIONS[len(antennas):]
+    if args.track_window < 0:
+        parser.error("--track-window nie może być ujemne")
+    if args.sample_rate <= 0:
+        parser.error("--sample-rate musi być dodatnie")
+    return {
+        'satellite_system': args.system,
+        'threshold': args.threshold,
+        'hysteresis_percent': args.hysteresis_percent,
+        'min_event_ms': args.min_event_ms,
+        'merge_gap_ms': args.merge_gap_ms,
+        'sample_rate_hz': args.sample_rate * 1e6,
+        'antenna_positions': {f'antenna{i + 1}': pos for i, pos in enumerate(antennas)},
+        'hold_position': args.hold,
+        'binary_epochs': args.binary,
+        'track_window_s': args.track_window
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m app.batch',
+        description="Wsadowa analiza nagrań IQ: jamming, fiksy gnssdec i triangulacja, kilka plików naraz."
+    )
+    parser.add_argument('jobs', nargs='*', help="nagranie albo pliki anten jednego zadania po przecinku")
+    parser.add_argument('--jobs-file', help="plik z zadaniami, jedno na linię (jak argumenty)")
+    parser.add_argument('-o', '--output-dir', required=True, help="katalog na wyniki zadań")
+    parser.add_argument('-j', '--workers', type=int, default=default_worker_count(),
+                        help="liczba równoległych zadań (domyślnie liczba rdzeni - 2)")
+    parser.add_argument('--force', action='store_true', help="licz od nowa także zadania z aktualnym wynikiem")
+    add_analysis_arguments(parser)
+    args = parser.parse_args(argv)
+    settings = settings_from_args(parser, args)
+
+    job_specs = list(args.jobs)
+    if args.jobs_file:
+        with open(args.jobs_file, encoding='utf-8') as f:
+            job_specs.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    if not job_specs:
+        parser.error("brak zadań")
+
+    jobs = []
+    for spec in job_specs:
+        file_paths = [p for p in spec.split(',') if p]
+        missing = [p for p in file_paths if not os.path.exists(p)]
+        if missing:
+            print(f"[BATCH] Pomijam zadanie '{spec}' - brak plików: {', '.join(missing)}")
+            continue
+        jobs.append(BatchJob(file_paths, args.output_dir))
+
+    summary = BatchRunner(jobs, args.output_dir, settings, args.workers, args.force).run()
+    return 1 if summary['failed'] or summary['stopped'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
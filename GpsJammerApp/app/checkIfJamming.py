@@ -1,8 +1,27 @@
 import numpy as np
 import sys
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'skrypty'))
+from iqPower import chunk_mean_power
+from powerProfile import count_chunks, compute_chunk_stats, get_power_profile, load_power_profile
 
 CHUNK_SIZE_BYTES = 131072
+SAMPLE_RATE_HZ = 2048000
+# Polling rosnącego pliku co czas trwania jednego chunka przy 2.048 MS/s (~32 ms)
+FOLLOW_POLL_INTERVAL_S = (CHUNK_SIZE_BYTES // 2) / SAMPLE_RATE_HZ
+# Minimalny zakres pracy jednego procesu w trybie równoległym (256 * 128 KiB = 32 MiB)
+PARALLEL_MIN_RANGE_CHUNKS = 256
+# Tryb --sledz z linii poleceń kończy się, gdy plik nie rośnie przez tyle sekund
+FOLLOW_IDLE_TIMEOUT_S = 10.0
+# Kalibracja: próg = mediana mocy szumu * współczynnik
+CALIBRATION_MEDIAN_FACTOR = 4.8
+# Kalibracja przybliżona: liczba równo rozłożonych chunków i przedział ufności mediany (~95%)
+CALIBRATION_SAMPLE_CHUNKS = 256
+CALIBRATION_CONFIDENCE_Z = 1.96
+# Szerszy względny przedział ufności mediany wymusza pełny skan
+CALIBRATION_MAX_RELATIVE_WIDTH = 0.05
 
 def analyze_chunk_power(
     raw_uint8_chunk: np.ndarray, 
@@ -12,18 +31,159 @@ def analyze_chunk_power(
     if raw_uint8_chunk.size % 2 != 0 or raw_uint8_chunk.size == 0:
         return False, 0.0
 
-    iq_samples_f32 = (raw_uint8_chunk.astype(np.float32) - 127.5)
-    iq_complex = iq_samples_f32[0::2] + 1j * iq_samples_f32[1::2]
-    average_power = np.mean(np.abs(iq_complex)**2)
+    average_power = chunk_mean_power(raw_uint8_chunk)
     is_jamming_now = average_power > power_threshold
     
     return is_jamming_now, average_power
 
-def analyze_file_for_jamming(file_path: str, power_threshold: float) -> list:
-    current_jamming_state = False 
-    total_samples_processed = 0
-    jamming_events = [] 
-    current_jamming_start = None
+class JammingEdgeDetector:
+    ## Maszyna stanów zbocza progu, karmiona chunk po chunku (plik, ogon rosnącego pliku)
+    def __init__(self):
+        self.current_jamming_state = False
+        self.current_jamming_start = None
+        self.total_samples_processed = 0
+        self.jamming_events = []
+
+    def update(self, is_jamming_now: bool, num_new_samples: int):
+        ## Zwraca 'start', 'stop' albo None
+        event = None
+        timestamp_sample = self.total_samples_processed
+
+        if is_jamming_now and not self.current_jamming_state:
+            self.current_jamming_start = timestamp_sample
+            event = 'start'
+        elif not is_jamming_now and self.current_jamming_state:
+            if self.current_jamming_start is not None:
+                self.jamming_events.append((self.current_jamming_start, timestamp_sample))
+                self.current_jamming_start = None
+                event = 'stop'
+
+        self.current_jamming_state = bool(is_jamming_now)
+        self.total_samples_processed += num_new_samples
+        return event
+
+    def finish(self):
+        ## Zamyka otwarty okres na końcu danych
+        if self.current_jamming_state and self.current_jamming_start is not None:
+            self.jamming_events.append((self.current_jamming_start, self.total_samples_processed))
+            self.current_jamming_start = None
+            self.current_jamming_state = False
+            return 'stop'
+        return None
+
+def count_file_chunks(file_path: str) -> int:
+    ## Liczba chunków z co najmniej jedną próbką (ostatni może być niepełny)
+    return count_chunks(os.path.getsize(file_path), CHUNK_SIZE_BYTES)
+
+def compute_chunk_powers(
+    file_path: str,
+    chunk_start: int = 0,
+    chunk_stop: int = None
+) -> tuple[np.ndarray, np.ndarray]:
+    ## Średnia moc każdego chunka pliku (memmap, bez czytania do pamięci) + liczba próbek w chunku.
+    ## chunk_start/chunk_stop ograniczają skan do zakresu chunków (granice zawsze na parach IQ).
+    stats = compute_chunk_stats(file_path, CHUNK_SIZE_BYTES, chunk_start, chunk_stop)
+    return stats['mean_power'], stats['sample_counts']
+
+def _compute_range_powers(task: tuple) -> tuple[np.ndarray, np.ndarray]:
+    file_path, chunk_start, chunk_stop = task
+    return compute_chunk_powers(file_path, chunk_start, chunk_stop)
+
+def split_chunk_ranges(n_chunks: int, max_workers: int) -> list:
+    ## Podział [0, n_chunks) na zakresy chunków - kilka na proces, żeby wyrównać obciążenie
+    range_size = max(PARALLEL_MIN_RANGE_CHUNKS, -(-n_chunks // (max_workers * 4)))
+    return [(start, min(start + range_size, n_chunks)) for start in range(0, n_chunks, range_size)]
+
+def compute_chunk_powers_parallel(
+    file_paths: list,
+    max_workers: int = None
+) -> list:
+    ## Moce chunków dla wielu plików liczone w puli procesów; wyniki sklejane w kolejności zakresów
+    max_workers = max_workers or os.cpu_count() or 1
+    tasks = []
+    for file_index, file_path in enumerate(file_paths):
+        for chunk_start, chunk_stop in split_chunk_ranges(count_file_chunks(file_path), max_workers):
+            tasks.append((file_index, (file_path, chunk_start, chunk_stop)))
+
+    per_file_parts = [[] for _ in file_paths]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(_compute_range_powers, [task for _, task in tasks])
+        for (file_index, _), part in zip(tasks, results):
+            per_file_parts[file_index].append(part)
+
+    profiles = []
+    for parts in per_file_parts:
+        if parts:
+            profiles.append((np.concatenate([p for p, _ in parts]), np.concatenate([c for _, c in parts])))
+        else:
+            profiles.append((np.zeros(0, dtype=np.float64), np.zeros(0, dtype=np.int64)))
+    return profiles
+
+def find_jamming_events(
+    chunk_powers: np.ndarray,
+    sample_counts: np.ndarray,
+    power_threshold: float
+) -> list:
+    ## Maszyna stanów (zbocza progu) na wektorze mocy - te same zdarzenia co pętla po pliku
+    if len(chunk_powers) == 0:
+        return []
+
+    return _events_from_mask(np.asarray(chunk_powers) > power_threshold, sample_counts)
+
+def _events_from_mask(is_jamming: np.ndarray, sample_counts: np.ndarray) -> list:
+    offsets = np.concatenate(([0], np.cumsum(sample_counts)))
+    edges = np.diff(is_jamming.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    return [(int(offsets[s]), int(offsets[e])) for s, e in zip(starts, ends)]
+
+def segment_jamming_events(
+    chunk_powers: np.ndarray,
+    sample_counts: np.ndarray,
+    power_threshold: float,
+    power_threshold_off: float = None,
+    min_event_samples: int = 0,
+    merge_gap_samples: int = 0
+) -> list:
+    ## Detekcja z histerezą i debouncingiem na gotowym wektorze mocy (bez ponownego czytania pliku):
+    ## start powyżej power_threshold, koniec dopiero przy mocy <= power_threshold_off,
+    ## przerwy <= merge_gap_samples są sklejane, a okresy krótsze niż min_event_samples odrzucane.
+    ## Z domyślnymi parametrami wynik jest identyczny z find_jamming_events.
+    if len(chunk_powers) == 0:
+        return []
+
+    powers = np.asarray(chunk_powers)
+    off_threshold = power_threshold if power_threshold_off is None else min(power_threshold_off, power_threshold)
+
+    # Stan zmienia tylko chunk powyżej progu ON albo nie wyżej niż próg OFF - pomiędzy trzymamy poprzedni
+    is_decisive = (powers > power_threshold) | (powers <= off_threshold)
+    last_decisive = np.where(is_decisive, np.arange(len(powers)), -1)
+    np.maximum.accumulate(last_decisive, out=last_decisive)
+    is_jamming = (last_decisive >= 0) & (powers[np.maximum(last_decisive, 0)] > power_threshold)
+
+    jamming_events = []
+    for start, end in _events_from_mask(is_jamming, sample_counts):
+        if jamming_events and start - jamming_events[-1][1] <= merge_gap_samples:
+            jamming_events[-1] = (jamming_events[-1][0], end)
+        else:
+            jamming_events.append((start, end))
+
+    return [(start, end) for start, end in jamming_events if end - start >= min_event_samples]
+
+def ms_to_samples(duration_ms: float, sample_rate_hz: float = SAMPLE_RATE_HZ) -> int:
+    return int(round(duration_ms * sample_rate_hz / 1000.0))
+
+def analyze_file_for_jamming(file_path: str, power_threshold: float, use_mmap: bool = True) -> list:
+    if use_mmap:
+        try:
+            profile = get_power_profile(file_path, CHUNK_SIZE_BYTES)
+            return find_jamming_events(profile['mean_power'], profile['sample_counts'], power_threshold)
+        except Exception as e:
+            print(f"Błąd podczas analizy pliku: {e}")
+            return []
+
+    detector = JammingEdgeDetector()
     
     try:
         with open(file_path, 'rb') as f:
@@ -42,68 +202,236 @@ def analyze_file_for_jamming(file_path: str, power_threshold: float) -> list:
                     raw_chunk_uint8,
                     power_threshold 
                 )
-                
-                was_jamming_previously = current_jamming_state
-                timestamp_sample = total_samples_processed
+                detector.update(is_jamming_now, num_new_samples_in_chunk)
 
-                if is_jamming_now and not was_jamming_previously:
-                    current_jamming_start = timestamp_sample
-                
-                elif not is_jamming_now and was_jamming_previously:
-                    if current_jamming_start is not None:
-                        jamming_events.append((current_jamming_start, timestamp_sample))
-                        current_jamming_start = None
-
-                current_jamming_state = is_jamming_now
-                total_samples_processed += num_new_samples_in_chunk
-
-        if current_jamming_state and current_jamming_start is not None:
-            jamming_events.append((current_jamming_start, total_samples_processed))
-            
-        return jamming_events
+        detector.finish()
+        return detector.jamming_events
         
     except Exception as e:
         print(f"Błąd podczas analizy pliku: {e}")
         return []
 
-def calibrate_file(file_path: str):
-    power_values = []
-    
+def analyze_files_for_jamming_parallel(
+    file_paths: list,
+    power_threshold: float,
+    max_workers: int = None
+) -> dict:
+    ## Archiwum: pliki dzielone na zakresy chunków liczone równolegle. Maszyna stanów działa na
+    ## sklejonym wektorze mocy, więc okresy na granicach zakresów łączą się tak jak w skanie szeregowym.
     try:
-        with open(file_path, 'rb') as f:
-            while True:
-                raw_bytes = f.read(CHUNK_SIZE_BYTES)
-                if not raw_bytes:
-                    break
-                
-                raw_chunk_uint8 = np.frombuffer(raw_bytes, dtype=np.uint8)
-                _, avg_power = analyze_chunk_power(raw_chunk_uint8, 0.0)
-                
-                if avg_power == 0.0 and raw_chunk_uint8.size == 0:
-                    continue
-                    
-                power_values.append(avg_power)
+        profiles = compute_chunk_powers_parallel(file_paths, max_workers)
+    except Exception as e:
+        print(f"Błąd podczas równoległej analizy plików: {e}")
+        return {file_path: [] for file_path in file_paths}
 
-        print("--- Kalibracja zakończona ---")
-        
-        if not power_values:
-            print("Plik jest pusty lub nie zawiera poprawnych danych.")
+    return {
+        file_path: find_jamming_events(chunk_powers, sample_counts, power_threshold)
+        for file_path, (chunk_powers, sample_counts) in zip(file_paths, profiles)
+    }
+
+def analyze_path_for_jamming_parallel(
+    path: str,
+    power_threshold: float,
+    max_workers: int = None
+) -> dict:
+    ## Plik albo katalog z nagraniami .bin
+    if os.path.isdir(path):
+        file_paths = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith('.bin') and os.path.isfile(os.path.join(path, name))
+        )
+    else:
+        file_paths = [path]
+    return analyze_files_for_jamming_parallel(file_paths, power_threshold, max_workers)
+
+def follow_file_for_jamming(
+    file_path: str,
+    power_threshold: float,
+    stop_event=None,
+    on_jamming_start=None,
+    on_jamming_stop=None,
+    poll_interval: float = FOLLOW_POLL_INTERVAL_S,
+    idle_timeout: float = None
+) -> list:
+    ## Śledzenie rosnącego pliku (np. w trakcie rtl_sdr): kursor offsetu + polling rozmiaru.
+    ## Każdy pełny chunk jest analizowany zaraz po pojawieniu się na dysku; callbacki dostają
+    ## start (próbka) i stop (start, koniec). Koniec: stop_event lub brak przyrostu przez idle_timeout.
+    ## Zwraca tę samą listę zdarzeń co analyze_file_for_jamming dla finalnego pliku.
+    detector = JammingEdgeDetector()
+    offset = 0
+    last_growth_time = time.monotonic()
+
+    def feed(raw_chunk_uint8):
+        num_new_samples_in_chunk = raw_chunk_uint8.size // 2
+        if num_new_samples_in_chunk == 0:
             return
+        is_jamming_now, _ = analyze_chunk_power(raw_chunk_uint8, power_threshold)
+        event = detector.update(is_jamming_now, num_new_samples_in_chunk)
+        if event == 'start' and on_jamming_start:
+            on_jamming_start(detector.current_jamming_start)
+        elif event == 'stop' and on_jamming_stop:
+            on_jamming_stop(*detector.jamming_events[-1])
 
-        all_powers_np = np.array(power_values)
-        noise_floor_median = np.median(all_powers_np)
-        suggested_threshold = noise_floor_median * 4.8
-        
-        print("\n--- Statystyki mocy (skala cyfrowa I²+Q²) ---")
-        print(f"Typowy poziom szumu (Mediana): {noise_floor_median:.2f}")
-        print(f"Moc szczytowa (max):         {np.max(all_powers_np):.2f}")
-        print(f"Moc minimalna (min):         {np.min(all_powers_np):.2f}")
-        
-        print(f"\nSugerowany <próg_mocy> (Mediana * 4.8): {suggested_threshold:.2f}")
-        print(f"Użyj: python {os.path.basename(__file__)} {file_path} {suggested_threshold:.2f}")
+    try:
+        while True:
+            # Flagę sprawdzamy przed odczytem, żeby po zatrzymaniu przeczytać jeszcze ostatnie dane
+            finishing = stop_event is not None and stop_event.is_set()
+            file_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+
+            if file_size - offset >= CHUNK_SIZE_BYTES:
+                with open(file_path, 'rb') as f:
+                    f.seek(offset)
+                    while file_size - offset >= CHUNK_SIZE_BYTES:
+                        raw_bytes = f.read(CHUNK_SIZE_BYTES)
+                        if len(raw_bytes) < CHUNK_SIZE_BYTES:
+                            break
+                        offset += CHUNK_SIZE_BYTES
+                        feed(np.frombuffer(raw_bytes, dtype=np.uint8))
+                last_growth_time = time.monotonic()
+
+            if finishing:
+                break
+            if idle_timeout is not None and time.monotonic() - last_growth_time > idle_timeout:
+                break
+            time.sleep(poll_interval)
+
+        # Dane dopisane od ostatniego odczytu - pełnymi chunkami jak w pętli wyżej (zapis mógł uciec
+        # o kilka chunków), a niepełny ogon osobno, tak samo jak ostatni chunk przy analizie całego pliku
+        if os.path.exists(file_path):
+            with open(file_path, 'rb') as f:
+                f.seek(offset)
+                while True:
+                    raw_bytes = f.read(CHUNK_SIZE_BYTES)
+                    if not raw_bytes:
+                        break
+                    offset += len(raw_bytes)
+                    feed(np.frombuffer(raw_bytes, dtype=np.uint8))
+                    if len(raw_bytes) < CHUNK_SIZE_BYTES:
+                        break
+
+        if detector.finish() == 'stop' and on_jamming_stop:
+            on_jamming_stop(*detector.jamming_events[-1])
+
+        return detector.jamming_events
 
     except Exception as e:
-        print(f"Błąd podczas kalibracji pliku: {e}")
+        print(f"Błąd podczas śledzenia pliku: {e}")
+        return detector.jamming_events
+
+def estimate_noise_floor_sampled(
+    file_path: str,
+    num_chunks: int = CALIBRATION_SAMPLE_CHUNKS,
+    confidence_z: float = CALIBRATION_CONFIDENCE_Z,
+    progress_callback=None,
+    cancel_event=None
+) -> dict:
+    ## Mediana mocy z num_chunks równo rozłożonych pełnych chunków (seek + read) i przedział ufności
+    ## mediany z statystyk pozycyjnych (bez założeń o rozkładzie): rangi n/2 -+ z*sqrt(n)/2.
+    ## Zwraca None dla pliku bez pełnego chunka albo po ustawieniu cancel_event.
+    n_full = os.path.getsize(file_path) // CHUNK_SIZE_BYTES
+    if n_full == 0:
+        return None
+
+    chunk_indices = np.unique(np.linspace(0, n_full - 1, min(num_chunks, n_full)).round().astype(np.int64))
+    powers = np.empty(len(chunk_indices), dtype=np.float64)
+    with open(file_path, 'rb') as f:
+        for i, chunk_index in enumerate(chunk_indices):
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+            f.seek(int(chunk_index) * CHUNK_SIZE_BYTES)
+            powers[i] = chunk_mean_power(np.frombuffer(f.read(CHUNK_SIZE_BYTES), dtype=np.uint8))
+            if progress_callback:
+                progress_callback(i + 1, len(chunk_indices))
+
+    sorted_powers = np.sort(powers)
+    n = len(sorted_powers)
+    half_width = confidence_z * np.sqrt(n) / 2.0
+    lower_rank = max(int(np.floor(n / 2.0 - half_width)), 0)
+    upper_rank = min(int(np.ceil(n / 2.0 + half_width)), n - 1)
+
+    return {
+        'median': float(np.median(sorted_powers)),
+        'median_lower': float(sorted_powers[lower_rank]),
+        'median_upper': float(sorted_powers[upper_rank]),
+        'min': float(sorted_powers[0]),
+        'max': float(sorted_powers[-1]),
+        'chunk_powers': powers,
+        'num_chunks': n,
+        'total_chunks': n_full
+    }
+
+def calibrate_file(
+    file_path: str,
+    sampled: bool = True,
+    progress_callback=None,
+    cancel_event=None
+) -> dict:
+    ## Kalibracja w procesie: mediana/min/max mocy, sugerowany próg i moce chunków użyte do statystyk.
+    ## progress_callback(przetworzone, wszystkie) - po próbkowaniu może ruszyć od zera pełny skan.
+    ## Zwraca None dla pustego pliku albo po ustawieniu cancel_event; błędy odczytu lecą wyżej.
+    estimate = None
+    # Gotowy profil mocy (pamięć/.powerprofile.npz) daje dokładny wynik bez czytania pliku
+    profile = load_power_profile(file_path, CHUNK_SIZE_BYTES)
+    if profile is None and sampled:
+        estimate = estimate_noise_floor_sampled(
+            file_path, progress_callback=progress_callback, cancel_event=cancel_event
+        )
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        if estimate is not None:
+            relative_width = (estimate['median_upper'] - estimate['median_lower']) / max(estimate['median'], 1e-12)
+            if relative_width > CALIBRATION_MAX_RELATIVE_WIDTH:
+                print(f"Przedział ufności mediany za szeroki ({relative_width * 100:.1f}%) - pełny skan pliku")
+                estimate = None
+
+    if estimate is not None:
+        result = estimate
+        result['sampled'] = True
+        result['source'] = f"próbkowanie {estimate['num_chunks']}/{estimate['total_chunks']} chunków"
+    else:
+        if profile is None:
+            profile = get_power_profile(
+                file_path, CHUNK_SIZE_BYTES,
+                progress_callback=progress_callback, cancel_event=cancel_event
+            )
+            if profile is None:
+                return None
+        all_powers_np = profile['mean_power']
+        if all_powers_np.size == 0:
+            return None
+        result = {
+            'median': float(np.median(all_powers_np)),
+            'median_lower': None,
+            'median_upper': None,
+            'min': float(np.min(all_powers_np)),
+            'max': float(np.max(all_powers_np)),
+            'chunk_powers': all_powers_np,
+            'num_chunks': all_powers_np.size,
+            'total_chunks': all_powers_np.size,
+            'sampled': False,
+            'source': f"pełny profil {all_powers_np.size} chunków"
+        }
+
+    result['suggested_threshold'] = result['median'] * CALIBRATION_MEDIAN_FACTOR
+    return result
+
+def print_calibration_result(file_path: str, result: dict):
+    print("--- Kalibracja zakończona ---")
+    if result is None:
+        print("Plik jest pusty lub nie zawiera poprawnych danych.")
+        return
+
+    suggested_threshold = result['suggested_threshold']
+
+    print(f"\n--- Statystyki mocy (skala cyfrowa I²+Q²) [{result['source']}] ---")
+    print(f"Typowy poziom szumu (Mediana): {result['median']:.2f}")
+    if result['median_lower'] is not None:
+        print(f"Przedział ufności mediany:   {result['median_lower']:.2f} - {result['median_upper']:.2f}")
+    print(f"Moc szczytowa (max):         {result['max']:.2f}")
+    print(f"Moc minimalna (min):         {result['min']:.2f}")
+
+    print(f"\nSugerowany <próg_mocy> (Mediana * 4.8): {suggested_threshold:.2f}")
+    print(f"Użyj: python {os.path.basename(__file__)} {file_path} {suggested_threshold:.2f}")
 
 def print_usage_and_exit():
     script_name = os.path.basename(__file__)
@@ -112,6 +440,14 @@ def print_usage_and_exit():
     print(f"  python {script_name} <nazwa_pliku.bin> <próg_mocy>")
     print(f"Przykład: python {script_name} nagranie.iq 120.0")
     
+    print("\nSposób użycia (Śledzenie nagrywanego pliku):")
+    print(f"  python {script_name} <nazwa_pliku.bin> <próg_mocy> --sledz")
+    print(f"Przykład: python {script_name} nagranie.iq 120.0 --sledz")
+    
+    print("\nSposób użycia (Równolegle - plik lub katalog z plikami .bin):")
+    print(f"  python {script_name} <plik.bin|katalog> <próg_mocy> --rownolegle")
+    print(f"Przykład: python {script_name} nagrania/ 120.0 --rownolegle")
+    
     print("\nSposób użycia (Tryb Kalibracji):")
     print(f"  python {script_name} <nazwa_pliku.bin> --kalibruj")
     print(f"Przykład: python {script_name} nagranie.iq --kalibruj")
@@ -119,39 +455,70 @@ def print_usage_and_exit():
 
 if __name__ == "__main__":
     
-    if len(sys.argv) != 3:
+    if len(sys.argv) not in (3, 4):
         print_usage_and_exit()
 
     SDR_FILE_PATH = sys.argv[1]
     SECOND_ARG = sys.argv[2]
+    THIRD_ARG = sys.argv[3] if len(sys.argv) == 4 else None
     
     MODE = None
     CALIBRATED_POWER_THRESHOLD = None
     
     if SECOND_ARG == '--kalibruj':
+        if THIRD_ARG is not None:
+            print_usage_and_exit()
         MODE = 'calibrate'
     else:
-        MODE = 'analyze'
+        if THIRD_ARG not in (None, '--sledz', '--rownolegle'):
+            print_usage_and_exit()
+        if THIRD_ARG == '--sledz':
+            MODE = 'follow'
+        elif THIRD_ARG == '--rownolegle':
+            MODE = 'parallel'
+        else:
+            MODE = 'analyze'
         try:
             CALIBRATED_POWER_THRESHOLD = float(SECOND_ARG)
         except ValueError:
             print(f"BŁĄD: <próg_mocy> musi być liczbą (np. '120.0'), a nie '{SECOND_ARG}'")
             print_usage_and_exit()
 
-    if not os.path.exists(SDR_FILE_PATH):
+    if MODE != 'follow' and not os.path.exists(SDR_FILE_PATH):
         print(f"BŁĄD: Nie znaleziono pliku: {SDR_FILE_PATH}")
         sys.exit(1)
     
     if MODE == 'calibrate':
         print(f"--- Tryb kalibracji: {SDR_FILE_PATH} ---")
         print("Proszę czekać, trwa analiza pliku...")
-        calibrate_file(SDR_FILE_PATH)
+        try:
+            print_calibration_result(SDR_FILE_PATH, calibrate_file(SDR_FILE_PATH))
+        except Exception as e:
+            print(f"Błąd podczas kalibracji pliku: {e}")
         
-    elif MODE == 'analyze':
-        jamming_events = analyze_file_for_jamming(
-            SDR_FILE_PATH, 
-            CALIBRATED_POWER_THRESHOLD
-        )
+    elif MODE == 'parallel':
+        results = analyze_path_for_jamming_parallel(SDR_FILE_PATH, CALIBRATED_POWER_THRESHOLD)
+        for file_path, jamming_events in results.items():
+            print(f"{file_path}: {len(jamming_events)} okres(ów) jammingu")
+            for i, (start, end) in enumerate(jamming_events, 1):
+                print(f"  Zdarzenie {i}: próbki {start} - {end} (długość: {end - start} próbek)")
+            print(f"jamming_events={jamming_events}")
+        
+    elif MODE in ('analyze', 'follow'):
+        if MODE == 'follow':
+            print(f"--- Śledzenie pliku: {SDR_FILE_PATH} (koniec po {FOLLOW_IDLE_TIMEOUT_S:.0f}s bez przyrostu) ---")
+            jamming_events = follow_file_for_jamming(
+                SDR_FILE_PATH,
+                CALIBRATED_POWER_THRESHOLD,
+                on_jamming_start=lambda start: print(f"JAMMING START: próbka {start}", flush=True),
+                on_jamming_stop=lambda start, end: print(f"JAMMING STOP: próbki {start} - {end}", flush=True),
+                idle_timeout=FOLLOW_IDLE_TIMEOUT_S
+            )
+        else:
+            jamming_events = analyze_file_for_jamming(
+                SDR_FILE_PATH, 
+                CALIBRATED_POWER_THRESHOLD
+            )
         
         if not jamming_events:
             print("WYNIK: Nie wykryto żadnego jammingu")
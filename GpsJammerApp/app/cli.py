@@ -0,0 +1,72 @@
+import argparse
+import os
+import sys
+import threading
+from .batch import BatchJob, add_analysis_arguments, settings_from_args
+
+# ==============================================================================
+#   ANALIZA BEZ GUI (SERWER, CRON) - JEDNO NAGRANIE / JEDEN ZESTAW ANTEN
+# ==============================================================================
+#
+# Uruchamianie (z katalogu GpsJammerApp, bez PySide6 i QtWebEngine):
+#   python -m app.cli -o wyniki ant1.bin ant2.bin ant3.bin --antenna 0,0 --antenna 0.5,0 --antenna 0,0.5
+#
+# Wyniki jak w app.batch: <nazwa>.track.csv i <nazwa>.result.json w katalogu -o.
+# Kilka nagrań naraz: python -m app.batch.
+
+CLI_PROGRESS_RATE_HZ = 2.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m app.cli',
+        description="Analiza nagrania IQ bez GUI: jamming, fiksy gnssdec i triangulacja (JSON + CSV)."
+    )
+    parser.add_argument('files', nargs='+', help="nagranie, albo 2-3 nagrania anten do triangulacji")
+    parser.add_argument('-o', '--output-dir', default='.', help="katalog na wyniki (domyślnie bieżący)")
+    add_analysis_arguments(parser)
+    args = parser.parse_args(argv)
+    settings = settings_from_args(parser, args)
+    if len(args.files) > 3:
+        parser.error("najwyżej 3 pliki anten")
+    missing = [p for p in args.files if not os.path.exists(p)]
+    if missing:
+        parser.error(f"brak plików: {', '.join(missing)}")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    job = BatchJob(args.files, args.output_dir)
+    analysis = job.prepare(settings, gui_rate_hz=CLI_PROGRESS_RATE_HZ)
+    analysis.jamming_started.connect(lambda start: print(f"[CLI] Początek jammingu: próbka {start}"))
+    analysis.triangulation_complete.connect(
+        lambda result: print(f"[CLI] Triangulacja: {'sukces' if result.get('success') else result.get('message')}"
+                             + (f", trasa: {len(result['track'])} punktów" if result.get('track') else "")))
+
+    # Analiza w osobnym wątku, żeby Ctrl+C w głównym zatrzymał gnssdec zamiast przerwać run() w połowie.
+    # Czekamy na Event, nie join() - przerwany join potrafi potem zgłaszać martwy wątek, który nadal działa.
+    done = threading.Event()
+
+    def run_job():
+        try:
+            job.run()
+        finally:
+            done.set()
+
+    threading.Thread(target=run_job, daemon=True).start()
+    while not done.is_set():
+        try:
+            done.wait()
+        except KeyboardInterrupt:
+            print("\n[CLI] Zatrzymywanie analizy...")
+            job.request_stop()
+
+    print(f"[CLI] Status: {job.status}")
+    if job.status in ('ok', 'failed'):
+        print(f"[CLI] Wynik: {job.result_path}")
+        print(f"[CLI] Trasa: {job.track_path} ({analysis.track_points} fiksów)")
+    if job.status == 'ok':
+        return 0
+    return 130 if job.status == 'stopped' else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
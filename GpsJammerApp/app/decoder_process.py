@@ -0,0 +1,203 @@
+import os
+import signal
+import subprocess
+import threading
+from collections import deque
+
+# ==============================================================================
+#   PROCES GNSSDEC: STRUMIENIOWE STDOUT, ZATRZYMANIE, ZUŻYCIE ZASOBÓW
+# ==============================================================================
+
+# Ostatnie linie wyjścia trzymane do komunikatu o błędzie (reszta jest od razu zapominana)
+DECODER_OUTPUT_TAIL_LINES = 50
+# Czas na łagodne zakończenie (SIGTERM) zanim poleci SIGKILL
+DECODER_TERMINATE_TIMEOUT_S = 3.0
+# Po zakończeniu procesu tyle czekamy na doczytanie rury (potomek mógł przejąć stdout)
+DECODER_OUTPUT_DRAIN_TIMEOUT_S = 2.0
+# Uruchomienie gnssdec bez argumentów (tylko linia użycia) przy sprawdzaniu obsługiwanych opcji
+DECODER_PROBE_TIMEOUT_S = 5.0
+
+# Wynik sprawdzenia opcji dla (ścieżka, mtime) - binarkę podmienia się przy przebudowie
+_ingest_port_support = {}
+
+
+def decoder_supports_ingest_port(gnssdec_path):
+  ##Czy gnssdec zna -p (kanał epok NDJSON/GJEB). Stara binarka wysyła POST /data na port 1234
+  ##i odrzuca -p - poznajemy ją po linii użycia. Gdy nie da się jej uruchomić, zakładamy nową
+  ##(błąd pokaże właściwe uruchomienie analizy).
+    try:
+        key = (os.path.abspath(gnssdec_path), os.stat(gnssdec_path).st_mtime_ns)
+    except OSError:
+        return True
+    if key not in _ingest_port_support:
+        try:
+            probe = subprocess.run([gnssdec_path], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT, text=True, errors='replace',
+                                   timeout=DECODER_PROBE_TIMEOUT_S)
+            usage = [line for line in probe.stdout.splitlines() if 'Użycie' in line]
+            _ingest_port_support[key] = not usage or any('-p' in line for line in usage)
+        except (OSError, subprocess.TimeoutExpired):
+            _ingest_port_support[key] = True
+    return _ingest_port_support[key]
+
+
+def _split_prns(field):
+    return [int(prn) for prn in field.split()]
+
+
+class StdoutEpochParser:
+    ## Składa epoki z linii tekstowych gnssdec (ETIME|, TIME|, FILTER|, ACQSV|, TRACKED|, DECODED|,
+    ## LLA|, OBS|) w ten sam słownik co JSON z gniazda. Epoka jest kompletna, gdy przychodzi
+    ## ETIME| następnej albo strumień się kończy (finish), więc opóźnienie to jedna epoka.
+
+    def __init__(self, on_epoch):
+        self.on_epoch = on_epoch
+        self.epoch = None
+
+    def feed(self, line):
+        tag, _, rest = line.rstrip('\n').partition('|')
+        if tag == 'ETIME':
+            self.finish()
+            self.epoch = {'elapsed_time': float(rest), 'observations': []}
+            return
+        if self.epoch is None:
+            return
+        if tag == 'TIME':
+            self.epoch['time'] = rest
+        elif tag == 'FILTER':
+            self.epoch['filter'] = rest
+        elif tag == 'ACQSV':
+            self.epoch['acq_sv'] = _split_prns(rest)
+        elif tag == 'TRACKED':
+            self.epoch['tracked'] = _split_prns(rest)
+        elif tag == 'DECODED':
+            self.epoch['decoded'] = _split_prns(rest)
+        elif tag == 'LLA':
+            nsat, lat, lon, hgt, gdop, clk_bias, buffcnt = rest.split('|')
+            self.epoch['position'] = {
+                'nsat': int(nsat),
+                'lat': float(lat),
+                'lon': float(lon),
+                'hgt': float(hgt),
+                'gdop': float(gdop),
+                'clk_bias': float(clk_bias),
+                'buffcnt': int(buffcnt)
+            }
+        elif tag == 'OBS':
+            prn, tow, week, snr, doppler, az, el, residual, innovation = rest.split('|')
+            self.epoch['observations'].append({
+                'prn': int(prn),
+                'tow': float(tow),
+                'week': int(week),
+                'snr': float(snr),
+                'doppler': float(doppler),
+                'az': float(az),
+                'el': float(el),
+                'residual': float(residual),
+                'innovation': float(innovation)
+            })
+
+    def finish(self):
+        epoch, self.epoch = self.epoch, None
+        if epoch is not None and 'position' in epoch:
+            self.on_epoch(epoch)
+
+
+class DecoderProcess:
+    ## gnssdec przez Popen: stdout czytany linia po linii w osobnym wątku i od razu zapominany
+    ## (albo parsowany przez on_line), zatrzymanie sygnałem po PID, a po zakończeniu szczyt RSS
+    ## i czas CPU procesu z wait4 - tylko tego dziecka, nie wszystkich procesów potomnych.
+
+    def __init__(self, command, on_line=None):
+        self.command = command
+        self.on_line = on_line
+        self.process = None
+        self.reader_thread = None
+        self.output_tail = deque(maxlen=DECODER_OUTPUT_TAIL_LINES)
+        self.output_lines = 0
+        self.returncode = None
+        self.usage = None
+        self.wait_lock = threading.Lock()
+        self.exited = threading.Event()
+
+    @property
+    def pid(self):
+        return self.process.pid if self.process else None
+
+    def start(self):
+        self.process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors='replace',
+            bufsize=1
+        )
+        self.reader_thread = threading.Thread(target=self._read_output, daemon=True)
+        self.reader_thread.start()
+        threading.Thread(target=self._wait_for_exit, daemon=True).start()
+        return self.process.pid
+
+    def _read_output(self):
+        for line in self.process.stdout:
+            self.output_lines += 1
+            self.output_tail.append(line.rstrip('\n'))
+            if self.on_line:
+                try:
+                    self.on_line(line)
+                except Exception as e:
+                    print(f"[GNSSDEC] Błąd parsowania linii wyjścia: {e}")
+        self.process.stdout.close()
+
+    def send_signal(self, sig):
+        # Po zebraniu procesu PID mógł już trafić do innego procesu - wtedy nic nie wysyłamy
+        with self.wait_lock:
+            if self.process is None or self.returncode is not None:
+                return False
+            try:
+                os.kill(self.process.pid, sig)
+            except ProcessLookupError:
+                return False
+            return True
+
+    def terminate(self):
+        return self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        return self.send_signal(signal.SIGKILL)
+
+    def stop(self, timeout=DECODER_TERMINATE_TIMEOUT_S):
+        ## SIGTERM, a jeśli proces nie skończy się w timeout - SIGKILL
+        if not self.terminate():
+            return self.returncode
+        if self.wait(timeout) is None:
+            print(f"[GNSSDEC] Proces {self.pid} nie reaguje na SIGTERM - wysyłam SIGKILL")
+            self.kill()
+        return self.wait()
+
+    def _wait_for_exit(self):
+        pid = self.process.pid
+        # Czekamy na koniec bez zbierania procesu (WNOWAIT), a zbieramy pod blokadą -
+        # send_signal nigdy nie trafi w PID zwolniony i użyty ponownie przez inny proces
+        os.waitid(os.P_PID, pid, os.WEXITED | os.WNOWAIT)
+        with self.wait_lock:
+            _, status, rusage = os.wait4(pid, 0)
+            self.process.returncode = os.waitstatus_to_exitcode(status)
+            self.usage = {
+                'peak_rss_kb': rusage.ru_maxrss,
+                'user_cpu_s': rusage.ru_utime,
+                'system_cpu_s': rusage.ru_stime
+            }
+            self.returncode = self.process.returncode
+        self.exited.set()
+
+    def wait(self, timeout=None):
+        ## Kod wyjścia albo None po timeout
+        if not self.exited.wait(timeout):
+            return None
+        self.reader_thread.join(DECODER_OUTPUT_DRAIN_TIMEOUT_S)
+        return self.returncode
+
+    def output_summary(self):
+        return '\n'.join(self.output_tail)
@@ -0,0 +1,259 @@
+import json
+import socketserver
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from collections import deque
+import numpy as np
+
+# ==============================================================================
+#   ODBIÓR EPOK Z GNSSDEC (NDJSON / REKORDY BINARNE PO TCP)
+# ==============================================================================
+
+INGEST_HOST = '127.0.0.1'
+# 0 = port efemeryczny przydzielony przez system (kilka analiz naraz)
+INGEST_DEFAULT_PORT = 0
+# gnssdec sprzed kanału epok (bez opcji -p) wysyła każdą epokę osobnym POST /data na ten stały port
+LEGACY_HTTP_PORT = 1234
+# Epoki czekające na przetworzenie; po przepełnieniu najstarsza jest scalana z następną w kolejce
+INGEST_QUEUE_SIZE = 64
+# Pola epoki zachowywane przy scalaniu (fiks i licznik gnssdec) - kanały i obserwacje przepadają.
+# Scalone epoki trafiają do następnej pod kluczem INGEST_COALESCED_KEY, od najstarszej.
+INGEST_COALESCE_FIELDS = ('elapsed_time', 'position', 'dropped_epochs')
+INGEST_COALESCED_KEY = 'coalesced_epochs'
+
+# Zwarty format binarny epoki z gnssdec -b (układ jak epoch_bin_*_t w backend/sdrout.c)
+EPOCH_BINARY_MAGIC = b'GJEB'
+EPOCH_HEADER_DTYPE = np.dtype([
+    ('magic', 'S4'), ('record_size', '<u4'), ('version', '<u2'), ('n_channels', '<u2'),
+    ('n_obs', '<u2'), ('nsat', '<u2'), ('flags', '<u4'), ('reserved', '<u4'),
+    ('elapsed_time', '<f8'), ('utc_time', '<f8'), ('dropped_epochs', '<u8'), ('buffcnt', '<u8'),
+    ('lat', '<f8'), ('lon', '<f8'), ('hgt', '<f8'), ('gdop', '<f8'), ('clk_bias', '<f8')
+])
+EPOCH_CHANNEL_DTYPE = np.dtype([('prn', '<i2'), ('flags', 'u1'), ('reserved', 'u1')])
+EPOCH_OBS_DTYPE = np.dtype([
+    ('prn', '<i2'), ('week', '<i2'), ('tow', '<f8'), ('snr', '<f4'), ('doppler', '<f4'),
+    ('az', '<f4'), ('el', '<f4'), ('residual', '<f4'), ('innovation', '<f4')
+])
+
+def decode_binary_epoch(record):
+    ## Rekord binarny -> ten sam słownik co JSON; kanały i obserwacje to widoki np.frombuffer (bez kopii)
+    header = np.frombuffer(record, dtype=EPOCH_HEADER_DTYPE, count=1)[0]
+    n_channels = int(header['n_channels'])
+    channels = np.frombuffer(record, dtype=EPOCH_CHANNEL_DTYPE, count=n_channels,
+                             offset=EPOCH_HEADER_DTYPE.itemsize)
+    observations = np.frombuffer(record, dtype=EPOCH_OBS_DTYPE, count=int(header['n_obs']),
+                                 offset=EPOCH_HEADER_DTYPE.itemsize + n_channels * EPOCH_CHANNEL_DTYPE.itemsize)
+    flags = int(header['flags'])
+    return {
+        'elapsed_time': round(float(header['elapsed_time']), 3),
+        'utc_time': float(header['utc_time']),
+        'dropped_epochs': int(header['dropped_epochs']),
+        'filter': 'EKF' if flags & 0x1 else 'WLS',
+        'acq_sv': channels['prn'][(channels['flags'] & 0x1) != 0],
+        'tracked': channels['prn'][(channels['flags'] & 0x2) != 0],
+        'decoded': channels['prn'][(channels['flags'] & 0x4) != 0],
+        'position': {
+            'nsat': int(header['nsat']),
+            'lat': float(header['lat']),
+            'lon': float(header['lon']),
+            'hgt': float(header['hgt']),
+            'gdop': float(header['gdop']),
+            'clk_bias': float(header['clk_bias']),
+            'buffcnt': int(header['buffcnt']),
+            'hold': bool(flags & 0x2)
+        },
+        'observations': observations
+    }
+
+class _EpochStreamHandler(socketserver.StreamRequestHandler):
+    # Jedno trwałe połączenie od gnssdec: każda linia to jedna epoka JSON (NDJSON),
+    # a w trybie -b rekordy binarne zaczynające się od EPOCH_BINARY_MAGIC.
+    # Handler tylko czyta i dekoduje - przetwarzanie jest w wątku EpochIngestServer.
+
+    def read_binary_epoch(self):
+        header = self.rfile.read(EPOCH_HEADER_DTYPE.itemsize)
+        if len(header) < EPOCH_HEADER_DTYPE.itemsize:
+            return None
+        if header[:4] != EPOCH_BINARY_MAGIC:
+            raise ValueError("niepoprawny nagłówek rekordu binarnego")
+        record_size = int(np.frombuffer(header, dtype=EPOCH_HEADER_DTYPE, count=1)['record_size'][0])
+        body = self.rfile.read(record_size - len(header))
+        if len(body) < record_size - len(header):
+            return None
+        return decode_binary_epoch(header + body)
+
+    def handle(self):
+        ingest = self.server.ingest
+        while True:
+            first_byte = self.rfile.peek(1)[:1]
+            if not first_byte:
+                break
+            if first_byte == EPOCH_BINARY_MAGIC[:1]:
+                try:
+                    data = self.read_binary_epoch()
+                except ValueError as e:
+                    # Strumień rozsynchronizowany - gnssdec połączy się ponownie
+                    print(f"[INGEST] Błąd: {e}")
+                    ingest.count_dropped()
+                    break
+                if data is None:
+                    break
+            else:
+                line = self.rfile.readline()
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    print("Błąd parsowania JSON")
+                    ingest.count_dropped()
+                    continue
+            ingest.submit(data)
+
+class _EpochStreamServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    # Wątek połączenia nie blokuje zamknięcia serwera (gnssdec kończy się przed shutdown)
+    daemon_threads = True
+
+class _LegacyEpochHandler(BaseHTTPRequestHandler):
+    # Jedna epoka JSON na żądanie - do tej samej kolejki co strumień NDJSON
+
+    def do_POST(self):
+        ingest = self.server.ingest
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        try:
+            data = json.loads(body)
+        except json.JSONDecodeError:
+            print("Błąd parsowania JSON")
+            ingest.count_dropped()
+            self.send_response(400)
+        else:
+            ingest.submit(data)
+            self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+class LegacyHttpEpochReceiver:
+    ## Odbiór epok ze starego gnssdec (POST /data na LEGACY_HTTP_PORT) do kolejki EpochIngestServer.
+    ## Port jest stały, więc naraz działa tylko jedna taka analiza.
+
+    def __init__(self, ingest, host=INGEST_HOST, port=LEGACY_HTTP_PORT):
+        self.ingest = ingest
+        self.host = host
+        self.port = port
+        self.server = None
+        self.server_thread = None
+
+    def start(self):
+        self.server = HTTPServer((self.host, self.port), _LegacyEpochHandler)
+        self.server.ingest = self.ingest
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+        return self.port
+
+    def stop(self):
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server_thread.join()
+        self.server.server_close()
+        self.server = None
+        self.server_thread = None
+
+class EpochIngestServer:
+    ## Serwer epok: wątki połączeń czytają gniazdo, ograniczona kolejka, jeden wątek przetwarzający
+    ## (on_epoch wołane po kolei). Gdy przetwarzanie nie nadąża, najstarsza epoka jest scalana
+    ## z następną zamiast blokować odczyt gniazda i w efekcie gnssdec: jej fiks (INGEST_COALESCE_FIELDS)
+    ## jedzie w następnej epoce pod INGEST_COALESCED_KEY, więc trasa i CSV nie tracą punktów -
+    ## pomijane jest tylko pełne przetwarzanie epoki (kanały, obserwacje).
+
+    def __init__(self, on_epoch, host=INGEST_HOST, port=INGEST_DEFAULT_PORT, queue_size=INGEST_QUEUE_SIZE):
+        self.on_epoch = on_epoch
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.pending = deque()
+        self.condition = threading.Condition()
+        self.stopping = False
+        self.server = None
+        self.server_thread = None
+        self.consumer_thread = None
+        self.counters = {'queued': 0, 'processed': 0, 'coalesced': 0, 'dropped': 0}
+
+    def start(self):
+        ## Zwraca faktyczny port (przy port=0 wybrany przez system) - do przekazania gnssdec -p
+        self.server = _EpochStreamServer((self.host, self.port), _EpochStreamHandler)
+        self.server.ingest = self
+        self.port = self.server.server_address[1]
+        self.stopping = False
+        self.consumer_thread = threading.Thread(target=self._consume, daemon=True)
+        self.consumer_thread.start()
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+        return self.port
+
+    def submit(self, data):
+        with self.condition:
+            if self.stopping:
+                self.counters['dropped'] += 1
+                return
+            if len(self.pending) >= self.queue_size:
+                self._coalesce_oldest(data)
+            self.pending.append(data)
+            self.counters['queued'] += 1
+            self.condition.notify()
+
+    def _coalesce_oldest(self, data):
+        ## Najstarsza epoka (z tym, co już w niej scalono) -> lista scalonych następnej epoki
+        oldest = self.pending.popleft()
+        merged = oldest.pop(INGEST_COALESCED_KEY, [])
+        merged.append({field: oldest[field] for field in INGEST_COALESCE_FIELDS if field in oldest})
+        successor = self.pending[0] if self.pending else data
+        merged.extend(successor.get(INGEST_COALESCED_KEY, ()))
+        successor[INGEST_COALESCED_KEY] = merged
+        self.counters['coalesced'] += 1
+
+    def count_dropped(self):
+        with self.condition:
+            self.counters['dropped'] += 1
+
+    def _consume(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopping:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                data = self.pending.popleft()
+            try:
+                self.on_epoch(data)
+            except Exception as e:
+                print(f"[INGEST] Błąd: {e}")
+            with self.condition:
+                self.counters['processed'] += 1
+
+    def stats(self):
+        with self.condition:
+            stats = dict(self.counters)
+            stats['pending'] = len(self.pending)
+        return stats
+
+    def stop(self, timeout=5.0):
+        ## Zamyka gniazdo nasłuchujące, przetwarza epoki już zakolejkowane i kończy wątek
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server_thread.join()
+        self.server.server_close()
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        self.consumer_thread.join(timeout=timeout)
+        self.server = None
+        self.server_thread = None
+        self.consumer_thread = None
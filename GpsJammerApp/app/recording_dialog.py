@@ -5,6 +5,7 @@ from PySide6.QtCore import Qt, QTimer, Signal, QObject
 import subprocess
 import threading
 import time
+from .checkIfJamming import follow_file_for_jamming
 
 class RecordingDialog(QDialog):
     log_signal = Signal(str)
@@ -18,6 +19,8 @@ class RecordingDialog(QDialog):
         
         self.recording_process = None
         self.recording_processes = []
+        self.jamming_followers = []
+        self.jamming_follow_stop = threading.Event()
         self.is_recording = False
         self.warmup_timer = None
         self.recording_start_time = None
@@ -518,6 +521,9 @@ class RecordingDialog(QDialog):
         self.is_recording = True
         self.recording_start_time = time.time()
         self.recording_processes = []
+        self.jamming_followers = []
+        self.jamming_follow_stop = threading.Event()
+        power_threshold = self.get_power_threshold()
         
         for i in range(num_sdrs):
             base_name = filename.rsplit('.', 1)[0] if '.' in filename else filename
@@ -549,6 +555,7 @@ class RecordingDialog(QDialog):
                 reader_thread = threading.Thread(target=read_sdr_output, args=(process, i+1))
                 reader_thread.daemon = True
                 reader_thread.start()
+                self.start_jamming_follower(output_file, i+1, power_threshold, sample_rate_hz)
                 
             except FileNotFoundError:
                 self.log_message(f"❌ BŁĄD: Nie znaleziono komendy rtl_sdr")
@@ -591,6 +598,10 @@ class RecordingDialog(QDialog):
                 self.log_message(f"❌ Błąd podczas zatrzymywania SDR {i+1}: {str(e)}")
         
         self.recording_processes = []
+        self.jamming_follow_stop.set()
+        for follower in self.jamming_followers:
+            follower.join(timeout=3)
+        self.jamming_followers = []
         self.frequency_spin.setEnabled(True)
         self.sample_rate_spin.setEnabled(True)
         self.num_sdrs_spin.setEnabled(True)
@@ -622,6 +633,34 @@ class RecordingDialog(QDialog):
         
         self.log_message("✅ Nagrywanie zatrzymane!")
     
+    def get_power_threshold(self):
+        settings = getattr(self.parent(), 'current_settings', None)
+        if settings:
+            return float(settings['analysis_params'].get('threshold', 120.0))
+        return 120.0
+
+    def start_jamming_follower(self, output_file, sdr_num, power_threshold, sample_rate_hz):
+        # Detekcja jammingu na bieżąco, w trakcie zapisu pliku przez rtl_sdr
+        def on_jamming_start(start):
+            self.log_signal.emit(f"🚨 SDR {sdr_num}: JAMMING od próbki {start} ({start / sample_rate_hz:.2f}s)")
+
+        def on_jamming_stop(start, end):
+            self.log_signal.emit(f"SDR {sdr_num}: koniec jammingu ({start / sample_rate_hz:.2f}s - {end / sample_rate_hz:.2f}s)")
+
+        follower = threading.Thread(
+            target=follow_file_for_jamming,
+            args=(output_file, power_threshold),
+            kwargs={
+                'stop_event': self.jamming_follow_stop,
+                'on_jamming_start': on_jamming_start,
+                'on_jamming_stop': on_jamming_stop
+            }
+        )
+        follower.daemon = True
+        follower.start()
+        self.jamming_followers.append(follower)
+        self.log_message(f"🔍 SDR {sdr_num}: detekcja jammingu na żywo (próg {power_threshold:.1f})")
+
     def close_dialog(self):
         if self.is_recording:
             self.stop_recording()
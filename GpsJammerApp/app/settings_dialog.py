@@ -1,10 +1,20 @@
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, 
                              QLabel, QDoubleSpinBox, QSpinBox, 
                              QPushButton, QGroupBox, QGridLayout, QMessageBox, QCheckBox)
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Signal
 import os
+import threading
+from .checkIfJamming import (CHUNK_SIZE_BYTES, calibrate_file, get_power_profile, load_power_profile,
+                             segment_jamming_events, ms_to_samples, SAMPLE_RATE_HZ)
 
 class SettingsDialog(QDialog):
+    calibration_progress = Signal(int)
+    calibration_finished = Signal(object)
+    calibration_failed = Signal(str)
+    preview_progress = Signal(int)
+    preview_finished = Signal(object)
+    preview_failed = Signal(str)
+
     def __init__(self, parent=None, num_files=0, file_paths=None):
         super().__init__(parent)
         self.setWindowTitle("Ustawienia Analizy GPS")
@@ -12,6 +22,16 @@ class SettingsDialog(QDialog):
         self.resize(400, 350)
         self.num_files = num_files
         self.file_paths = file_paths if file_paths else []
+        self.calibration_thread = None
+        self.calibration_cancel = threading.Event()
+        self.calibration_progress.connect(self.on_calibration_progress)
+        self.calibration_finished.connect(self.on_calibration_finished)
+        self.calibration_failed.connect(self.on_calibration_failed)
+        self.preview_thread = None
+        self.preview_cancel = threading.Event()
+        self.preview_progress.connect(self.on_preview_progress)
+        self.preview_finished.connect(self.on_preview_finished)
+        self.preview_failed.connect(self.on_preview_failed)
         
         self.setStyleSheet("""
         QDialog {
@@ -116,8 +136,38 @@ class SettingsDialog(QDialog):
         self.threshold.setSingleStep(1.0)
         self.threshold.setStyleSheet(self.get_spinbox_style())
         analysis_layout.addWidget(self.threshold, 2, 1)
+
+        analysis_layout.addWidget(QLabel("Histereza wyłączenia [%]:"), 3, 0)
+        self.hysteresis = QDoubleSpinBox()
+        self.hysteresis.setRange(0.0, 90.0)
+        self.hysteresis.setValue(0.0)
+        self.hysteresis.setDecimals(1)
+        self.hysteresis.setSingleStep(5.0)
+        self.hysteresis.setSuffix(" %")
+        self.hysteresis.setStyleSheet(self.get_spinbox_style())
+        analysis_layout.addWidget(self.hysteresis, 3, 1)
+
+        analysis_layout.addWidget(QLabel("Min. długość zdarzenia:"), 4, 0)
+        self.min_event_ms = QDoubleSpinBox()
+        self.min_event_ms.setRange(0.0, 60000.0)
+        self.min_event_ms.setValue(0.0)
+        self.min_event_ms.setDecimals(0)
+        self.min_event_ms.setSingleStep(50.0)
+        self.min_event_ms.setSuffix(" ms")
+        self.min_event_ms.setStyleSheet(self.get_spinbox_style())
+        analysis_layout.addWidget(self.min_event_ms, 4, 1)
+
+        analysis_layout.addWidget(QLabel("Łączenie przerw do:"), 5, 0)
+        self.merge_gap_ms = QDoubleSpinBox()
+        self.merge_gap_ms.setRange(0.0, 60000.0)
+        self.merge_gap_ms.setValue(0.0)
+        self.merge_gap_ms.setDecimals(0)
+        self.merge_gap_ms.setSingleStep(50.0)
+        self.merge_gap_ms.setSuffix(" ms")
+        self.merge_gap_ms.setStyleSheet(self.get_spinbox_style())
+        analysis_layout.addWidget(self.merge_gap_ms, 5, 1)
         
-        analysis_layout.addWidget(QLabel("Utrzymuj pozycję:"), 3, 0)
+        analysis_layout.addWidget(QLabel("Utrzymuj pozycję:"), 6, 0)
         self.hold_position_checkbox = QCheckBox()
         self.hold_position_checkbox.setChecked(False)
         self.hold_position_checkbox.setStyleSheet("""
@@ -143,7 +193,19 @@ class SettingsDialog(QDialog):
             font-weight: bold;
         }
         """)
-        analysis_layout.addWidget(self.hold_position_checkbox, 3, 1)
+        analysis_layout.addWidget(self.hold_position_checkbox, 6, 1)
+
+        analysis_layout.addWidget(QLabel("Okno trasy jammera:"), 7, 0)
+        self.track_window_s = QDoubleSpinBox()
+        self.track_window_s.setRange(0.0, 60.0)
+        self.track_window_s.setValue(0.0)
+        self.track_window_s.setDecimals(2)
+        self.track_window_s.setSingleStep(0.25)
+        self.track_window_s.setSuffix(" s")
+        self.track_window_s.setSpecialValueText("wyłączone")
+        self.track_window_s.setToolTip("Lokalizacja jammera co okno czasowe (trasa) zamiast jednego punktu na zdarzenie")
+        self.track_window_s.setStyleSheet(self.get_spinbox_style())
+        analysis_layout.addWidget(self.track_window_s, 7, 1)
         
         self.calibrate_btn = QPushButton("Oblicz próg")
         self.calibrate_btn.clicked.connect(self.on_calibrate_clicked)
@@ -166,7 +228,20 @@ class SettingsDialog(QDialog):
             background-color: #21618c;
         }
         """)
-        analysis_layout.addWidget(self.calibrate_btn, 4, 0, 1, 2)
+        analysis_layout.addWidget(self.calibrate_btn, 8, 0, 1, 2)
+
+        self.preview_btn = QPushButton("Podgląd detekcji")
+        self.preview_btn.clicked.connect(self.on_preview_clicked)
+        self.preview_btn.setStyleSheet(self.calibrate_btn.styleSheet())
+        analysis_layout.addWidget(self.preview_btn, 9, 0)
+        self.detection_preview_label = QLabel("")
+        self.detection_preview_label.setWordWrap(True)
+        analysis_layout.addWidget(self.detection_preview_label, 9, 1)
+
+        # Zmiana parametrów od razu przelicza zdarzenia z profilu mocy (bez czytania pliku)
+        for spinbox in (self.threshold, self.hysteresis, self.min_event_ms, self.merge_gap_ms):
+            spinbox.valueChanged.connect(self.update_detection_preview)
+        self.update_detection_preview()
         
         layout.addWidget(analysis_group)
         
@@ -222,49 +297,172 @@ class SettingsDialog(QDialog):
         layout.addLayout(button_layout)
     
     def on_calibrate_clicked(self):
+        if self.calibration_thread is not None and self.calibration_thread.is_alive():
+            # Drugie kliknięcie w trakcie kalibracji przerywa skan
+            self.calibration_cancel.set()
+            self.calibrate_btn.setText("Przerywanie...")
+            self.calibrate_btn.setEnabled(False)
+            return
         if self.num_files == 0:
             QMessageBox.warning(self, "Brak plików", "Brak plików do kalibracji")
-        elif self.num_files >= 1:
-            import subprocess
-            import re
-            
-            first_file = self.file_paths[0]
-            script_path = os.path.join(os.path.dirname(__file__), 'checkIfJamming.py')
-            
+            return
+
+        first_file = self.file_paths[0]
+        self.calibration_cancel = threading.Event()
+        cancel_event = self.calibration_cancel
+        self.calibrate_btn.setText("Kalibracja... 0% (kliknij, aby przerwać)")
+
+        last_percent = [-1]
+
+        def on_progress(done, total):
+            # Sygnał tylko przy zmianie procentu - nie zalewamy pętli zdarzeń Qt
+            percent = int(100 * done / total) if total else 100
+            if percent != last_percent[0]:
+                last_percent[0] = percent
+                self.calibration_progress.emit(percent)
+
+        def calibration_thread():
             try:
-                result = subprocess.run(
-                    ['python', script_path, first_file, '--kalibruj'],
-                    capture_output=True,
-                    text=True,
-                    timeout=120
-                )
-                
-                output = result.stdout
-                print(output)
-                
-                match = re.search(r'Sugerowany <próg_mocy> \(Mediana \* 4\.8\):\s*([\d.]+)', output)
-                
-                if match:
-                    suggested_threshold = float(match.group(1))
-                    self.threshold.setValue(suggested_threshold)
-                    QMessageBox.information(
-                        self, 
-                        "Kalibracja zakończona", 
-                        f"Obliczony próg detekcji: {suggested_threshold:.2f}\n\n"
-                        f"Wartość została automatycznie wpisana."
-                    )
-                else:
-                    QMessageBox.warning(
-                        self, 
-                        "Błąd kalibracji", 
-                        "Nie udało się odczytać wartości progu z wyniku kalibracji."
-                    )
-                    
-            except subprocess.TimeoutExpired:
-                QMessageBox.critical(self, "Błąd", "Kalibracja przekroczyła limit czasu (120s)")
+                result = calibrate_file(first_file, progress_callback=on_progress, cancel_event=cancel_event)
             except Exception as e:
-                QMessageBox.critical(self, "Błąd", f"Błąd podczas kalibracji:\n{str(e)}")
+                self.calibration_failed.emit(str(e))
+                return
+            if cancel_event.is_set():
+                result = None
+            self.calibration_finished.emit(result)
+
+        self.calibration_thread = threading.Thread(target=calibration_thread, daemon=True)
+        self.calibration_thread.start()
+
+    def on_calibration_progress(self, percent):
+        if not self.calibration_cancel.is_set():
+            self.calibrate_btn.setText(f"Kalibracja... {percent}% (kliknij, aby przerwać)")
+
+    def reset_calibrate_button(self):
+        self.calibrate_btn.setText("Oblicz próg")
+        self.calibrate_btn.setEnabled(True)
+
+    def on_calibration_finished(self, result):
+        cancelled = self.calibration_cancel.is_set()
+        self.reset_calibrate_button()
+        if cancelled or not self.isVisible():
+            return
+        if result is None:
+            QMessageBox.warning(
+                self,
+                "Błąd kalibracji",
+                "Plik jest pusty lub nie zawiera poprawnych danych."
+            )
+            return
+
+        suggested_threshold = result['suggested_threshold']
+        self.threshold.setValue(suggested_threshold)
+        # Pełny skan zostawił profil mocy - podgląd detekcji od razu dostępny
+        self.update_detection_preview()
+        QMessageBox.information(
+            self, 
+            "Kalibracja zakończona", 
+            f"Obliczony próg detekcji: {suggested_threshold:.2f}\n"
+            f"Mediana szumu: {result['median']:.2f} (min {result['min']:.2f}, max {result['max']:.2f})\n"
+            f"Źródło: {result['source']}\n\n"
+            f"Wartość została automatycznie wpisana."
+        )
+
+    def on_calibration_failed(self, message):
+        self.reset_calibrate_button()
+        if self.isVisible():
+            QMessageBox.critical(self, "Błąd", f"Błąd podczas kalibracji:\n{message}")
+
+    def done(self, result_code):
+        # Zamknięcie okna przerywa trwającą kalibrację i skan podglądu
+        self.calibration_cancel.set()
+        self.preview_cancel.set()
+        super().done(result_code)
     
+    def on_preview_clicked(self):
+        if self.preview_thread is not None and self.preview_thread.is_alive():
+            # Drugie kliknięcie w trakcie skanu przerywa liczenie profilu
+            self.preview_cancel.set()
+            self.preview_btn.setText("Przerywanie...")
+            self.preview_btn.setEnabled(False)
+            return
+        if not self.file_paths:
+            QMessageBox.warning(self, "Brak plików", "Brak plików do podglądu detekcji")
+            return
+
+        first_file = self.file_paths[0]
+        self.preview_cancel = threading.Event()
+        cancel_event = self.preview_cancel
+        self.preview_btn.setText("Profil mocy... 0% (kliknij, aby przerwać)")
+
+        last_percent = [-1]
+
+        def on_progress(done, total):
+            percent = int(100 * done / total) if total else 100
+            if percent != last_percent[0]:
+                last_percent[0] = percent
+                self.preview_progress.emit(percent)
+
+        def preview_thread():
+            try:
+                profile = get_power_profile(first_file, CHUNK_SIZE_BYTES,
+                                            progress_callback=on_progress, cancel_event=cancel_event)
+            except Exception as e:
+                self.preview_failed.emit(str(e))
+                return
+            self.preview_finished.emit(profile)
+
+        self.preview_thread = threading.Thread(target=preview_thread, daemon=True)
+        self.preview_thread.start()
+
+    def on_preview_progress(self, percent):
+        if not self.preview_cancel.is_set():
+            self.preview_btn.setText(f"Profil mocy... {percent}% (kliknij, aby przerwać)")
+
+    def reset_preview_button(self):
+        self.preview_btn.setText("Podgląd detekcji")
+        self.preview_btn.setEnabled(True)
+
+    def on_preview_finished(self, profile):
+        self.reset_preview_button()
+        if self.preview_cancel.is_set() or not self.isVisible():
+            return
+        self.update_detection_preview()
+
+    def on_preview_failed(self, message):
+        self.reset_preview_button()
+        if self.isVisible():
+            QMessageBox.critical(self, "Błąd", f"Błąd podczas liczenia profilu mocy:\n{message}")
+
+    def update_detection_preview(self, *_):
+        # Tylko profil z pamięci lub z pliku .powerprofile.npz - bez skanowania nagrania
+        profile = load_power_profile(self.file_paths[0], CHUNK_SIZE_BYTES) if self.file_paths else None
+        if profile is None:
+            self.detection_preview_label.setText("Brak profilu mocy")
+            return
+
+        sample_rate_hz = self.sample_rate_hz()
+        threshold = self.threshold.value()
+        jamming_events = segment_jamming_events(
+            profile['mean_power'],
+            profile['sample_counts'],
+            threshold,
+            power_threshold_off=threshold * (1.0 - self.hysteresis.value() / 100.0),
+            min_event_samples=ms_to_samples(self.min_event_ms.value(), sample_rate_hz),
+            merge_gap_samples=ms_to_samples(self.merge_gap_ms.value(), sample_rate_hz)
+        )
+        total_samples = sum(end - start for start, end in jamming_events)
+        self.detection_preview_label.setText(
+            f"{len(jamming_events)} okres(ów), łącznie {total_samples / sample_rate_hz:.2f} s"
+        )
+
+    def sample_rate_hz(self):
+        # Częstotliwość z ustawień analizy (etykieta "x.xxx MHz")
+        try:
+            return float(self.sample_rate_label.text().replace(' MHz', '')) * 1e6
+        except ValueError:
+            return SAMPLE_RATE_HZ
+
     def update_antenna_state(self):
         disabled_label_style = "color: #95a5a6;"
         enabled_label_style = "color: #2c3e50; font-weight: bold;"
@@ -361,7 +559,11 @@ class SettingsDialog(QDialog):
                 'frequency': float(frequency_text),
                 'threshold': int(self.threshold.value()),
                 'sample_rate': float(sample_rate_text),
-                'hold_position': self.hold_position_checkbox.isChecked()
+                'hold_position': self.hold_position_checkbox.isChecked(),
+                'hysteresis_percent': self.hysteresis.value(),
+                'min_event_ms': self.min_event_ms.value(),
+                'merge_gap_ms': self.merge_gap_ms.value(),
+                'track_window_s': self.track_window_s.value()
             }
         }
     
@@ -383,8 +585,14 @@ class SettingsDialog(QDialog):
             
             hold_position = params.get('hold_position', False)
             self.hold_position_checkbox.setChecked(hold_position)
+
+            self.hysteresis.setValue(float(params.get('hysteresis_percent', 0.0)))
+            self.min_event_ms.setValue(float(params.get('min_event_ms', 0.0)))
+            self.merge_gap_ms.setValue(float(params.get('merge_gap_ms', 0.0)))
+            self.track_window_s.setValue(float(params.get('track_window_s', 0.0)))
             
             frequency = params.get('frequency', 1575.42)
             sample_rate = params.get('sample_rate', 2.048)
             self.frequency_label.setText(f"{frequency:.2f} MHz")
-            self.sample_rate_label.setText(f"{sample_rate:.3f} MHz")
\ No newline at end of file
+            self.sample_rate_label.setText(f"{sample_rate:.3f} MHz")
+            self.update_detection_preview()
\ No newline at end of file
@@ -0,0 +1,141 @@
+import math
+import numpy as np
+
+# ==============================================================================
+#   POZIOMY SZCZEGÓŁOWOŚCI TRASY NA MAPIE (DOUGLAS-PEUCKER W BLOKACH)
+# ==============================================================================
+
+# (minimalny zoom Leaflet, tolerancja uproszczenia [m]) - od najbardziej szczegółowego
+TRACK_LOD_LEVELS = (
+    (17, 0.5),
+    (14, 3.0),
+    (11, 25.0),
+    (0, 200.0)
+)
+# Surowe fiksy zbierane przed uproszczeniem bloku - tyle maksymalnie leci na stronę "na surowo"
+TRACK_LOD_BLOCK_SIZE = 200
+# Zatwierdzona część poziomu jest upraszczana ponownie w całości, gdy urośnie 2x (min. tyle punktów) -
+# inaczej końce bloków zostają na zawsze i grube poziomy rosną liniowo z czasem
+TRACK_LOD_COMPACT_MIN_POINTS = 512
+# Twardy limit punktów zatwierdzonych w jednym poziomie: gdy uproszczenie z tolerancją poziomu nie
+# zejdzie do połowy limitu, tolerancja poziomu jest podwajana (długa sesja traci szczegóły, nie pamięć)
+TRACK_LOD_MAX_LEVEL_POINTS = 5000
+
+METERS_PER_DEG_LAT = 110540.0
+METERS_PER_DEG_LON = 111320.0
+
+
+def latlon_to_local_meters(latlon: np.ndarray) -> np.ndarray:
+  ##Płaskie współrzędne [m] względem pierwszego punktu - wystarczające dla tolerancji rzędu metrów
+    lat0 = latlon[0, 0]
+    xy = np.empty_like(latlon, dtype=np.float64)
+    xy[:, 0] = (latlon[:, 1] - latlon[0, 1]) * METERS_PER_DEG_LON * math.cos(math.radians(lat0))
+    xy[:, 1] = (latlon[:, 0] - lat0) * METERS_PER_DEG_LAT
+    return xy
+
+
+def douglas_peucker(xy: np.ndarray, tolerance: float) -> np.ndarray:
+  ##Indeksy punktów zachowanych przez Douglasa-Peuckera (iteracyjnie, bez rekurencji)
+    n = len(xy)
+    if n <= 2:
+        return np.arange(n)
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = xy[end] - xy[start]
+        offsets = xy[start + 1:end] - xy[start]
+        segment_len = math.hypot(segment[0], segment[1])
+        if segment_len == 0.0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / segment_len
+        i = int(np.argmax(distances))
+        if distances[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return np.flatnonzero(keep)
+
+
+class TrackLevelOfDetail:
+    ## Trasa na żywo w kilku poziomach szczegółowości. Surowe fiksy trafiają do ogona; pełny blok
+    ## jest upraszczany dla każdego poziomu i dopisywany do jego zatwierdzonej części, a surowe
+    ## punkty są zapominane. Strona dostaje tylko poziom pasujący do zoomu: przyrost zatwierdzonych
+    ## punktów + ogon (najwyżej TRACK_LOD_BLOCK_SIZE punktów), więc koszt klatki nie rośnie z czasem.
+
+    def __init__(self, levels=TRACK_LOD_LEVELS, block_size=TRACK_LOD_BLOCK_SIZE):
+        self.levels = levels
+        self.block_size = block_size
+        self.reset()
+
+    def reset(self):
+        self.committed = [[] for _ in self.levels]
+        self.compact_at = [TRACK_LOD_COMPACT_MIN_POINTS for _ in self.levels]
+        # Bieżąca tolerancja poziomu [m] - rośnie, gdy poziom dochodzi do TRACK_LOD_MAX_LEVEL_POINTS
+        self.tolerances = [tolerance for _, tolerance in self.levels]
+        # tail[0] to ostatni zatwierdzony punkt (kotwica bloku), gdy coś już zatwierdzono
+        self.tail = []
+        self.sent_level = None
+        self.sent_count = 0
+
+    def add_positions(self, positions):
+        for position in positions:
+            self.tail.append((position[0], position[1]))
+            if len(self.tail) > self.block_size:
+                self._commit_block()
+
+    def _commit_block(self):
+        block = np.asarray(self.tail, dtype=np.float64)
+        xy = latlon_to_local_meters(block)
+        anchored = bool(self.committed[0])
+        for level, tolerance in enumerate(self.tolerances):
+            kept = block[douglas_peucker(xy, tolerance)]
+            if anchored:
+                kept = kept[1:]
+            self.committed[level].extend(map(tuple, kept.tolist()))
+            if len(self.committed[level]) >= self.compact_at[level]:
+                self._compact_level(level)
+        self.tail = [self.tail[-1]]
+
+    def _compact_level(self, level):
+        kept = np.asarray(self.committed[level], dtype=np.float64)
+        xy = latlon_to_local_meters(kept)
+        while True:
+            keep = douglas_peucker(xy, self.tolerances[level])
+            kept, xy = kept[keep], xy[keep]
+            if len(kept) <= TRACK_LOD_MAX_LEVEL_POINTS // 2:
+                break
+            self.tolerances[level] *= 2.0
+        self.committed[level] = list(map(tuple, kept.tolist()))
+        self.compact_at[level] = max(min(2 * len(kept), TRACK_LOD_MAX_LEVEL_POINTS), TRACK_LOD_COMPACT_MIN_POINTS)
+        if level == self.sent_level:
+            # Strona ma starą wersję tego poziomu - następna aktualizacja wyśle go od nowa
+            self.sent_level = None
+
+    def level_for_zoom(self, zoom):
+        for level, (min_zoom, _) in enumerate(self.levels):
+            if zoom >= min_zoom:
+                return level
+        return len(self.levels) - 1
+
+    def updates_for_level(self, level):
+        ## (reset, nowe zatwierdzone punkty, ogon) do wysłania na stronę dla danego poziomu
+        reset = level != self.sent_level
+        if reset:
+            self.sent_level = level
+            self.sent_count = 0
+        committed = self.committed[level]
+        new_points = committed[self.sent_count:]
+        self.sent_count = len(committed)
+        tail = self.tail[1:] if self.committed[0] else self.tail
+        return reset, new_points, tail
+
+    def num_points(self, level):
+        tail_len = len(self.tail) - 1 if self.committed[0] else len(self.tail)
+        return len(self.committed[level]) + tail_len
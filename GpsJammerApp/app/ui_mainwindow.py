@@ -1,4 +1,5 @@
 import os
+import json
 import random
 import subprocess  
 import sys         
@@ -6,13 +7,23 @@ from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QPushButton, QLabel, QGroupBox, 
                              QTextEdit, QFileDialog, QProgressBar, 
                              QSpinBox, QDoubleSpinBox)
-from PySide6.QtWebEngineWidgets import QWebEngineView
-from PySide6.QtCore import Qt, QTimer 
+from PySide6.QtCore import Qt, QTimer, Signal
 
 from . import config
-from .worker import GPSAnalysisThread
+
+# Linie panelu wyników w trakcie analizy (najstarsze są usuwane)
+ANALYSIS_TEXT_MAX_LINES = 50
+# Co ile sprawdzamy zoom mapy, żeby podmienić poziom szczegółowości trasy
+MAP_ZOOM_POLL_MS = 500
+# Czas na samodzielne zakończenie wątku analizy po zatrzymaniu gnssdec
+ANALYSIS_STOP_TIMEOUT_MS = 10000
+# QtWebEngine (Chromium) startuje dopiero po pokazaniu okna - najpierw okno się narysuje
+MAP_VIEW_INIT_DELAY_MS = 50
 
 class MainWindow(QMainWindow):
+    # loadFinished strony mapy (dla --profile-startup i kodu czekającego na mapę)
+    map_loaded = Signal(bool)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("GPS Jamming - Mapa i Analiza Sygnałów")
@@ -33,27 +44,24 @@ class MainWindow(QMainWindow):
         self.main_layout = QHBoxLayout(main_widget)
 
         self.control_panel = self.create_control_panel()
-        self.web_view = QWebEngineView()
-        
-        try:
-            with open("resources/map_template.html", "r", encoding="utf-8") as f:
-                html_template = f.read()
-            self.web_view.setHtml(html_template.format(
-                LAT=config.LAT, 
-                LNG=config.LNG, 
-                ZOOM=config.ZOOM
-            ))
-        except FileNotFoundError:
-            print("BŁĄD: Nie można załadować pliku z mapa!")
-            self.web_view.setHtml("<h1>Błąd: Nie znaleziono pliku map_template.html</h1>")
+        # Zaślepka do czasu init_map_view - import QtWebEngine i start Chromium trwają najdłużej
+        self.web_view = QLabel("Ładowanie mapy...")
+        self.web_view.setAlignment(Qt.AlignCenter)
 
         self.main_layout.addWidget(self.control_panel, 0)
         self.main_layout.addWidget(self.web_view, 0)
+        QTimer.singleShot(MAP_VIEW_INIT_DELAY_MS, self.init_map_view)
 
         self.update_layout_proportions()
  
         self.analysis_thread = None
         self.is_map_centered = False
+        # Trasa na żywo upraszczana w Pythonie; na stronę idzie tylko poziom dla bieżącego zoomu
+        # (tworzona przy pierwszej pozycji - track_lod ciągnie numpy)
+        self.track_lod = None
+        self.map_zoom = config.ZOOM
+        self.map_zoom_timer = QTimer(self)
+        self.map_zoom_timer.timeout.connect(self.poll_map_zoom)
         self.selected_satellite_system = 'GPS'  # domyslny system
         self.jammer_shown = False
         
@@ -91,7 +99,11 @@ class MainWindow(QMainWindow):
             'analysis_params': {
                 'frequency': 1575.42,
                 'threshold': 120,
-                'sample_rate': 2.048
+                'sample_rate': 2.048,
+                'hysteresis_percent': 0.0,
+                'min_event_ms': 0.0,
+                'merge_gap_ms': 0.0,
+                'track_window_s': 0.0
             }
         }
         self.update_satellite_system_display()
@@ -539,6 +551,28 @@ class MainWindow(QMainWindow):
         
         return control_panel
 
+    def init_map_view(self):
+        from PySide6.QtWebEngineWidgets import QWebEngineView
+
+        placeholder = self.web_view
+        self.web_view = QWebEngineView()
+        self.web_view.loadFinished.connect(self.map_loaded.emit)
+        try:
+            with open("resources/map_template.html", "r", encoding="utf-8") as f:
+                html_template = f.read()
+            self.web_view.setHtml(html_template.format(
+                LAT=config.LAT, 
+                LNG=config.LNG, 
+                ZOOM=config.ZOOM
+            ))
+        except FileNotFoundError:
+            print("BŁĄD: Nie można załadować pliku z mapa!")
+            self.web_view.setHtml("<h1>Błąd: Nie znaleziono pliku map_template.html</h1>")
+
+        self.main_layout.replaceWidget(placeholder, self.web_view)
+        placeholder.deleteLater()
+        self.update_layout_proportions()
+
     def update_layout_proportions(self):
         window_width = self.width()
         
@@ -681,16 +715,28 @@ class MainWindow(QMainWindow):
             f"📍 Utrzymuj pozycję: {hold_position_status}\n"
         )
         
+        analysis_params = self.current_settings['analysis_params']
+        power_threshold = analysis_params.get('threshold', 120.0)
+        detection_params = {
+            'threshold_off': power_threshold * (1.0 - analysis_params.get('hysteresis_percent', 0.0) / 100.0),
+            'min_event_ms': analysis_params.get('min_event_ms', 0.0),
+            'merge_gap_ms': analysis_params.get('merge_gap_ms', 0.0),
+            'sample_rate_hz': analysis_params.get('sample_rate', 2.048) * 1e6
+        }
+        from .worker import GPSAnalysisThread
         self.analysis_thread = GPSAnalysisThread(
             self.current_files, 
-            power_threshold=self.current_settings['analysis_params'].get('threshold', 120.0),
+            power_threshold=power_threshold,
             antenna_positions=self.current_settings.get('antenna_positions'),
             satellite_system=self.selected_satellite_system,
-            hold_position=self.current_settings['analysis_params'].get('hold_position', False)
+            hold_position=analysis_params.get('hold_position', False),
+            detection_params=detection_params,
+            triangulation_window_s=analysis_params.get('track_window_s', 0.0) or None
         )
+        self.results_text.document().setMaximumBlockCount(ANALYSIS_TEXT_MAX_LINES)
         self.analysis_thread.progress_update.connect(self.update_progress)
         self.analysis_thread.analysis_complete.connect(self.analysis_finished)
-        self.analysis_thread.new_position_data.connect(self.update_map_position)
+        self.analysis_thread.new_position_batch.connect(self.update_map_positions)
         self.analysis_thread.new_analysis_text.connect(self.update_analysis_text)
         self.analysis_thread.triangulation_complete.connect(self.on_triangulation_result)
         self.analysis_thread.finished.connect(self.on_analysis_thread_finished)
@@ -698,14 +744,8 @@ class MainWindow(QMainWindow):
         self.analysis_thread.start()
     
     def update_analysis_text(self, text):
-        current_text = self.results_text.toPlainText()
-        updated_text = current_text + "\n" + text
-        lines = updated_text.split('\n')
-        if len(lines) > 50:
-            lines = lines[-50:]
-            updated_text = '\n'.join(lines)
-        
-        self.results_text.setPlainText(updated_text)
+        # Dopisanie na końcu; dokument sam usuwa najstarsze linie ponad ANALYSIS_TEXT_MAX_LINES
+        self.results_text.append(text)
         scrollbar = self.results_text.verticalScrollBar()
         scrollbar.setValue(scrollbar.maximum())
  
@@ -734,14 +774,43 @@ class MainWindow(QMainWindow):
         else:
             self.progress_bar.setFormat("Przygotowanie analizy...")
         
-    def update_map_position(self, lat, lon):
+    def update_map_positions(self, positions):
+        # Jedna klatka pozycji = jedno wywołanie runJavaScript, niezależnie od liczby epok
+        if not positions:
+            return
         if not self.is_map_centered:
-            js_pan_code = f"map.setView([{lat:.8f}, {lon:.8f}], 19);"
-            self.web_view.page().runJavaScript(js_pan_code)
-            self.is_map_centered = True 
+            lat, lon = positions[0][0], positions[0][1]
+            self.web_view.page().runJavaScript(f"map.setView([{lat:.8f}, {lon:.8f}], 19);")
+            self.is_map_centered = True
+            self.map_zoom = 19
+            self.map_zoom_timer.start(MAP_ZOOM_POLL_MS)
+
+        if self.track_lod is None:
+            from .track_lod import TrackLevelOfDetail
+            self.track_lod = TrackLevelOfDetail()
+        self.track_lod.add_positions(positions)
+        self.send_live_track(follow=True)
+
+    def send_live_track(self, follow):
+        level = self.track_lod.level_for_zoom(self.map_zoom)
+        reset, committed, tail = self.track_lod.updates_for_level(level)
+        committed_js = ",".join(f"[{lat:.8f},{lon:.8f}]" for lat, lon in committed)
+        tail_js = ",".join(f"[{lat:.8f},{lon:.8f}]" for lat, lon in tail)
+        self.web_view.page().runJavaScript(
+            f"updateLiveTrack({'true' if reset else 'false'}, [{committed_js}], [{tail_js}], "
+            f"{'true' if follow else 'false'});"
+        )
 
-        js_draw_code = f"updateLivePosition({lat:.8f}, {lon:.8f});"
-        self.web_view.page().runJavaScript(js_draw_code)
+    def poll_map_zoom(self):
+        self.web_view.page().runJavaScript("map.getZoom();", 0, self.on_map_zoom)
+
+    def on_map_zoom(self, zoom):
+        if zoom is None:
+            return
+        self.map_zoom = zoom
+        # Inny poziom szczegółowości - strona dostaje całą trasę w nowym poziomie
+        if self.track_lod.level_for_zoom(zoom) != self.track_lod.sent_level and self.track_lod.sent_level is not None:
+            self.send_live_track(follow=False)
 
     def on_triangulation_result(self, result):
         if result['success']:
@@ -772,6 +841,8 @@ class MainWindow(QMainWindow):
             map.setView([{geo['lat']}, {geo['lon']}], 18);
             """
             self.web_view.page().runJavaScript(js_add_jammer)
+            if result.get('track'):
+                self.show_jammer_track(result['track'])
             if hasattr(self, 'current_files') and len(self.current_files) >= 2:
                 settings_positions = self.current_settings.get('antenna_positions', {})
                 antenna_positions = [
@@ -804,6 +875,8 @@ class MainWindow(QMainWindow):
                 f"  Odległości od anten: {[f'{d:.1f}m' for d in distances if d is not None]}\n"
                 f"  Metoda: {result['num_antennas']}-antenna triangulation"
             )
+            if result.get('track'):
+                triangulation_text += f"\n  Trasa jammera: {len(result['track'])} punktów co {result['track_window_s']} s"
             
             current_text = self.results_text.toPlainText()
             self.results_text.setPlainText(current_text + triangulation_text)
@@ -819,9 +892,14 @@ class MainWindow(QMainWindow):
         """Zatrzymuje trwającą analizę"""
         if self.analysis_thread and self.analysis_thread.isRunning():
             self.results_text.append("\n⏹️ Zatrzymywanie analizy...")
-            self.analysis_thread.stop_requested = True
-            self.analysis_thread.terminate()
-            self.analysis_thread.wait(3000)
+            # SIGTERM do gnssdec - wątek analizy kończy się sam, terminate() tylko w ostateczności
+            self.analysis_thread.request_stop()
+            if not self.analysis_thread.wait(ANALYSIS_STOP_TIMEOUT_MS):
+                if self.analysis_thread.decoder:
+                    self.analysis_thread.decoder.kill()
+                if not self.analysis_thread.wait(3000):
+                    self.analysis_thread.terminate()
+                    self.analysis_thread.wait(3000)
             if hasattr(self.analysis_thread, 'shutdown_server'):
                 self.analysis_thread.shutdown_server()
             
@@ -840,6 +918,7 @@ class MainWindow(QMainWindow):
             self.progress_bar.setFormat("Analiza przerwana")
     
     def on_analysis_thread_finished(self):
+        self.results_text.document().setMaximumBlockCount(0)
         self.analyze_btn.setEnabled(True)
         self.browse_btn.setEnabled(True)
         self.settings_btn.setEnabled(True)
@@ -851,6 +930,7 @@ class MainWindow(QMainWindow):
         self.stop_btn.setEnabled(False)
 
     def analysis_finished(self, points):
+        self.results_text.document().setMaximumBlockCount(0)
         self.analyze_btn.setEnabled(True)
         self.browse_btn.setEnabled(True)
         self.settings_btn.setEnabled(True)
@@ -874,7 +954,8 @@ class MainWindow(QMainWindow):
                     duration = result.get('duration', 0)
                     
                     jamming_text += f"Zdarzenie {event_num}:\n"
-                    duration_ms = (duration / 2048000) * 1000
+                    sample_rate_hz = self.current_settings['analysis_params'].get('sample_rate', 2.048) * 1e6
+                    duration_ms = (duration / sample_rate_hz) * 1000
                     jamming_text += f"  Czas: {duration_ms:.2f} ms\n\n"
                 self.results_text.setPlainText(jamming_text)
                 
@@ -909,6 +990,24 @@ class MainWindow(QMainWindow):
             current_text = self.results_text.toPlainText()
             self.results_text.setPlainText(current_text + error_text)
 
+    def show_jammer_track(self, track):
+        ## Trasa jammera z okien triangulacji: linia + punkt na okno (popup z czasem od początku nagrania)
+        points = [[p['lat'], p['lon'], p['start_s']] for p in track]
+        js_track = f"""
+        if (window.jammerTrackLayer) {{ map.removeLayer(window.jammerTrackLayer); }}
+        var trackPoints = {json.dumps(points)};
+        window.jammerTrackLayer = L.layerGroup().addTo(map);
+        L.polyline(trackPoints.map(function(p) {{ return [p[0], p[1]]; }}), {{
+            color: 'darkred', weight: 3, dashArray: '6 4'
+        }}).addTo(window.jammerTrackLayer);
+        trackPoints.forEach(function(p) {{
+            L.circleMarker([p[0], p[1]], {{radius: 4, color: 'darkred', fillColor: 'red', fillOpacity: 0.9}})
+                .bindPopup('Jammer t=' + p[2].toFixed(1) + ' s')
+                .addTo(window.jammerTrackLayer);
+        }});
+        """
+        self.web_view.page().runJavaScript(js_track)
+
     def clear_markers_silently(self):
         self.web_view.page().runJavaScript("clearSignalMarkers();")
         js_clear_all = """
@@ -919,9 +1018,16 @@ class MainWindow(QMainWindow):
                 }
             }
         });
+        if (window.jammerTrackLayer) {
+            map.removeLayer(window.jammerTrackLayer);
+            window.jammerTrackLayer = null;
+        }
         """
         self.web_view.page().runJavaScript(js_clear_all)
         self.is_map_centered = False
+        self.map_zoom_timer.stop()
+        if self.track_lod:
+            self.track_lod.reset()
   
     def run_simulation_script(self):
             python_executable = sys.executable
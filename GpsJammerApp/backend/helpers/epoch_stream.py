@@ -0,0 +1,27 @@
+"""
+Odbiór epok JSON z gnssdec wspólny dla helperów (get_csv.py, test_http_server.py)
+"""
+
+
+def read_epoch_lines(rfile, wfile):
+    # Nowy gnssdec: jedno trwałe połączenie, epoka JSON w każdej linii.
+    # gnssdec sprzed przebudowy: jedno żądanie POST /data na epokę - odpowiadamy 200 jak dawny serwer HTTP.
+    for line in rfile:
+        if line.startswith(b"POST "):
+            length = 0
+            for header in rfile:
+                if not header.strip():
+                    break
+                name, _, value = header.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value.strip() or 0)
+            body = rfile.read(length)
+            try:
+                wfile.write(b"HTTP/1.1 200 OK\r\nContent-Length: 15\r\nConnection: close\r\n\r\n{\"status\":\"ok\"}")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            yield body
+            return
+        line = line.strip()
+        if line:
+            yield line
@@ -6,57 +6,44 @@ import json
 import signal
 import subprocess
 import threading
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import socketserver
 from pathlib import Path
 from typing import Optional
 
+try:
+    from .epoch_stream import read_epoch_lines
+except ImportError:
+    from epoch_stream import read_epoch_lines
 
-class CSVRequestHandler(BaseHTTPRequestHandler):
+
+class CSVRequestHandler(socketserver.StreamRequestHandler):
     writer: Optional[csv.writer] = None
     csv_file = None
     lock = threading.Lock()
     header_written = False
 
-    def do_POST(self):
-        if self.path != "/data":
-            self.send_error(404)
-            return
+    def handle(self):
+        for line in read_epoch_lines(self.rfile, self.wfile):
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                continue
 
-        try:
-            length = int(self.headers.get("Content-Length", "0"))
-        except ValueError:
-            self.send_error(400)
-            return
+            elapsed = data.get("elapsed_time")
+            position = data.get("position") or {}
+            lat = position.get("lat")
+            lon = position.get("lon")
 
-        payload = self.rfile.read(length)
-        try:
-            data = json.loads(payload.decode("utf-8"))
-        except json.JSONDecodeError:
-            self.send_error(400)
-            return
-
-        elapsed = data.get("elapsed_time")
-        position = data.get("position") or {}
-        lat = position.get("lat")
-        lon = position.get("lon")
-
-        with self.lock:
-            if self.writer:
-                self.writer.writerow([elapsed, lat, lon])
-                if self.csv_file:
-                    self.csv_file.flush()
+            with self.lock:
+                if self.writer:
+                    self.writer.writerow([elapsed, lat, lon])
+                    if self.csv_file:
+                        self.csv_file.flush()
 
-        try:
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            self.wfile.write(b'{"status":"ok"}')
-        except (BrokenPipeError, ConnectionResetError):
-            pass
 
-    def log_message(self, format, *args):
-        # wyciszamy standardowe logi HTTP
-        pass
+class CSVServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
 
 
 def parse_args():
@@ -109,7 +96,7 @@ def main():
         stem = stem[:-4]
     csv_path = input_path.with_name(f"{stem}.csv")
 
-    server = HTTPServer(("127.0.0.1", 1234), CSVRequestHandler)
+    server = CSVServer(("127.0.0.1", 1234), CSVRequestHandler)
     retcode = 0
 
     with csv_path.open("w", newline="") as csv_file:
@@ -120,7 +107,7 @@ def main():
         writer.writerow(["elapsed_time", "lat", "lon"])
 
         server_thread = threading.Thread(
-            target=server.serve_forever, name="HTTPServer", daemon=True
+            target=server.serve_forever, name="CSVServer", daemon=True
         )
         server_thread.start()
 
@@ -1,67 +1,48 @@
 #!/usr/bin/env python3
 """
-Prosty serwer HTTP do odbierania danych JSON z gnssdec
+Prosty serwer do odbierania danych JSON z gnssdec
+(trwałe połączenie TCP, jedna epoka JSON na linię; stary gnssdec: POST /data)
 Uruchom: python3 test_http_server.py
 """
 
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import socketserver
 import json
 import datetime
 import os
 
+try:
+    from .epoch_stream import read_epoch_lines
+except ImportError:
+    from epoch_stream import read_epoch_lines
+
 # Plik do zapisu danych
 LOG_FILE = "check.txt"
 
-class JSONHandler(BaseHTTPRequestHandler):
-    def do_POST(self):
-        if self.path == '/data':
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length)
-
+class JSONHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in read_epoch_lines(self.rfile, self.wfile):
             try:
-                data = json.loads(body.decode('utf-8'))
-                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                print(f"\n[{timestamp}] Otrzymano dane JSON:")
-                print(json.dumps(data, indent=2, ensure_ascii=False))
-                
-                with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                    f.write(f"\n{'='*80}\n")
-                    f.write(f"[{timestamp}]\n")
-                    f.write(json.dumps(data, indent=2, ensure_ascii=False))
-                    f.write("\n")
-                print(f"Dopisano do pliku: {LOG_FILE}")
-
-                try:
-                    self.send_response(200)
-                    self.send_header('Content-Type', 'application/json')
-                    self.send_header('Content-Length', '15')
-                    self.end_headers()
-                    self.wfile.write(b'{"status":"ok"}')
-                except (BrokenPipeError, ConnectionResetError):
-                    # Klient zamknął połączenie - to OK
-                    pass
+                data = json.loads(line)
             except Exception as e:
                 print(f"Błąd parsowania JSON: {e}")
-                try:
-                    self.send_response(400)
-                    self.end_headers()
-                except (BrokenPipeError, ConnectionResetError):
-                    pass
-        else:
-            try:
-                self.send_response(404)
-                self.end_headers()
-            except (BrokenPipeError, ConnectionResetError):
-                pass
+                continue
 
-    def log_message(self, format, *args):
-        # Wyciszenie standardowych logów HTTP
-        pass
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+            print(f"\n[{timestamp}] Otrzymano dane JSON:")
+            print(json.dumps(data, indent=2, ensure_ascii=False))
+            
+            with open(LOG_FILE, 'a', encoding='utf-8') as f:
+                f.write(f"\n{'='*80}\n")
+                f.write(f"[{timestamp}]\n")
+                f.write(json.dumps(data, indent=2, ensure_ascii=False))
+                f.write("\n")
+            print(f"Dopisano do pliku: {LOG_FILE}")
 
 if __name__ == '__main__':
     server_address = ('127.0.0.1', 1234)
-    httpd = HTTPServer(server_address, JSONHandler)
-    print(f"Serwer HTTP nasłuchuje na http://127.0.0.1:1234")
+    socketserver.TCPServer.allow_reuse_address = True
+    httpd = socketserver.TCPServer(server_address, JSONHandler)
+    print(f"Serwer nasłuchuje na tcp://127.0.0.1:1234")
     print(f"Dane będą zapisywane do pliku: {LOG_FILE}")
     print("Czekam na dane z gnssdec...\n")
     try:
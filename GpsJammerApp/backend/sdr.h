@@ -36,6 +36,11 @@ extern "C" {
 #endif
 
 extern int hold_enabled;
+extern int binary_output;
+extern int ingest_port;
+
+/* Domyślny port odbiornika epok (zmiana opcją -p) */
+#define INGEST_DEFAULT_PORT 1234
 
 #define ROUND(x) ((int)floor((x) + 0.5))
 #define PI 3.1415926535897932
@@ -537,6 +542,7 @@ extern void file_getbuff(uint64_t buffloc, int n, int ftype, int dtype,
                          char *expbuf);
 extern void add_message(const char *msg);
 extern void updateNavStatusWin(int counter);
+extern void epoch_sink_stop(void);
 
 #ifdef __cplusplus
 }
@@ -19,6 +19,8 @@ sdrch_t sdrch[MAXSAT] = {{0}};
 sdrekf_t sdrekf = {0};
 sdrgui_t sdrgui = {0};
 int hold_enabled = 0;
+int binary_output = 0;
+int ingest_port = INGEST_DEFAULT_PORT;
 
 int main(int argc, char **argv) {
     int sys_type = SYS_GPS;  /* default to GPS */
@@ -26,15 +28,18 @@ int main(int argc, char **argv) {
     int opt;
 
     if (argc < 2) {
-        printf("Użycie: %s [-g|-a|-l|-h] <plik_do_analizy>\n", argv[0]);
+        printf("Użycie: %s [-g|-a|-l|-h|-b|-p port] <plik_do_analizy>\n", argv[0]);
         printf("  -g    tryb GPS (domyślny)\n");
         printf("  -a    tryb Galileo\n");
         printf("  -l    tryb GLONASS\n");
         printf("  -h    włącza system hold pozycji\n");
+        printf("  -b    epoki w zwartym formacie binarnym zamiast JSON\n");
+        printf("  -p    port odbiornika epok na 127.0.0.1 (domyślnie %d)\n", INGEST_DEFAULT_PORT);
+        printf("        0 = bez gniazda, epoki tylko na stdout (buforowane liniami)\n");
         return 1;
     }
 
-    while ((opt = getopt(argc, argv, "galh")) != -1) {
+    while ((opt = getopt(argc, argv, "galhbp:")) != -1) {
         switch (opt) {
         case 'g':
             sys_type = SYS_GPS;
@@ -48,20 +53,38 @@ int main(int argc, char **argv) {
         case 'h':
             hold_enabled = 1;
             break;
+        case 'b':
+            binary_output = 1;
+            break;
+        case 'p': {
+            char *port_end;
+            long port = strtol(optarg, &port_end, 10);
+            if (port_end == optarg || *port_end != '\0' || port < 0 || port > 65535) {
+                printf("Błąd: niepoprawny port %s\n", optarg);
+                return 1;
+            }
+            ingest_port = (int)port;
+            break;
+        }
         default:
-            printf("Użycie: %s [-g|-a|-l|-h] <plik_do_analizy>\n", argv[0]);
+            printf("Użycie: %s [-g|-a|-l|-h|-b|-p port] <plik_do_analizy>\n", argv[0]);
             return 1;
         }
     }
 
     if (optind >= argc) {
         printf("Błąd: brak nazwy pliku\n");
-        printf("Użycie: %s [-g|-a|-l|-h] <plik_do_analizy>\n", argv[0]);
+        printf("Użycie: %s [-g|-a|-l|-h|-b|-p port] <plik_do_analizy>\n", argv[0]);
         return 1;
     }
 
     input_file = argv[optind];
 
+    if (ingest_port == 0) {
+        /* Epoki czytane ze stdout przez rurę - każda linia od razu, nie co 4 KiB */
+        setvbuf(stdout, NULL, _IOLBF, 0);
+    }
+
     if (loadinit(&sdrini, input_file, sys_type) < 0) {
         return -1;
     }
@@ -210,6 +233,8 @@ extern void startsdr(void) {
         usleep(100000);
     }
 
+    epoch_sink_stop();
+
     for (int i = 0; i < sdrgui.message_count; i++) {
         free(sdrgui.messages[i]);
     }
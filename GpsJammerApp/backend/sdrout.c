@@ -1,19 +1,21 @@
 #include "sdr.h"
 #include <arpa/inet.h>
 #include <netinet/in.h>
+#include <netinet/tcp.h>
+#include <semaphore.h>
+#include <stdatomic.h>
 #include <sys/socket.h>
 #include <unistd.h>
 
-#define HTTP_HOST "127.0.0.1"
-#define HTTP_PORT 1234
+#define INGEST_HOST "127.0.0.1"
 
-static int send_json_http(const char *json_data) {
-    int sock;
-    struct sockaddr_in server;
-    char request[8192];
-    int json_len = strlen(json_data);
+/* Jedno trwałe połączenie TCP na cały przebieg - epoki jako JSON rozdzielany
+ * znakiem nowej linii (NDJSON), bez nagłówków HTTP i bez czekania na odpowiedź */
+static int ingest_sock = -1;
 
-    sock = socket(AF_INET, SOCK_STREAM, 0);
+static int ingest_connect(void) {
+    struct sockaddr_in server;
+    int sock = socket(AF_INET, SOCK_STREAM, 0);
     if (sock == -1) {
         return -1;
     }
@@ -21,41 +23,204 @@ static int send_json_http(const char *json_data) {
     struct timeval timeout;
     timeout.tv_sec = 1;
     timeout.tv_usec = 0;
-    setsockopt(sock, SOL_SOCKET, SO_RCVTIMEO, &timeout, sizeof(timeout));
     setsockopt(sock, SOL_SOCKET, SO_SNDTIMEO, &timeout, sizeof(timeout));
+    int nodelay = 1;
+    setsockopt(sock, IPPROTO_TCP, TCP_NODELAY, &nodelay, sizeof(nodelay));
 
     server.sin_family = AF_INET;
-    server.sin_port = htons(HTTP_PORT);
-    server.sin_addr.s_addr = inet_addr(HTTP_HOST);
+    server.sin_port = htons((uint16_t)ingest_port);
+    server.sin_addr.s_addr = inet_addr(INGEST_HOST);
 
     if (connect(sock, (struct sockaddr *)&server, sizeof(server)) < 0) {
         close(sock);
         return -1;
     }
+    return sock;
+}
 
-    snprintf(request, sizeof(request),
-             "POST /data HTTP/1.1\r\n"
-             "Host: %s:%d\r\n"
-             "Content-Type: application/json\r\n"
-             "Content-Length: %d\r\n"
-             "Connection: close\r\n"
-             "\r\n"
-             "%s",
-             HTTP_HOST, HTTP_PORT, json_len, json_data);
-
-    if (send(sock, request, strlen(request), 0) < 0) {
-        close(sock);
-        return -1;
+static int send_all(int sock, const char *data, size_t len) {
+    while (len > 0) {
+        ssize_t n = send(sock, data, len, MSG_NOSIGNAL);
+        if (n <= 0) {
+            return -1;
+        }
+        data += n;
+        len -= (size_t)n;
     }
+    return 0;
+}
 
-    // Odczytaj odpowiedź (żeby uniknąć BrokenPipe po stronie serwera)
-    char response[256];
-    recv(sock, response, sizeof(response) - 1, 0);
+static int send_json_stream(const char *json_line, size_t len) {
+    /* Brak odbiorcy: kolejna próba połączenia przy następnej epoce */
+    if (ingest_sock < 0) {
+        ingest_sock = ingest_connect();
+        if (ingest_sock < 0) {
+            return -1;
+        }
+    }
 
-    close(sock);
+    if (send_all(ingest_sock, json_line, len) < 0) {
+        close(ingest_sock);
+        ingest_sock = -1;
+        return -1;
+    }
     return 0;
 }
 
+/* Asynchroniczne wyjście epok: pętla nawigacji tylko kopiuje gotowy JSON do
+ * pierścienia (jeden producent, jeden konsument, bez blokad), a osobny wątek
+ * wysyła go do odbiorcy. Pełny pierścień albo nieudane wysłanie = epoka
+ * pominięta i policzona w dropped_epochs. */
+#define EPOCH_RING_SLOTS 32
+#define EPOCH_SLOT_SIZE 16384
+
+static struct {
+    char data[EPOCH_RING_SLOTS][EPOCH_SLOT_SIZE];
+    size_t len[EPOCH_RING_SLOTS];
+    atomic_size_t head; /* następny slot do zapisu (tylko producent) */
+    atomic_size_t tail; /* następny slot do wysłania (tylko wątek wysyłający) */
+    atomic_ullong dropped;
+    atomic_int stop;
+    sem_t items;
+    pthread_t thread;
+    int started;
+} epoch_ring;
+
+static pthread_once_t epoch_sink_once = PTHREAD_ONCE_INIT;
+
+static void *epoch_sender_thread(void *arg) {
+    (void)arg;
+    for (;;) {
+        if (sem_wait(&epoch_ring.items) < 0) {
+            continue; /* EINTR */
+        }
+        size_t tail = atomic_load_explicit(&epoch_ring.tail, memory_order_relaxed);
+        size_t head = atomic_load_explicit(&epoch_ring.head, memory_order_acquire);
+        if (tail == head) {
+            if (atomic_load(&epoch_ring.stop)) {
+                break;
+            }
+            continue;
+        }
+        size_t slot = tail % EPOCH_RING_SLOTS;
+        if (send_json_stream(epoch_ring.data[slot], epoch_ring.len[slot]) < 0) {
+            atomic_fetch_add(&epoch_ring.dropped, 1);
+        }
+        atomic_store_explicit(&epoch_ring.tail, tail + 1, memory_order_release);
+    }
+    return NULL;
+}
+
+static void epoch_sink_start(void) {
+    sem_init(&epoch_ring.items, 0, 0);
+    if (pthread_create(&epoch_ring.thread, NULL, epoch_sender_thread, NULL) == 0) {
+        epoch_ring.started = 1;
+    } else {
+        SDRPRINTF("error: epoch sender thread\n");
+    }
+}
+
+static void epoch_sink_push(const char *data, size_t len, int newline) {
+    if (ingest_port == 0) {
+        return; /* -p 0: epoki tylko na stdout */
+    }
+    pthread_once(&epoch_sink_once, epoch_sink_start);
+    if (!epoch_ring.started) {
+        atomic_fetch_add(&epoch_ring.dropped, 1);
+        return;
+    }
+
+    size_t head = atomic_load_explicit(&epoch_ring.head, memory_order_relaxed);
+    size_t tail = atomic_load_explicit(&epoch_ring.tail, memory_order_acquire);
+    if (head - tail >= EPOCH_RING_SLOTS) {
+        atomic_fetch_add(&epoch_ring.dropped, 1);
+        return;
+    }
+
+    size_t slot = head % EPOCH_RING_SLOTS;
+    if (len > EPOCH_SLOT_SIZE - 1) {
+        len = EPOCH_SLOT_SIZE - 1;
+    }
+    memcpy(epoch_ring.data[slot], data, len);
+    if (newline) {
+        epoch_ring.data[slot][len++] = '\n';
+    }
+    epoch_ring.len[slot] = len;
+    atomic_store_explicit(&epoch_ring.head, head + 1, memory_order_release);
+    sem_post(&epoch_ring.items);
+}
+
+/* Dosyła epoki z pierścienia i kończy wątek wysyłający */
+extern void epoch_sink_stop(void) {
+    if (!epoch_ring.started) {
+        return;
+    }
+    atomic_store(&epoch_ring.stop, 1);
+    sem_post(&epoch_ring.items);
+    pthread_join(epoch_ring.thread, NULL);
+    epoch_ring.started = 0;
+    if (ingest_sock >= 0) {
+        close(ingest_sock);
+        ingest_sock = -1;
+    }
+}
+
+/* Zwarty format binarny epoki (opcja -b): nagłówek + tablica kanałów +
+ * tablica obserwacji, struktury spakowane, little-endian. Rekord zaczyna się
+ * od "GJEB", więc odbiorca odróżnia go od linii JSON po pierwszym bajcie.
+ * Układ musi zgadzać się z dtype w GpsJammerApp/app/epoch_ingest.py. */
+#define EPOCH_BIN_MAGIC "GJEB"
+#define EPOCH_BIN_VERSION 1
+#define EPOCH_BIN_FLAG_EKF 0x1
+#define EPOCH_BIN_FLAG_HOLD 0x2
+#define EPOCH_BIN_CH_ACQ 0x1
+#define EPOCH_BIN_CH_SYNC 0x2
+#define EPOCH_BIN_CH_DEC 0x4
+
+typedef struct __attribute__((packed)) {
+    char magic[4];
+    uint32_t record_size;
+    uint16_t version;
+    uint16_t n_channels;
+    uint16_t n_obs;
+    uint16_t nsat;
+    uint32_t flags;
+    uint32_t reserved;
+    double elapsed_time;
+    double utc_time;
+    uint64_t dropped_epochs;
+    uint64_t buffcnt;
+    double lat;
+    double lon;
+    double hgt;
+    double gdop;
+    double clk_bias;
+} epoch_bin_header_t;
+
+typedef struct __attribute__((packed)) {
+    int16_t prn;
+    uint8_t flags;
+    uint8_t reserved;
+} epoch_bin_channel_t;
+
+typedef struct __attribute__((packed)) {
+    int16_t prn;
+    int16_t week;
+    double tow;
+    float snr;
+    float doppler;
+    float az;
+    float el;
+    float residual;
+    float innovation;
+} epoch_bin_obs_t;
+
+_Static_assert(sizeof(epoch_bin_header_t) == 96, "epoch_bin_header_t");
+_Static_assert(sizeof(epoch_bin_channel_t) == 4, "epoch_bin_channel_t");
+_Static_assert(sizeof(epoch_bin_obs_t) == 36, "epoch_bin_obs_t");
+_Static_assert(sizeof(epoch_bin_header_t) + MAXSAT * (sizeof(epoch_bin_channel_t) +
+               sizeof(epoch_bin_obs_t)) < EPOCH_SLOT_SIZE, "binary epoch > ring slot");
+
 void init_sdrgui_messages() {
     for (int i = 0; i < MAX_MESSAGES; i++) {
         sdrgui.messages[i] = NULL;
@@ -192,6 +357,7 @@ extern void updateNavStatusWin(int counter) {
 
     #define JSON_APPEND(fmt, ...)                                                          \
     do {                                                                                  \
+        if (binary_output) break;                                                         \
         int _n = snprintf(json_buffer + json_pos,                                          \
                            sizeof(json_buffer) - json_pos, fmt, ##__VA_ARGS__);           \
         if (_n < 0) _n = 0;                                                               \
@@ -214,6 +380,8 @@ extern void updateNavStatusWin(int counter) {
     JSON_APPEND("{");
     JSON_APPEND("\"elapsed_time\":%.3f,", sdrstat.elapsedTime);
     JSON_APPEND("\"time\":\"%s\",", bufferNav);
+    JSON_APPEND("\"dropped_epochs\":%llu,",
+                 (unsigned long long)atomic_load(&epoch_ring.dropped));
 
     printf("ETIME|%.3f\n", sdrstat.elapsedTime);
     printf("TIME|%s\n", bufferNav);
@@ -324,11 +492,68 @@ extern void updateNavStatusWin(int counter) {
     }
     JSON_APPEND("]}");
 
-    if (json_pos >= (int)sizeof(json_buffer)) {
-        json_buffer[sizeof(json_buffer) - 1] = '\0';
-    }
+    if (binary_output) {
+        static char bin_buffer[EPOCH_SLOT_SIZE];
+        epoch_bin_header_t *hdr = (epoch_bin_header_t *)bin_buffer;
+        epoch_bin_channel_t *ch =
+            (epoch_bin_channel_t *)(bin_buffer + sizeof(epoch_bin_header_t));
+        epoch_bin_obs_t *ob = (epoch_bin_obs_t *)(ch + used_ch);
+        int n_obs = 0;
+
+        for (int i = 0; i < used_ch; i++) {
+            ch[i].prn = (int16_t)prn[i];
+            ch[i].flags = (flagacq[i] == 1 ? EPOCH_BIN_CH_ACQ : 0) |
+                          (flagsync[i] == 1 ? EPOCH_BIN_CH_SYNC : 0) |
+                          (flagdec[i] == 1 ? EPOCH_BIN_CH_DEC : 0);
+            ch[i].reserved = 0;
+        }
+        for (int i = 0; i < nsat && i < MAXSAT; i++) {
+            int prn_val = sdrstat.obsValidList[i];
+            if (prn_val < 1 || prn_val > MAXSAT) {
+                continue;
+            }
+            const double *o = &obs_v[(prn_val - 1) * 11];
+            ob[n_obs].prn = (int16_t)o[0];
+            ob[n_obs].week = (int16_t)o[7];
+            ob[n_obs].tow = o[6];
+            ob[n_obs].snr = (float)o[8];
+            ob[n_obs].doppler = (float)o[5];
+            ob[n_obs].az = (float)o[9];
+            ob[n_obs].el = (float)o[10];
+            ob[n_obs].residual = (float)rk1_v[prn_val - 1];
+            ob[n_obs].innovation = (float)vk1_v[prn_val - 1];
+            n_obs++;
+        }
 
-    send_json_http(json_buffer);
+        memcpy(hdr->magic, EPOCH_BIN_MAGIC, 4);
+        hdr->record_size = (uint32_t)(sizeof(epoch_bin_header_t) +
+                                      used_ch * sizeof(epoch_bin_channel_t) +
+                                      n_obs * sizeof(epoch_bin_obs_t));
+        hdr->version = EPOCH_BIN_VERSION;
+        hdr->n_channels = (uint16_t)used_ch;
+        hdr->n_obs = (uint16_t)n_obs;
+        hdr->nsat = (uint16_t)nsat;
+        hdr->flags = (sdrini.ekfFilterOn ? EPOCH_BIN_FLAG_EKF : 0) |
+                     (hold_applied ? EPOCH_BIN_FLAG_HOLD : 0);
+        hdr->reserved = 0;
+        hdr->elapsed_time = sdrstat.elapsedTime;
+        hdr->utc_time = (double)utc_time_seconds +
+                        ((int)(gps_tow * 1000) % 1000) / 1000.0;
+        hdr->dropped_epochs = atomic_load(&epoch_ring.dropped);
+        hdr->buffcnt = (uint64_t)sdrstat.buffcnt * FILE_BUFFSIZE;
+        hdr->lat = lat;
+        hdr->lon = lon;
+        hdr->hgt = hgt;
+        hdr->gdop = gdop;
+        hdr->clk_bias = clkBias / CTIME;
+
+        epoch_sink_push(bin_buffer, hdr->record_size, 0);
+    } else {
+        if (json_pos >= (int)sizeof(json_buffer)) {
+            json_buffer[sizeof(json_buffer) - 1] = '\0';
+        }
+        epoch_sink_push(json_buffer, strlen(json_buffer), 1);
+    }
 
 #undef JSON_APPEND
 }
@@ -0,0 +1,79 @@
+import numpy as np
+import os
+import sys
+import time
+import tempfile
+from iqPower import chunk_mean_power, block_mean_powers
+
+# --- KONFIGURACJA ---
+CAPTURE_SIZE_MB = 1024          # Rozmiar syntetycznego nagrania (1 GB)
+CHUNK_SIZE_BYTES = 131072       # Taki sam chunk jak w checkIfJamming
+BLOCK_CHUNKS = 8                # Chunki na blok w trybie memmap
+WRITE_BLOCK_BYTES = 16 * 1024 * 1024
+
+def generate_capture(path, size_bytes):
+  ##Szum + co drugi blok "jammer" o większej amplitudzie, zapisywany kawałkami (stała pamięć)
+    rng = np.random.default_rng(0)
+    written = 0
+    block_idx = 0
+    with open(path, 'wb') as f:
+        while written < size_bytes:
+            n = min(WRITE_BLOCK_BYTES, size_bytes - written)
+            sigma = 40.0 if block_idx % 2 else 8.0
+            samples = np.clip(127.5 + rng.normal(0.0, sigma, n), 0, 255).astype(np.uint8)
+            f.write(samples.tobytes())
+            written += n
+            block_idx += 1
+
+def power_reference(raw_uint8_chunk):
+  ##Dotychczasowa ścieżka: float32 -> complex -> abs**2 -> mean
+    iq_samples_f32 = (raw_uint8_chunk.astype(np.float32) - 127.5)
+    iq_complex = iq_samples_f32[0::2] + 1j * iq_samples_f32[1::2]
+    return np.mean(np.abs(iq_complex)**2)
+
+def run_chunked(path, power_fn):
+    powers = []
+    with open(path, 'rb') as f:
+        while True:
+            raw_bytes = f.read(CHUNK_SIZE_BYTES)
+            if not raw_bytes:
+                break
+            powers.append(power_fn(np.frombuffer(raw_bytes, dtype=np.uint8)))
+    return np.array(powers)
+
+def run_memmap(path):
+    data = np.memmap(path, dtype=np.uint8, mode='r')
+    n_full = data.size // CHUNK_SIZE_BYTES
+    chunks = data[:n_full * CHUNK_SIZE_BYTES].reshape(n_full, CHUNK_SIZE_BYTES)
+    powers = np.empty(n_full)
+    for start in range(0, n_full, BLOCK_CHUNKS):
+        block = chunks[start:start + BLOCK_CHUNKS]
+        powers[start:start + block.shape[0]] = block_mean_powers(block)
+    return powers
+
+def timed(label, fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - t0
+    print(f"  {label:<38} {elapsed:8.2f} s")
+    return result, elapsed
+
+if __name__ == "__main__":
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else CAPTURE_SIZE_MB
+    size_bytes = size_mb * 1024 * 1024
+    size_bytes -= size_bytes % CHUNK_SIZE_BYTES
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'synthetic_capture.bin')
+        print(f"Generowanie syntetycznego nagrania {size_mb} MB...")
+        generate_capture(path, size_bytes)
+
+        print("--- Benchmark mocy chunków ---")
+        ref, t_ref = timed("float32/complex (obecnie)", run_chunked, path, power_reference)
+        lut, t_lut = timed("LUT + bincount (chunk po chunku)", run_chunked, path, chunk_mean_power)
+        mm, t_mm = timed("LUT + np.take (memmap, bloki)", run_memmap, path)
+
+        print(f"\nPrzyspieszenie LUT/bincount: {t_ref / t_lut:.2f}x")
+        print(f"Przyspieszenie memmap/take:  {t_ref / t_mm:.2f}x")
+        print(f"Maks. względna różnica mocy: {np.max(np.abs(lut - ref) / ref):.2e} (bincount), "
+              f"{np.max(np.abs(mm - ref) / ref):.2e} (memmap)")
@@ -0,0 +1,53 @@
+import numpy as np
+
+# ==============================================================================
+#   WSPÓLNE JĄDRO MOCY DLA PRÓBEK IQ UINT8 (RTL-SDR)
+# ==============================================================================
+
+# Środek skali uint8 RTL-SDR
+IQ_OFFSET = 127.5
+
+# (b - 127.5)^2 dla każdej możliwej wartości bajtu
+SQUARED_LUT = (np.arange(256, dtype=np.float64) - IQ_OFFSET) ** 2
+
+# (2b - 255)^2 = 4 * (b - 127.5)^2 - wersja całkowita (mieści się w uint16) do np.take na blokach
+SQUARED_LUT_X4 = ((np.arange(256, dtype=np.int32) * 2 - 255) ** 2).astype(np.uint16)
+
+# Amplituda znormalizowana |I + jQ| / 127.5 dla każdej pary bajtów (I, Q) widzianej jako little-endian uint16
+_lut_i = (np.arange(65536) & 0xFF).astype(np.float32)
+_lut_q = (np.arange(65536) >> 8).astype(np.float32)
+AMPLITUDE_LUT = np.abs(((_lut_i - IQ_OFFSET) / IQ_OFFSET) + 1j * ((_lut_q - IQ_OFFSET) / IQ_OFFSET)).astype(np.float32)
+del _lut_i, _lut_q
+
+
+def byte_histogram(raw_uint8_chunk: np.ndarray) -> np.ndarray:
+  ##Histogram 256 wartości bajtów - z niego liczymy moc bez konwersji na float
+    return np.bincount(raw_uint8_chunk, minlength=256)
+
+
+def mean_power_from_histogram(histogram: np.ndarray, num_samples: int) -> float:
+  ##Średnia moc I²+Q² (skala cyfrowa) z histogramu bajtów
+    if num_samples <= 0:
+        return 0.0
+    return float(histogram @ SQUARED_LUT) / num_samples
+
+
+def chunk_mean_power(raw_uint8_chunk: np.ndarray) -> float:
+  ##Średnia moc chunka IQ w jednym przejściu po bajtach (histogram + tablica kwadratów)
+    num_samples = raw_uint8_chunk.size // 2
+    if num_samples == 0:
+        return 0.0
+    return mean_power_from_histogram(byte_histogram(raw_uint8_chunk), num_samples)
+
+
+def block_mean_powers(raw_uint8_block: np.ndarray) -> np.ndarray:
+  ##Średnia moc każdego wiersza bloku (n_chunks, chunk_bytes) - np.take na całkowitej tablicy kwadratów
+    sums = SQUARED_LUT_X4.take(raw_uint8_block).sum(axis=1, dtype=np.int64)
+    return sums / (4.0 * (raw_uint8_block.shape[1] // 2))
+
+
+def iq_amplitude(raw_uint8_data: np.ndarray) -> np.ndarray:
+  ##Znormalizowana amplituda próbek IQ bez tablic float/complex (jeden lookup na parę bajtów)
+    even_size = raw_uint8_data.size - (raw_uint8_data.size % 2)
+    pairs = np.ascontiguousarray(raw_uint8_data[:even_size]).view('<u2')
+    return AMPLITUDE_LUT.take(pairs)
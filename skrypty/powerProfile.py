@@ -0,0 +1,179 @@
+import numpy as np
+import os
+from iqPower import block_mean_powers, SQUARED_LUT_X4, AMPLITUDE_LUT
+
+# ==============================================================================
+#   PROFIL MOCY PLIKU IQ (PLIK POBOCZNY .powerprofile.npz)
+# ==============================================================================
+
+# Taki sam chunk jak w checkIfJamming (128 KiB = 65536 próbek IQ)
+PROFILE_CHUNK_SIZE_BYTES = 131072
+# Chunki liczone naraz z memmapy (blok mieści się w cache)
+PROFILE_BLOCK_CHUNKS = 8
+PROFILE_SUFFIX = '.powerprofile.npz'
+PROFILE_VERSION = 1
+
+# Profile już wczytane/policzone w tym procesie: ścieżka -> (klucz pliku, profil)
+_profile_memory_cache = {}
+
+
+def profile_path_for(file_path):
+    return file_path + PROFILE_SUFFIX
+
+
+def count_chunks(file_size, chunk_size=PROFILE_CHUNK_SIZE_BYTES):
+  ##Liczba chunków z co najmniej jedną próbką (ostatni może być niepełny)
+    n_chunks = file_size // chunk_size
+    if (file_size % chunk_size) // 2 > 0:
+        n_chunks += 1
+    return n_chunks
+
+
+def compute_chunk_stats(file_path, chunk_size=PROFILE_CHUNK_SIZE_BYTES,
+                        chunk_start=0, chunk_stop=None, with_amplitude=False,
+                        progress_callback=None, cancel_event=None):
+  ##Statystyki chunków pliku z memmapy: średnia moc, liczba próbek, opcjonalnie suma i szczyt amplitudy.
+  ##Nieparzysty ogon ma moc 0 (jak analyze_chunk_power), amplitudy liczone z pełnych par IQ.
+  ##progress_callback(przetworzone, wszystkie) po każdym bloku; ustawiony cancel_event -> zwraca None.
+    file_size = os.path.getsize(file_path)
+    n_total = count_chunks(file_size, chunk_size)
+    chunk_stop = n_total if chunk_stop is None else min(chunk_stop, n_total)
+    chunk_start = min(max(chunk_start, 0), chunk_stop)
+
+    n_chunks = chunk_stop - chunk_start
+    stats = {
+        'mean_power': np.zeros(n_chunks, dtype=np.float64),
+        'sample_counts': np.full(n_chunks, chunk_size // 2, dtype=np.int64)
+    }
+    if with_amplitude:
+        stats['amplitude_sum'] = np.zeros(n_chunks, dtype=np.float64)
+        stats['peak_amplitude'] = np.zeros(n_chunks, dtype=np.float32)
+    if n_chunks == 0:
+        return stats
+
+    byte_start = chunk_start * chunk_size
+    byte_stop = min(chunk_stop * chunk_size, file_size)
+    data = np.memmap(file_path, dtype=np.uint8, mode='r', offset=byte_start, shape=(byte_stop - byte_start,))
+
+    n_full = data.size // chunk_size
+    tail_bytes = data.size - n_full * chunk_size
+    full_chunks = data[:n_full * chunk_size].reshape(n_full, chunk_size)
+    for start in range(0, n_full, PROFILE_BLOCK_CHUNKS):
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        block = full_chunks[start:start + PROFILE_BLOCK_CHUNKS]
+        stop = start + block.shape[0]
+        stats['mean_power'][start:stop] = block_mean_powers(block)
+        if with_amplitude:
+            amplitude = AMPLITUDE_LUT.take(np.ascontiguousarray(block).view('<u2'))
+            stats['amplitude_sum'][start:stop] = amplitude.sum(axis=1, dtype=np.float64)
+            stats['peak_amplitude'][start:stop] = amplitude.max(axis=1)
+        if progress_callback:
+            progress_callback(stop, n_chunks)
+
+    if n_full < n_chunks:
+        tail = data[n_full * chunk_size:]
+        stats['sample_counts'][-1] = tail_bytes // 2
+        if tail_bytes % 2 == 0:
+            stats['mean_power'][-1] = SQUARED_LUT_X4.take(tail).sum(dtype=np.int64) / (4.0 * (tail_bytes // 2))
+        if with_amplitude:
+            amplitude = AMPLITUDE_LUT.take(np.ascontiguousarray(tail[:tail_bytes - tail_bytes % 2]).view('<u2'))
+            stats['amplitude_sum'][-1] = amplitude.sum(dtype=np.float64)
+            stats['peak_amplitude'][-1] = amplitude.max()
+
+    del data
+    if progress_callback:
+        progress_callback(n_chunks, n_chunks)
+    return stats
+
+
+def _file_key(file_path, chunk_size):
+    stat = os.stat(file_path)
+    return (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, chunk_size)
+
+
+def load_power_profile(file_path, chunk_size=PROFILE_CHUNK_SIZE_BYTES):
+  ##Profil z pamięci albo z pliku pobocznego - tylko jeśli ścieżka, rozmiar, mtime i chunk się zgadzają
+    try:
+        key = _file_key(file_path, chunk_size)
+    except OSError:
+        return None
+
+    cached = _profile_memory_cache.get(key[0])
+    if cached and cached[0] == key:
+        return cached[1]
+
+    sidecar_path = profile_path_for(file_path)
+    if not os.path.exists(sidecar_path):
+        return None
+    try:
+        with np.load(sidecar_path, allow_pickle=False) as npz:
+            stored_key = (str(npz['path']), int(npz['size']), int(npz['mtime_ns']), int(npz['chunk_size']))
+            if int(npz['version']) != PROFILE_VERSION or stored_key != key:
+                return None
+            profile = {
+                'mean_power': npz['mean_power'],
+                'peak_amplitude': npz['peak_amplitude'],
+                'amplitude_sum': npz['amplitude_sum'],
+                'sample_counts': npz['sample_counts'],
+                'chunk_size': chunk_size
+            }
+    except Exception as e:
+        print(f"Nie można wczytać profilu mocy {sidecar_path}: {e}")
+        return None
+
+    _profile_memory_cache[key[0]] = (key, profile)
+    return profile
+
+
+def save_power_profile(file_path, profile, key=None):
+  ##Zapis obok nagrania; brak prawa zapisu nie jest błędem - profil zostaje w pamięci
+  ##key: klucz pliku sprzed skanu (domyślnie bieżący stat pliku)
+    if key is None:
+        key = _file_key(file_path, profile['chunk_size'])
+    _profile_memory_cache[key[0]] = (key, profile)
+
+    sidecar_path = profile_path_for(file_path)
+    tmp_path = sidecar_path + '.tmp.npz'
+    try:
+        np.savez(
+            tmp_path,
+            version=PROFILE_VERSION,
+            path=key[0],
+            size=key[1],
+            mtime_ns=key[2],
+            chunk_size=key[3],
+            mean_power=profile['mean_power'],
+            peak_amplitude=profile['peak_amplitude'],
+            amplitude_sum=profile['amplitude_sum'],
+            sample_counts=profile['sample_counts']
+        )
+        os.replace(tmp_path, sidecar_path)
+    except OSError as e:
+        print(f"Nie można zapisać profilu mocy {sidecar_path}: {e}")
+
+
+def get_power_profile(file_path, chunk_size=PROFILE_CHUNK_SIZE_BYTES,
+                      progress_callback=None, cancel_event=None):
+  ##Profil mocy pliku: z cache (pamięć/.powerprofile.npz) albo jeden skan memmapą i zapis.
+  ##Przerwany skan (cancel_event) zwraca None i niczego nie zapisuje.
+  ##Plik zmieniony w trakcie skanu (np. wciąż nagrywany) - profil zwracany, ale nie zapisywany.
+    profile = load_power_profile(file_path, chunk_size)
+    if profile is not None:
+        return profile
+
+    key = _file_key(file_path, chunk_size)
+    profile = compute_chunk_stats(file_path, chunk_size, with_amplitude=True,
+                                  progress_callback=progress_callback, cancel_event=cancel_event)
+    if profile is None:
+        return None
+    profile['chunk_size'] = chunk_size
+    try:
+        key_after = _file_key(file_path, chunk_size)
+    except OSError:
+        key_after = None
+    if key_after != key or len(profile['mean_power']) != count_chunks(key[1], chunk_size):
+        print(f"Plik {file_path} zmienił się podczas skanu - profil mocy nie zostanie zapisany")
+        return profile
+    save_power_profile(file_path, profile, key)
+    return profile
@@ -1,5 +1,8 @@
 import numpy as np
 import math
+from concurrent.futures import ThreadPoolExecutor
+from iqPower import iq_amplitude, AMPLITUDE_LUT
+from powerProfile import load_power_profile, PROFILE_CHUNK_SIZE_BYTES, PROFILE_BLOCK_CHUNKS
 
 # ==============================================================================
 #   KONFIGURACJA I STAŁE
@@ -10,11 +13,24 @@ DEFAULT_CALIBRATED_TX_POWER = 40.0
 DEFAULT_CALIBRATED_PATH_LOSS_EXPONENT = 3.0
 DEFAULT_SIGNAL_FREQUENCY_MHZ = 1575.42
 DEFAULT_SIGNAL_THRESHOLD = 0.1
+DEFAULT_SAMPLE_RATE_HZ = 2048000
 
-# PARAMETRY PRZESZUKIWANIA SIATKI (GRID SEARCH)
-GRID_DENSITY = 300          # Rozdzielczość siatki (im więcej, tym precyzyjniej, ale wolniej)
+# TRASA JAMMERA (lokalizacja w oknach czasowych)
+TRACK_WINDOW_S = 0.5            # Długość okna RSSI - te same granice próbek we wszystkich plikach
+
+# PARAMETRY PRZESZUKIWANIA SIATKI (GRID SEARCH, OD ZGRUBNEJ DO DOKŁADNEJ)
+GRID_COARSE_DENSITY = 64        # Siatka zgrubna na całym obszarze poszukiwań
+GRID_REFINE_DENSITY = 21        # Podsiatka wokół każdego kandydata
+GRID_REFINE_SPAN = 2            # Podsiatka sięga ±tyle oczek poprzedniego poziomu (zakładkowo, płaskie doliny błędu)
+GRID_REFINE_CANDIDATES = 4      # Ilu najlepszych, odległych od siebie kandydatów doprecyzowujemy
+GRID_TARGET_RESOLUTION_M = 0.05 # Oczko siatki [m], przy którym kończymy doprecyzowanie
 SEARCH_RANGE_MULTIPLIER = 1.5
 
+# PARAMETRY SOLVERA NAJMNIEJSZYCH KWADRATÓW (scipy, opcjonalnie)
+LSQ_SEED_DENSITY = 24           # Zgrubna siatka dająca punkty startowe (bez startu podanego z zewnątrz)
+LSQ_SEED_CANDIDATES = 2         # Starty z osobnych minimów siatki (2 anteny -> dwa lustrzane rozwiązania)
+LSQ_ELLIPSE_CHI2 = 5.991        # Kwantyl chi² dla 2 stopni swobody -> elipsa 95%
+
 # Stałe do konwersji metrów na stopnie/minuty geograficzne
 METERS_PER_DEGREE_LAT = 111320.0
 METERS_PER_DEGREE_LON = 111320.0 
@@ -34,6 +50,77 @@ def read_iq_data(filename):
         print(f"BŁĄD: Plik '{filename}' nie został znaleziony.")
         return None
 
+def mean_amplitude_after_change_point(filename, threshold):
+  ##Średnia amplituda od pierwszej próbki powyżej progu do końca pliku.
+  ##Z gotowym profilem mocy (.powerprofile.npz) czytany jest tylko chunk, w którym pierwszy raz przekroczono próg;
+  ##bez profilu - jeden strumieniowy przebieg po pliku (stream_mean_amplitude_after_change_point).
+    profile = load_power_profile(filename)
+    if profile is None:
+        return stream_mean_amplitude_after_change_point(filename, threshold)
+
+    candidate_chunks = np.flatnonzero(profile['peak_amplitude'] > threshold)
+    if len(candidate_chunks) == 0:
+        return None
+
+    chunk_index = int(candidate_chunks[0])
+    chunk_size = profile['chunk_size']
+    with open(filename, 'rb') as f:
+        f.seek(chunk_index * chunk_size)
+        raw_chunk = np.frombuffer(f.read(chunk_size), dtype=np.uint8)
+
+    amplitude = iq_amplitude(raw_chunk)
+    turn_on_offset = find_change_point(amplitude, threshold)
+    amplitude_total = float(amplitude[turn_on_offset:].sum(dtype=np.float64)) + float(profile['amplitude_sum'][chunk_index + 1:].sum())
+    sample_total = (len(amplitude) - turn_on_offset) + int(profile['sample_counts'][chunk_index + 1:].sum())
+    return amplitude_total / sample_total
+
+def stream_mean_amplitude_after_change_point(filename, threshold, chunk_size=PROFILE_CHUNK_SIZE_BYTES):
+  ##To samo co mean_amplitude_after_change_point, ale w jednym przebiegu po memmapie bez profilu i bez zapisu na dysk.
+  ##W pamięci jest tylko blok PROFILE_BLOCK_CHUNKS chunków i jedna suma na chunk (8 B na 128 KiB pliku) -
+  ##sumy chunków są dodawane tak samo jak w profilu, więc wynik jest identyczny co do bitu.
+    try:
+        data = np.memmap(filename, dtype=np.uint8, mode='r')
+    except FileNotFoundError:
+        print(f"BŁĄD: Plik '{filename}' nie został znaleziony.")
+        return None
+    except ValueError:
+        # Pusty plik - memmap nie przyjmuje zerowej długości
+        return None
+
+    first_total = None
+    first_samples = 0
+    chunk_sums = []
+    sample_total = 0
+
+    n_full = data.size // chunk_size
+    full_chunks = data[:n_full * chunk_size].reshape(n_full, chunk_size)
+    blocks = (full_chunks[start:start + PROFILE_BLOCK_CHUNKS] for start in range(0, n_full, PROFILE_BLOCK_CHUNKS))
+    tail = data[n_full * chunk_size:]
+    tail = tail[:tail.size - tail.size % 2]
+    if tail.size > 0:
+        blocks = (*blocks, tail.reshape(1, -1))
+
+    for block in blocks:
+        amplitude = AMPLITUDE_LUT.take(np.ascontiguousarray(block).view('<u2'))
+        if first_total is None:
+            above = np.flatnonzero(amplitude.max(axis=1) > threshold)
+            if len(above) == 0:
+                continue
+            # Chunk z punktem zmiany liczony od progu, kolejne chunki bloku już w całości
+            row = int(above[0])
+            turn_on_offset = find_change_point(amplitude[row], threshold)
+            first_total = float(amplitude[row, turn_on_offset:].sum(dtype=np.float64))
+            first_samples = amplitude.shape[1] - turn_on_offset
+            amplitude = amplitude[row + 1:]
+        chunk_sums.extend(amplitude.sum(axis=1, dtype=np.float64))
+        sample_total += amplitude.size
+
+    del data
+    if first_total is None:
+        return None
+    amplitude_total = first_total + float(np.sum(chunk_sums, dtype=np.float64))
+    return amplitude_total / (first_samples + sample_total)
+
 def find_change_point(amplitude_data, threshold):
   ##Znajdowanie pierwszego indeksu przekraczającego próg 
     change_indices = np.where(amplitude_data > threshold)[0]
@@ -51,6 +138,64 @@ def meters_to_geographic_degrees(meters_x, meters_y, reference_lat=50.0):
     
     return delta_lat_degrees, delta_lon_degrees, delta_lat_minutes, delta_lon_minutes
 
+def distance_from_amplitude(avg_amplitude, tx_power, path_loss_exp, frequency_mhz):
+  ##Model log-odległościowy: średnia amplituda -> moc odebrana [dB] -> odległość [m]
+    received_power_db = 10 * np.log10(avg_amplitude**2)
+    path_loss_at_1m = 20 * np.log10(frequency_mhz) - 27.55
+    return 10 ** ((tx_power - received_power_db - path_loss_at_1m) / (10 * path_loss_exp))
+
+def window_amplitude_sums(filename, window_samples, threshold):
+  ##Sumy amplitud w kolejnych oknach po window_samples próbek (okno 0 od próbki 0) w jednym przebiegu po memmapie.
+  ##Jak w mean_amplitude_after_change_point liczą się próbki od pierwszego przekroczenia progu; szczyt okna mówi,
+  ##czy jammer w nim w ogóle był. W pamięci jest jeden blok okien, wynik to 20 B na okno.
+    try:
+        data = np.memmap(filename, dtype=np.uint8, mode='r')
+    except FileNotFoundError:
+        print(f"BŁĄD: Plik '{filename}' nie został znaleziony.")
+        return None
+    except ValueError:
+        # Pusty plik - memmap nie przyjmuje zerowej długości
+        return None
+
+    window_bytes = 2 * window_samples
+    n_full = data.size // window_bytes
+    tail = data[n_full * window_bytes:]
+    tail = tail[:tail.size - tail.size % 2]
+    n_windows = n_full + (1 if tail.size > 0 else 0)
+    sums = {
+        'amplitude_sum': np.zeros(n_windows, dtype=np.float64),
+        'sample_counts': np.zeros(n_windows, dtype=np.int64),
+        'peak_amplitude': np.zeros(n_windows, dtype=np.float32),
+        'turn_on_sample': None
+    }
+
+    full_windows = data[:n_full * window_bytes].reshape(n_full, window_bytes)
+    block_windows = max(1, (PROFILE_BLOCK_CHUNKS * PROFILE_CHUNK_SIZE_BYTES) // window_bytes)
+    blocks = [(start, full_windows[start:start + block_windows]) for start in range(0, n_full, block_windows)]
+    if tail.size > 0:
+        blocks.append((n_full, tail.reshape(1, -1)))
+
+    for start, block in blocks:
+        amplitude = AMPLITUDE_LUT.take(np.ascontiguousarray(block).view('<u2'))
+        stop = start + amplitude.shape[0]
+        sums['peak_amplitude'][start:stop] = amplitude.max(axis=1)
+        if sums['turn_on_sample'] is None:
+            above = np.flatnonzero(sums['peak_amplitude'][start:stop] > threshold)
+            if len(above) == 0:
+                continue
+            row = int(above[0])
+            turn_on_offset = find_change_point(amplitude[row], threshold)
+            sums['turn_on_sample'] = (start + row) * window_samples + int(turn_on_offset)
+            sums['amplitude_sum'][start + row] = amplitude[row, turn_on_offset:].sum(dtype=np.float64)
+            sums['sample_counts'][start + row] = amplitude.shape[1] - turn_on_offset
+            start += row + 1
+            amplitude = amplitude[row + 1:]
+        sums['amplitude_sum'][start:stop] = amplitude.sum(axis=1, dtype=np.float64)
+        sums['sample_counts'][start:stop] = amplitude.shape[1]
+
+    del data
+    return sums
+
 def calculate_distance_from_file(iq_filename, 
                                tx_power=DEFAULT_CALIBRATED_TX_POWER,
                                path_loss_exp=DEFAULT_CALIBRATED_PATH_LOSS_EXPONENT,
@@ -60,19 +205,14 @@ def calculate_distance_from_file(iq_filename,
   ##Obliczanie odległości na podstawie pliku z danymi IQ 
     if verbose:
         print(f"  Analizowanie pliku '{iq_filename}'  ")
-    iq_samples = read_iq_data(iq_filename)
-    if iq_samples is None or len(iq_samples) == 0: return None
-    amplitude = np.abs(iq_samples)
-    turn_on_index = find_change_point(amplitude, threshold)
-    if turn_on_index is not None:
-        avg_amplitude = np.mean(amplitude[turn_on_index:])
+    avg_amplitude = mean_amplitude_after_change_point(iq_filename, threshold)
+    if avg_amplitude is not None:
         if avg_amplitude == 0: return None
         received_power_db = 10 * np.log10(avg_amplitude**2)
         if verbose:
             print(f"Sygnał wykryty. Średnia amplituda: {avg_amplitude:.4f}")
             print(f"Hipotetyczna moc odebrana: {received_power_db:.2f} dB")
-        path_loss_at_1m = 20 * np.log10(frequency_mhz) - 27.55
-        distance = 10 ** ((tx_power - received_power_db - path_loss_at_1m) / (10 * path_loss_exp))
+        distance = distance_from_amplitude(avg_amplitude, tx_power, path_loss_exp, frequency_mhz)
         if verbose:
             print(f">>> Oszacowana odległość: {distance:.2f} m\n")
         return distance
@@ -85,85 +225,181 @@ def calculate_distance_from_file(iq_filename,
 #   ALGORYTM GRID SEARCH (Zastępuje metody geometryczne)
 # ==============================================================================
 
-def perform_grid_search(positions, radii):
+def grid_errors(positions, radii, grid_x, grid_y):
+  ##Suma |odległość od anteny - zmierzony promień| dla każdego punktu siatki
+    total_error = np.zeros_like(grid_x)
+    for pos, r in zip(positions, radii):
+        total_error += np.abs(np.hypot(grid_x - pos[0], grid_y - pos[1]) - r)
+    return total_error
+
+def select_grid_candidates(points, errors, num_candidates, min_separation):
+  ##Najlepsze punkty siatki odległe od siebie o co najmniej min_separation (osobne minima, np. lustrzane przy 2 antenach)
+    candidates = []
+    for idx in np.argsort(errors, kind='stable'):
+        point = points[idx]
+        if all(np.hypot(*(point - c)) >= min_separation for c, _ in candidates):
+            candidates.append((point, errors[idx]))
+            if len(candidates) == num_candidates:
+                break
+    return candidates
+
+def perform_grid_search(positions, radii, target_resolution=GRID_TARGET_RESOLUTION_M, verbose=True):
   ##Znajduje punkt najlepiej pasujący do zestawu odległości od anten metodą Grid Search. Minimalizuje błąd bezwzględny sumy różnic odległości.
+  ##Piramida: siatka zgrubna na ±1.5·max_r, potem podsiatki wokół najlepszych kandydatów, aż oczko spadnie do target_resolution.
+  ##Pamięć to najwyżej GRID_COARSE_DENSITY² punktów, niezależnie od obszaru i dokładności.
     # Konwersja na numpy array dla pewności
     positions = np.array(positions)
     radii = np.array(radii)
     
-    print(f"Uruchamianie przeszukiwania siatki {GRID_DENSITY}x{GRID_DENSITY}...")
-    
     max_radius = np.max(radii)
     # Środek obszaru poszukiwań to średnia pozycja anten
     center = np.mean(positions, axis=0)
     
     search_range = max_radius * SEARCH_RANGE_MULTIPLIER
+    step = 2 * search_range / (GRID_COARSE_DENSITY - 1)
+    if verbose:
+        print(f"Uruchamianie przeszukiwania siatki {GRID_COARSE_DENSITY}x{GRID_COARSE_DENSITY} "
+              f"(oczko {step:.2f} m -> {target_resolution} m)...")
     
-    # Tworzenie siatki punktów
-    x_coords = np.linspace(center[0] - search_range, center[0] + search_range, GRID_DENSITY)
-    y_coords = np.linspace(center[1] - search_range, center[1] + search_range, GRID_DENSITY)
+    # Siatka zgrubna
+    x_coords = np.linspace(center[0] - search_range, center[0] + search_range, GRID_COARSE_DENSITY)
+    y_coords = np.linspace(center[1] - search_range, center[1] + search_range, GRID_COARSE_DENSITY)
     grid_x, grid_y = np.meshgrid(x_coords, y_coords)
-    
-    # Obliczanie macierzy błędu dla każdego punktu siatki
-    total_error = np.zeros_like(grid_x)
-    
-    for pos, r in zip(positions, radii):
-        # Odległość każdego punktu siatki od danej anteny
-        dist_to_pos = np.sqrt((grid_x - pos[0])**2 + (grid_y - pos[1])**2)
-        # Dodajemy błąd (różnica między odległością z siatki a zmierzoną RSSI)
-        total_error += np.abs(dist_to_pos - r)
-    
-    # Znalezienie indeksu punktu z najmniejszym błędem
-    min_error_idx = np.unravel_index(np.argmin(total_error), total_error.shape)
-    best_location = np.array([grid_x[min_error_idx], grid_y[min_error_idx]])
-    
-    return best_location
+    points = np.column_stack((grid_x.ravel(), grid_y.ravel()))
+    errors = grid_errors(positions, radii, grid_x, grid_y).ravel()
+    candidates = select_grid_candidates(points, errors, GRID_REFINE_CANDIDATES, 2 * step)
+    evaluations = errors.size
+
+    # Doprecyzowanie: podsiatka ±GRID_REFINE_SPAN oczek wokół każdego kandydata, kandydaci wybierani ze wszystkich podsiatek
+    offsets = np.linspace(-GRID_REFINE_SPAN, GRID_REFINE_SPAN, GRID_REFINE_DENSITY)
+    while step > target_resolution:
+        sub_points = []
+        sub_errors = []
+        for candidate, _ in candidates:
+            grid_x, grid_y = np.meshgrid(candidate[0] + offsets * step, candidate[1] + offsets * step)
+            sub_points.append(np.column_stack((grid_x.ravel(), grid_y.ravel())))
+            sub_errors.append(grid_errors(positions, radii, grid_x, grid_y).ravel())
+        step = 2 * GRID_REFINE_SPAN * step / (GRID_REFINE_DENSITY - 1)
+        points = np.concatenate(sub_points)
+        errors = np.concatenate(sub_errors)
+        candidates = select_grid_candidates(points, errors, GRID_REFINE_CANDIDATES, 2 * step)
+        evaluations += errors.size
+
+    best_location, best_error = min(candidates, key=lambda candidate: candidate[1])
+    if verbose:
+        print(f"Grid Search: {evaluations} punktów, oczko końcowe {step:.3f} m, błąd {best_error:.3f} m")
+    return np.array(best_location)
+
+# ==============================================================================
+#   SOLVER NAJMNIEJSZYCH KWADRATÓW (LEVENBERG-MARQUARDT, SCIPY)
+# ==============================================================================
+
+def uncertainty_ellipse(covariance):
+  ##Elipsa ufności 95% z macierzy kowariancji 2x2: półosie [m] i kąt osi wielkiej od osi x [stopnie, przeciwnie do wskazówek]
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+    eigenvalues = np.clip(eigenvalues, 0.0, None)
+    major = eigenvectors[:, 1]
+    return {
+        'semi_major_m': float(math.sqrt(LSQ_ELLIPSE_CHI2 * eigenvalues[1])),
+        'semi_minor_m': float(math.sqrt(LSQ_ELLIPSE_CHI2 * eigenvalues[0])),
+        'angle_deg': float(math.degrees(math.atan2(major[1], major[0])) % 180.0),
+        'confidence': 0.95
+    }
+
+def solve_least_squares(positions, radii, initial_guess=None, range_sigma_m=None):
+  ##Punkt minimalizujący sumę kwadratów (|p - antena| - r) metodą Levenberga-Marquardta (scipy.optimize.least_squares).
+  ##Start: initial_guess (np. wynik poprzedniego okna - jedno wywołanie LM) albo najlepsze minima zgrubnej siatki LSQ_SEED_DENSITY².
+  ##Kowariancja = σ²(JᵀJ)⁻¹; σ błędu odległości: range_sigma_m, z reszt (więcej anten niż 2) albo 1 m.
+  ##Zwraca słownik albo None, gdy brak scipy.
+    try:
+        from scipy.optimize import least_squares
+    except ImportError:
+        print("Brak scipy - solver najmniejszych kwadratów niedostępny.")
+        return None
+
+    positions = np.asarray(positions, dtype=np.float64)
+    radii = np.asarray(radii, dtype=np.float64)
+
+    def residuals(point):
+        return np.hypot(point[0] - positions[:, 0], point[1] - positions[:, 1]) - radii
+
+    def jacobian(point):
+        offsets = point - positions
+        norms = np.hypot(offsets[:, 0], offsets[:, 1])
+        return offsets / np.maximum(norms, 1e-9)[:, None]
+
+    if initial_guess is not None:
+        seeds = [np.asarray(initial_guess, dtype=np.float64)]
+    else:
+        center = np.mean(positions, axis=0)
+        search_range = np.max(radii) * SEARCH_RANGE_MULTIPLIER
+        x_coords = np.linspace(center[0] - search_range, center[0] + search_range, LSQ_SEED_DENSITY)
+        y_coords = np.linspace(center[1] - search_range, center[1] + search_range, LSQ_SEED_DENSITY)
+        grid_x, grid_y = np.meshgrid(x_coords, y_coords)
+        points = np.column_stack((grid_x.ravel(), grid_y.ravel()))
+        errors = grid_errors(positions, radii, grid_x, grid_y).ravel()
+        step = 2 * search_range / (LSQ_SEED_DENSITY - 1)
+        seeds = [point for point, _ in select_grid_candidates(points, errors, LSQ_SEED_CANDIDATES, 2 * step)]
+
+    # LM (MINPACK) wymaga co najmniej tylu reszt co niewiadomych - przy 2 antenach dokładnie tyle
+    best = None
+    for seed in seeds:
+        solution = least_squares(residuals, seed, jac=jacobian, method='lm')
+        if best is None or solution.cost < best.cost:
+            best = solution
+
+    dof = len(radii) - 2
+    if range_sigma_m is None:
+        range_sigma_m = math.sqrt(2.0 * best.cost / dof) if dof > 0 else 1.0
+
+    covariance = None
+    ellipse = None
+    try:
+        covariance = range_sigma_m ** 2 * np.linalg.inv(best.jac.T @ best.jac)
+        ellipse = uncertainty_ellipse(covariance)
+    except np.linalg.LinAlgError:
+        # Anteny i nadajnik na jednej prostej - położenie w poprzek nieoznaczone
+        pass
+
+    return {
+        'location': best.x,
+        'covariance': covariance,
+        'ellipse': ellipse,
+        'range_sigma_m': range_sigma_m,
+        'rms_residual_m': float(math.sqrt(2.0 * best.cost / len(radii))),
+        'evaluations': int(best.nfev),
+        'converged': bool(best.success)
+    }
 
 # ==============================================================================
 #   GŁÓWNA FUNKCJA LOGIKI BIZNESOWEJ
 # ==============================================================================
 
-def triangulate_jammer_location(file_paths, 
-                              antenna_positions_meters=None,
-                              reference_lat=50.00898,
-                              reference_lon=19.98287,
-                              tx_power=DEFAULT_CALIBRATED_TX_POWER,
-                              path_loss_exp=DEFAULT_CALIBRATED_PATH_LOSS_EXPONENT,
-                              frequency_mhz=DEFAULT_SIGNAL_FREQUENCY_MHZ,
-                              threshold=DEFAULT_SIGNAL_THRESHOLD,
-                              verbose=False):
-  ## Główna funkcja określająca lokalizację jammera. Teraz używa metody Grid Search zamiast prostych przecięć geometrycznych.
-    if len(file_paths) < 2:
-        return {
-            'success': False,
-            'distances': None,
-            'location_meters': None,
-            'location_geographic': None,
-            'message': 'Wymagane są co najmniej 2 pliki z danymi anten.',
-            'num_antennas': len(file_paths)
-        }
-    
+def default_antenna_positions(num_files):
     # Domyślne pozycje anten (w metrach)
-    if antenna_positions_meters is None:
-        antenna_positions_meters = [
-            np.array([0.0, 0.0]),      # Antena 0 - punkt odniesienia
-            np.array([0.5, 0.0]),      # Antena 1
-            np.array([0.0, 0.5])       # Antena 2 (opcjonalna)
-        ]
-        # Przytnij listę domyślnych pozycji do liczby plików
-        antenna_positions_meters = antenna_positions_meters[:len(file_paths)]
-    
-    # 1. Oblicz odległości dla każdej anteny
-    distances = []
+    antenna_positions_meters = [
+        np.array([0.0, 0.0]),      # Antena 0 - punkt odniesienia
+        np.array([0.5, 0.0]),      # Antena 1
+        np.array([0.0, 0.5])       # Antena 2 (opcjonalna)
+    ]
+    # Przytnij listę domyślnych pozycji do liczby plików
+    return antenna_positions_meters[:num_files]
+
+def locate_from_distances(distances,
+                          antenna_positions_meters,
+                          reference_lat,
+                          reference_lon,
+                          verbose=False,
+                          solver='grid',
+                          initial_guess=None,
+                          log_search=True):
+  ## Lokalizacja z odległości od anten (None = brak sygnału w danej antenie) - wynik jak z triangulate_jammer_location.
+  ## initial_guess przyspiesza solver najmniejszych kwadratów (np. wynik poprzedniego okna trasy);
+  ## log_search=False wycisza komunikaty Grid Search (setki okien trasy).
     valid_positions = []
     valid_radii = []
 
-    for i, file_path in enumerate(file_paths):
-        dist = calculate_distance_from_file(
-            file_path, tx_power, path_loss_exp, frequency_mhz, threshold, verbose
-        )
-        distances.append(dist)
-        
+    for i, dist in enumerate(distances):
         if dist is not None:
             valid_radii.append(dist)
             # Pobierz pozycję odpowiadającą tej antenie (zabezpieczenie przed index error)
@@ -181,16 +417,20 @@ def triangulate_jammer_location(file_paths,
             'location_meters': None,
             'location_geographic': None,
             'message': f'Nie udało się obliczyć poprawnej odległości dla wystarczającej liczby anten (min 2). Sukcesy: {len(valid_radii)}',
-            'num_antennas': len(file_paths)
+            'num_antennas': len(distances)
         }
 
-    # 2. Uruchomienie algorytmu Grid Search
+    # 2. Uruchomienie algorytmu Grid Search (albo najmniejszych kwadratów)
     if verbose:
-        print(f"Obliczanie lokalizacji metodą Grid Search dla {len(valid_positions)} anten.")
+        print(f"Obliczanie lokalizacji metodą {'najmniejszych kwadratów' if solver == 'least_squares' else 'Grid Search'} dla {len(valid_positions)} anten.")
         for i, (pos, r) in enumerate(zip(valid_positions, valid_radii)):
             print(f"  Antena [{pos[0]:.1f}, {pos[1]:.1f}] -> r={r:.2f}m")
 
-    best_location = perform_grid_search(valid_positions, valid_radii)
+    lsq = solve_least_squares(valid_positions, valid_radii, initial_guess) if solver == 'least_squares' else None
+    if lsq is not None:
+        best_location = lsq['location']
+    else:
+        best_location = perform_grid_search(valid_positions, valid_radii, verbose=log_search)
     
     # 3. Konwersja wyników na format wyjściowy
     if best_location is not None:
@@ -201,7 +441,12 @@ def triangulate_jammer_location(file_paths,
         absolute_lat = reference_lat + delta_lat_deg
         absolute_lon = reference_lon + delta_lon_deg
         
-        message = f"Lokalizacja wyznaczona algorytmem Grid Search (błąd minimalny). x={best_location[0]:.2f}m, y={best_location[1]:.2f}m"
+        if lsq is not None:
+            message = f"Lokalizacja wyznaczona metodą najmniejszych kwadratów (Levenberg-Marquardt). x={best_location[0]:.2f}m, y={best_location[1]:.2f}m"
+            if lsq['ellipse'] is not None:
+                message += f", elipsa 95%: {lsq['ellipse']['semi_major_m']:.2f} x {lsq['ellipse']['semi_minor_m']:.2f} m"
+        else:
+            message = f"Lokalizacja wyznaczona algorytmem Grid Search (błąd minimalny). x={best_location[0]:.2f}m, y={best_location[1]:.2f}m"
 
         return {
             'success': True,
@@ -216,7 +461,10 @@ def triangulate_jammer_location(file_paths,
                 'lon_offset_minutes': delta_lon_min
             },
             'message': message,
-            'num_antennas': len(valid_radii)
+            'num_antennas': len(valid_radii),
+            'solver': 'least_squares' if lsq is not None else 'grid',
+            'covariance_m2': lsq['covariance'].tolist() if lsq is not None and lsq['covariance'] is not None else None,
+            'uncertainty_ellipse': lsq['ellipse'] if lsq is not None else None
         }
     else:
         return {
@@ -228,6 +476,137 @@ def triangulate_jammer_location(file_paths,
             'num_antennas': len(valid_radii)
         }
 
+def triangulate_jammer_location(file_paths, 
+                              antenna_positions_meters=None,
+                              reference_lat=50.00898,
+                              reference_lon=19.98287,
+                              tx_power=DEFAULT_CALIBRATED_TX_POWER,
+                              path_loss_exp=DEFAULT_CALIBRATED_PATH_LOSS_EXPONENT,
+                              frequency_mhz=DEFAULT_SIGNAL_FREQUENCY_MHZ,
+                              threshold=DEFAULT_SIGNAL_THRESHOLD,
+                              verbose=False,
+                              solver='grid'):
+  ## Główna funkcja określająca lokalizację jammera. Teraz używa metody Grid Search zamiast prostych przecięć geometrycznych.
+  ## solver='least_squares' - Levenberg-Marquardt ze scipy startujący ze zgrubnej siatki; dokłada kowariancję i elipsę
+  ## niepewności ('covariance_m2', 'uncertainty_ellipse'). Bez scipy wraca do Grid Search.
+    if len(file_paths) < 2:
+        return {
+            'success': False,
+            'distances': None,
+            'location_meters': None,
+            'location_geographic': None,
+            'message': 'Wymagane są co najmniej 2 pliki z danymi anten.',
+            'num_antennas': len(file_paths)
+        }
+    
+    if antenna_positions_meters is None:
+        antenna_positions_meters = default_antenna_positions(len(file_paths))
+    
+    # 1. Oblicz odległości dla każdej anteny - jeden wątek na plik (memmap i LUT numpy zwalniają GIL),
+    #    więc czas to mniej więcej czas najwolniejszego pliku; map zwraca wyniki w kolejności anten
+    with ThreadPoolExecutor(max_workers=len(file_paths)) as executor:
+        distances = list(executor.map(
+            lambda file_path: calculate_distance_from_file(
+                file_path, tx_power, path_loss_exp, frequency_mhz, threshold, verbose
+            ),
+            file_paths
+        ))
+
+    return locate_from_distances(distances, antenna_positions_meters, reference_lat, reference_lon, verbose, solver)
+
+def triangulate_jammer_track(file_paths,
+                             antenna_positions_meters=None,
+                             reference_lat=50.00898,
+                             reference_lon=19.98287,
+                             tx_power=DEFAULT_CALIBRATED_TX_POWER,
+                             path_loss_exp=DEFAULT_CALIBRATED_PATH_LOSS_EXPONENT,
+                             frequency_mhz=DEFAULT_SIGNAL_FREQUENCY_MHZ,
+                             threshold=DEFAULT_SIGNAL_THRESHOLD,
+                             verbose=False,
+                             window_s=TRACK_WINDOW_S,
+                             sample_rate_hz=DEFAULT_SAMPLE_RATE_HZ,
+                             solver='least_squares'):
+  ## Lokalizacja w oknach czasowych (poruszający się jammer albo odbiornik). Jeden przebieg po każdym pliku
+  ## (wątek na plik) daje sumy amplitud w oknach o wspólnych granicach próbek; okno, w którym co najmniej
+  ## 2 anteny widzą sygnał, dostaje własne położenie. Najmniejsze kwadraty startują z wyniku poprzedniego okna.
+  ## Wynik jak z triangulate_jammer_location (całe zdarzenie - te same odległości) + 'track': lista punktów trasy.
+    if len(file_paths) < 2:
+        return {
+            'success': False,
+            'distances': None,
+            'location_meters': None,
+            'location_geographic': None,
+            'message': 'Wymagane są co najmniej 2 pliki z danymi anten.',
+            'num_antennas': len(file_paths),
+            'track': []
+        }
+
+    if antenna_positions_meters is None:
+        antenna_positions_meters = default_antenna_positions(len(file_paths))
+
+    window_samples = max(1, int(round(window_s * sample_rate_hz)))
+    with ThreadPoolExecutor(max_workers=len(file_paths)) as executor:
+        window_sums = list(executor.map(
+            lambda file_path: window_amplitude_sums(file_path, window_samples, threshold),
+            file_paths
+        ))
+
+    def amplitude_to_distance(amplitude_sum, sample_count):
+        if sample_count == 0 or amplitude_sum == 0:
+            return None
+        return float(distance_from_amplitude(amplitude_sum / sample_count, tx_power, path_loss_exp, frequency_mhz))
+
+    # Całe zdarzenie: suma okien od przekroczenia progu = średnia z mean_amplitude_after_change_point
+    event_distances = [
+        amplitude_to_distance(float(sums['amplitude_sum'].sum()), int(sums['sample_counts'].sum()))
+        if sums is not None and sums['turn_on_sample'] is not None else None
+        for sums in window_sums
+    ]
+    result = locate_from_distances(event_distances, antenna_positions_meters, reference_lat, reference_lon, verbose, solver)
+    if result['success']:
+        solver = result['solver']
+
+    track = []
+    previous_location = None
+    n_windows = max((len(sums['amplitude_sum']) for sums in window_sums if sums is not None), default=0)
+    for window in range(n_windows):
+        distances = []
+        for sums in window_sums:
+            # Okno bez próbki powyżej progu (jammer wyłączony) albo poza końcem krótszego pliku - ta antena odpada
+            if sums is None or window >= len(sums['amplitude_sum']) or sums['peak_amplitude'][window] <= threshold:
+                distances.append(None)
+            else:
+                distances.append(amplitude_to_distance(sums['amplitude_sum'][window], sums['sample_counts'][window]))
+        if sum(d is not None for d in distances) < 2:
+            continue
+
+        point = locate_from_distances(distances, antenna_positions_meters, reference_lat, reference_lon,
+                                      solver=solver, initial_guess=previous_location, log_search=False)
+        if not point['success']:
+            continue
+        if point['solver'] != solver:
+            # Brak scipy - reszta okien od razu siatką, bez ponownej próby importu
+            solver = point['solver']
+        previous_location = point['location_meters']
+        track.append({
+            'window': window,
+            'start_s': window * window_samples / sample_rate_hz,
+            'end_s': (window + 1) * window_samples / sample_rate_hz,
+            'lat': point['location_geographic']['lat'],
+            'lon': point['location_geographic']['lon'],
+            'location_meters': point['location_meters'],
+            'distances': distances,
+            'uncertainty_ellipse': point['uncertainty_ellipse']
+        })
+
+    if verbose:
+        print(f"Trasa jammera: {len(track)} z {n_windows} okien po {window_s} s")
+    result['track'] = track
+    result['track_window_s'] = window_s
+    if result['success']:
+        result['message'] += f"; trasa: {len(track)} punktów co {window_s} s"
+    return result
+
 # ==============================================================================
 #   URUCHOMIENIE TESTOWE
 # ==============================================================================
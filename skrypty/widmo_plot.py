@@ -2,6 +2,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 from scipy import signal
 import os
+from iqPower import byte_histogram
 
 # --- KONFIGURACJA ---
 FILENAME = '/home/szymon/Downloads/capture_ruch10.bin'  # Zmień na nazwę pliku
@@ -21,7 +22,7 @@ def analyze_full_file(filename):
 
     # Przygotowanie tablic na wyniki
     spectrogram_data = []
-    histogram_samples = [] # Weźmiemy próbki losowo do histogramu
+    histogram_counts = np.zeros(256, dtype=np.int64) # Histogram bajtów z całego pliku (bincount, bez listy próbek)
     
     with open(filename, 'rb') as f:
         while True:
@@ -31,8 +32,8 @@ def analyze_full_file(filename):
             if len(raw_chunk) < FFT_SIZE * 2:
                 break # Koniec pliku
 
-            # Zbieranie próbek do histogramu (bierzemy co 100-tną próbkę, żeby nie zapchać pamięci, ale mieć reprezentację całości)
-            histogram_samples.extend(raw_chunk[::100])
+            # Histogram wszystkich bajtów kawałka - jedno przejście, stała pamięć
+            histogram_counts += byte_histogram(raw_chunk)
 
             # Konwersja na zespolone
             raw_chunk = raw_chunk.astype(np.float32)
@@ -82,7 +83,7 @@ def analyze_full_file(filename):
 
     # 3. HISTOGRAM (Z próbek z całego pliku)
     ax3 = fig.add_subplot(gs[2])
-    ax3.hist(histogram_samples, bins=256, range=(0, 256), color='green', alpha=0.7, density=True)
+    ax3.hist(np.arange(256), bins=256, range=(0, 256), weights=histogram_counts, color='green', alpha=0.7, density=True)
     ax3.set_title('Histogram (Reprezentatywny dla całego pliku)')
     ax3.set_xlabel('Wartość surowa (0-255)')
     ax3.axvline(0, color='red', linestyle='--')